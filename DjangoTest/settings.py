@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     # REST框架（可选，简化接口开发）
     "rest_framework",
     "rest_framework_simplejwt",  # Django 中集成 JWT（JSON Web Token）
+    "core.apps.CoreConfig",
     "user.apps.UserConfig",
     "menu.apps.MenuConfig",
     "feellist.apps.FeellistConfig",
@@ -44,6 +45,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 接口监控（放第一个，统计整个请求的耗时），指标见 /metrics
+    "core.middleware.core_metrics.MetricsMiddleware",
+    # SQL预算检查（默认只在DEBUG时启用）：SQL条数/耗时超预算、N+1查询打警告日志
+    "core.middleware.core_query_budget.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     # 跨域中间件（关键）
@@ -165,6 +170,35 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 # 【公共】静态文件基础配置
 STATIC_URL = "static/"
+# 【公共】feellist统计接口是否读取日汇总表（network_scene_daily_rollup）
+# 默认关闭：汇总表刚建好时是空的，先执行 python manage.py rebuild_scene_rollup 生成历史汇总，再改成True
+FEELLIST_SCENE_ROLLUP_ENABLED = False
+# 【公共】feellist指标分布/相关性接口使用的进程内列式快照：加载最近几天、增量刷新间隔、全量重载间隔（秒）；
+# 增量刷新间隔同时是附近小区位置索引的最短重建间隔
+FEELLIST_SNAPSHOT_DAYS = 7
+FEELLIST_SNAPSHOT_REFRESH_SECONDS = 60
+FEELLIST_SNAPSHOT_FULL_RELOAD_SECONDS = 3600
+# 【公共】缓存：default 是本机内存缓存，每个进程各存一份响应缓存
+# generations 是数据版本号专用缓存，所有进程共用、incr必须原子：默认存数据库计数器表，有Redis时可换成RedisCache；
+# 任何进程写库后版本号+1，所有进程里的旧响应缓存都不再命中
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "network_optimization",
+    },
+    "generations": {
+        "BACKEND": "core.utils.core_counter_cache.DatabaseCounterCache",
+    },
+}
+# 【公共】feellist列表/详情接口的响应缓存时间（秒）：按表名单独配置，没配置的表用默认值，0表示不缓存
+# 有新数据写入时按表的数据版本号自动失效，不用等到过期
+FEELLIST_RESPONSE_CACHE_TTL = 60
+FEELLIST_RESPONSE_CACHE_TTLS = {
+    "network_scene_data": 300,
+    "user_score": 60,
+    "complaint_work_order": 30,
+}
+
 # ========== 关键：引入本地配置 ==========
 try:
     # 导入local_settings.py，覆盖上面的配置
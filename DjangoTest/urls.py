@@ -19,6 +19,7 @@ from django.urls import path, include
 
 # 导入api应用的视图
 from api.views import test_get, test_post
+from core.middleware.core_metrics import metrics_view
 
 urlpatterns = [
     # path('admin/', admin.site.urls),
@@ -28,6 +29,8 @@ urlpatterns = [
     path("api/test-post/", test_post, name="test_post"),
     path("api/user/", include("user.urls")),
     path('api/feellist/', include('feellist.urls')),
+    # Prometheus指标
+    path("metrics", metrics_view, name="metrics"),
     # path('role/', include('role.urls')),
     # path('menu/', include('menu.urls')),
 ]
@@ -20,12 +20,14 @@ MSG_QUERY_SUCCESS = "查询成功"
 MSG_CREATE_SUCCESS = "新增成功"
 MSG_UPDATE_SUCCESS = "修改成功"
 MSG_DELETE_SUCCESS = "删除成功"
+MSG_BULK_CREATE_SUCCESS = "批量新增完成"
 
 # 错误提示
 MSG_ERROR = "操作失败"
 MSG_PARAM_ERROR = "参数格式错误"
 MSG_VALIDATE_ERROR = "数据验证失败"
 MSG_DATA_NOT_FOUND = "数据不存在"
+MSG_DATA_CONFLICT = "数据已存在（唯一字段重复）"
 MSG_PERMISSION_DENIED = "权限不足"
 MSG_SERVER_ERROR = "服务器内部错误"
 
@@ -34,8 +36,65 @@ DEFAULT_PAGE = 1  # 默认页码
 DEFAULT_PAGE_SIZE = 10  # 默认每页条数
 MAX_PAGE_SIZE = 100  # 最大每页条数（防止一次查太多数据）
 
+# ==================== 总数统计方式 ====================
+COUNT_EXACT = "exact"  # 精确总数：每次COUNT(*)
+COUNT_ESTIMATE = "estimate"  # 估算总数：表统计信息或短期缓存的COUNT结果
+COUNT_NONE = "none"  # 不统计总数：多查一条判断是否有下一页
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+COUNT_CACHE_TTL = 60  # 估算总数的缓存时间（秒）
+
+# ==================== 数据导出配置 ====================
+EXPORT_CSV = "csv"  # CSV格式（带BOM，Excel直接打开不乱码）
+EXPORT_NDJSON = "ndjson"  # 每行一个JSON对象
+EXPORT_FORMATS = (EXPORT_CSV, EXPORT_NDJSON)
+EXPORT_CHUNK_SIZE = 2000  # 导出时每批从数据库读取的行数
+
+# ==================== 分组统计配置 ====================
+ANALYTICS_MAX_GROUPS = 5000  # 分组统计最多返回的分组数
+
+# ==================== 批量写入配置 ====================
+BULK_BATCH_SIZE = 1000  # 批量新增时每批校验+写入的行数（每批一个事务）
+BULK_MAX_ERRORS = 1000  # 批量新增响应里最多返回的错误行数
+
+# ==================== 指标排名配置 ====================
+RANKING_DEFAULT_LIMIT = 20  # 默认返回的小区数
+RANKING_MAX_LIMIT = 100  # 最多返回的小区数
+
+# ==================== 附近小区查询配置 ====================
+NEARBY_DEFAULT_K = 10  # 默认返回最近的小区数
+NEARBY_MAX_K = 100  # 最多返回的小区数
+NEARBY_DEFAULT_RADIUS_M = 5000  # 默认搜索半径（米）
+NEARBY_MAX_RADIUS_M = 50000  # 最大搜索半径（米）
+
+# ==================== 地图网格聚合配置 ====================
+HEATMAP_MAX_ZOOM = 18  # 最大缩放级别
+HEATMAP_BINS_PER_TILE = 32  # 每个瓦片每个方向切分的网格数（瓦片宽 360/2^zoom 度）
+HEATMAP_MAX_TILES = 64  # 一次请求最多覆盖的瓦片数（超过说明缩放级别太大，需要缩小地图）
+HEATMAP_CACHE_TTL = 600  # 单个瓦片聚合结果的缓存时间（秒），有新数据写入会提前失效
+
+# ==================== 响应缓存配置 ====================
+RESPONSE_CACHE_TTL = 60  # 列表/详情接口响应的默认缓存时间（秒），有新数据写入会提前失效
+
+# ==================== 全文搜索配置 ====================
+SEARCH_MIN_TERM_LENGTH = 2  # 关键词最短长度（MySQL ngram分词默认2个字一组）
+SEARCH_MAX_TERMS = 5  # 最多支持的关键词个数（空格分隔）
+SEARCH_SNIPPET_LENGTH = 60  # 摘要长度（字）
+
+# ==================== 请求/响应日志配置 ====================
+LOG_MAX_BYTES = 2048  # 单条请求体/响应数据日志的最大字节数，超出部分截断
+LOG_QUEUE_SIZE = 10000  # 异步日志队列长度，队列满时丢弃新日志，不阻塞请求
+
+# ==================== SQL预算配置 ====================
+QUERY_BUDGET_MAX_COUNT = 20  # 单个请求最多执行的SQL条数，超出打警告日志
+QUERY_BUDGET_MAX_SECONDS = 1.0  # 单个请求SQL总耗时上限（秒），超出打警告日志
+QUERY_REPEAT_THRESHOLD = 5  # 同一条SQL（只有参数不同）重复执行达到这个次数，判定为N+1查询
+
 # ==================== 参数校验提示语 ====================
 MSG_INT_PARAM_INVALID = "%s必须是整数"
 MSG_STR_PARAM_INVALID = "%s必须是字符串"
 MSG_PHONE_INVALID = "请输入有效的11位手机号"
 MSG_EMAIL_INVALID = "请输入有效的邮箱地址"
+MSG_CHOICE_PARAM_INVALID = "%s只能是：%s"
+MSG_DATE_PARAM_INVALID = "%s必须是日期，格式：YYYY-MM-DD"
+MSG_FLOAT_PARAM_INVALID = "%s必须是数字"
+MSG_RANGE_PARAM_INVALID = "%s必须在%s到%s之间"
@@ -0,0 +1,159 @@
+"""
+项目级接口监控：按视图统计耗时、请求数、错误数、响应大小、每个请求的SQL条数和SQL耗时
+新手必看：
+- MetricsMiddleware 放在 settings.MIDDLEWARE 第一个，统计的是整个请求的耗时
+- GET /metrics 返回Prometheus文本格式，给Prometheus定时抓取
+- 指标在进程内聚合（prometheus_client，线程安全），每个请求只做几次计数，开销很小
+- SQL统计用 connection.execute_wrapper 包住本请求的所有查询，不依赖DEBUG
+- 流式响应（导出接口）边查边发，查询发生在视图返回之后：包一层 streaming_content，发完最后一块再记录指标
+- gunicorn多进程部署：启动前设置环境变量 PROMETHEUS_MULTIPROC_DIR=一个空目录，
+  并在 gunicorn.conf.py 里加 child_exit 钩子：
+    from prometheus_client import multiprocess
+    def child_exit(server, worker):
+        multiprocess.mark_process_dead(worker.pid)
+  /metrics 会合并所有worker进程的数据
+"""
+import os
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+
+# 标签：视图类名 + 请求方法（未匹配到路由的请求统一记为 unresolved，避免标签无限增长）
+LABELS = ("view", "method")
+UNRESOLVED_VIEW = "unresolved"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "接口耗时（秒）", LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+REQUEST_COUNT = Counter("http_requests_total", "请求数", (*LABELS, "status"))
+REQUEST_ERRORS = Counter("http_request_errors_total", "出错的请求数（状态码>=500或未捕获异常）", LABELS)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "响应体大小（字节，流式响应按实际发送的字节数）", LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+)
+DB_QUERY_COUNT = Histogram(
+    "http_request_db_queries", "每个请求的SQL条数", LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+)
+DB_QUERY_TIME = Histogram(
+    "http_request_db_seconds", "每个请求的SQL总耗时（秒）", LABELS,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+
+class QueryStats:
+    """
+    execute_wrapper 回调：累计本请求的SQL条数和耗时
+    用法：with connection.execute_wrapper(stats): ...
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def get_view_name(request) -> str:
+    """请求对应的视图名：类视图取类名，函数视图取函数名"""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNRESOLVED_VIEW
+    func = getattr(match.func, "view_class", match.func)
+    return getattr(func, "__name__", UNRESOLVED_VIEW)
+
+
+class MetricsMiddleware:
+    """
+    接口监控中间件：每个请求结束后按(视图, 方法)记录指标
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        started = time.perf_counter()
+        response = None
+        try:
+            with self.record_queries(stats):
+                response = self.get_response(request)
+        finally:
+            if response is None or not response.streaming or response.is_async:
+                self.observe(request, response, stats, time.perf_counter() - started)
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.observe_stream(
+                request, response, response.streaming_content, stats, started
+            )
+        return response
+
+    @staticmethod
+    def record_queries(stats: QueryStats) -> ExitStack:
+        """把所有数据库连接的SQL计入stats"""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        return stack
+
+    def observe_stream(self, request, response, content, stats: QueryStats, started: float):
+        """
+        包装流式响应的内容：发送期间的SQL继续计入stats，发完（或客户端断开）时才记录耗时和SQL
+        :param content: 原来的 streaming_content（包装之前先取出来）
+        """
+        size = 0
+        try:
+            with self.record_queries(stats):
+                for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            self.observe(request, response, stats, time.perf_counter() - started, size)
+
+    @staticmethod
+    def observe(request, response, stats: QueryStats, seconds: float, streamed_bytes: int = None):
+        """
+        记录一个请求的指标
+        :param response: 响应，为None表示视图抛出了未捕获的异常
+        :param streamed_bytes: 流式响应实际发送的字节数
+        """
+        view = get_view_name(request)
+        if view == metrics_view.__name__:
+            return
+        labels = (view, request.method)
+        status_code = response.status_code if response is not None else 500
+
+        REQUEST_LATENCY.labels(*labels).observe(seconds)
+        REQUEST_COUNT.labels(*labels, str(status_code)).inc()
+        if status_code >= 500:
+            REQUEST_ERRORS.labels(*labels).inc()
+        if streamed_bytes is not None:
+            RESPONSE_SIZE.labels(*labels).observe(streamed_bytes)
+        elif response is not None and not response.streaming:
+            RESPONSE_SIZE.labels(*labels).observe(len(response.content))
+        DB_QUERY_COUNT.labels(*labels).observe(stats.count)
+        DB_QUERY_TIME.labels(*labels).observe(stats.seconds)
+
+
+def metrics_view(request):
+    """
+    GET /metrics：Prometheus文本格式的指标
+    设置了 PROMETHEUS_MULTIPROC_DIR 时合并所有worker进程的数据
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
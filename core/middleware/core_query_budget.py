@@ -0,0 +1,41 @@
+"""
+项目级SQL预算检查：每个请求结束后检查SQL条数、SQL总耗时和N+1查询，超预算打警告日志
+新手必看：
+- 默认只在DEBUG时启用，线上可以设置 CORE_QUERY_BUDGET_ENABLED = True 临时打开
+- 预算在settings里配置：CORE_QUERY_MAX_COUNT / CORE_QUERY_MAX_SECONDS / CORE_QUERY_REPEAT_THRESHOLD
+- 单个接口要单独的预算：CORE_QUERY_BUDGETS = {"/api/feellist/network-scene/": {"max_queries": 3}}（按最长前缀匹配）
+- 警告日志里带每条慢SQL的调用位置（仓储方法），方便定位
+"""
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.utils.core_log import logger
+from core.utils.core_queries import budget_violations, record_queries
+
+
+def get_query_budget(path: str) -> dict:
+    """接口的SQL预算：CORE_QUERY_BUDGETS 里最长的匹配前缀，没有配置返回空字典（用全局预算）"""
+    budgets = getattr(settings, "CORE_QUERY_BUDGETS", None) or {}
+    matched = max((prefix for prefix in budgets if path.startswith(prefix)), key=len, default=None)
+    return {} if matched is None else dict(budgets[matched])
+
+
+class QueryBudgetMiddleware:
+    """
+    SQL预算中间件：记录请求内的全部SQL，超预算或有N+1时打警告日志
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "CORE_QUERY_BUDGET_ENABLED", settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        problems = budget_violations(recorder, **get_query_budget(request.path))
+        if problems:
+            logger.warning(
+                f"SQL预算告警 {request.method} {request.path}：\n" + "\n".join(problems) + "\n" + recorder.report()
+            )
+        return response
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheCounter',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='缓存键')),
+                ('value', models.BigIntegerField(verbose_name='计数')),
+            ],
+            options={
+                'verbose_name': '缓存计数器表',
+                'verbose_name_plural': '缓存计数器表',
+                'db_table': 'core_cache_counter',
+            },
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class CacheCounter(models.Model):
+    """计数器表：core.utils.core_counter_cache 缓存后端的存储，目前只放数据版本号"""
+    key = models.CharField(verbose_name="缓存键", max_length=255, primary_key=True)
+    value = models.BigIntegerField(verbose_name="计数")
+
+    class Meta:
+        db_table = "core_cache_counter"
+        verbose_name = "缓存计数器表"
+        verbose_name_plural = "缓存计数器表"
+
+    def __str__(self):
+        return f"{self.key}={self.value}"
@@ -0,0 +1,75 @@
+"""
+项目级缓存工具：按命名空间维护“数据版本号”，让派生缓存在写入后自动失效
+新手必看：
+- 写数据时调用 bump_generation("表名")，版本号+1
+- 读缓存时把 get_generation("表名") 拼进缓存键，写入后旧键自然不再命中，不用逐个删除
+- 版本号放在专用缓存 CACHES["generations"] 里：所有进程共用，而且incr必须是原子的（数据库计数器、Redis），
+  两个进程同时写库时版本号不会少加；没配置这个别名时退回 default 缓存（只适合单进程）
+- 版本号被清掉后会用时间戳重新初始化，不会和之前的版本号撞上
+"""
+import hashlib
+import json
+import time
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import caches
+
+# 版本号缓存键前缀
+GENERATION_KEY_PREFIX = "generation:"
+# 版本号专用的缓存别名
+GENERATION_CACHE_ALIAS = "generations"
+
+
+def generation_cache():
+    """
+    获取存版本号的缓存：优先用 CACHES["generations"]，没配置时用 default
+    :return: 缓存对象
+    """
+    return caches[GENERATION_CACHE_ALIAS if GENERATION_CACHE_ALIAS in settings.CACHES else "default"]
+
+
+def get_generation(namespace: str) -> int:
+    """
+    获取命名空间的当前版本号（不存在时初始化）
+    :param namespace: 命名空间，一般是表名
+    :return: 版本号
+    """
+    cache = generation_cache()
+    key = GENERATION_KEY_PREFIX + namespace
+    generation = cache.get(key)
+    if generation is None:
+        # 用毫秒时间戳初始化：缓存被清空后重新生成的版本号不会和之前的重复
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(namespace: str) -> int:
+    """
+    版本号+1（数据发生变化时调用）
+    :param namespace: 命名空间，一般是表名
+    :return: 新版本号
+    """
+    cache = generation_cache()
+    key = GENERATION_KEY_PREFIX + namespace
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # 键不存在（还没读过或者被淘汰了）：直接初始化成一个新版本
+        get_generation(namespace)
+        return cache.incr(key)
+
+
+def versioned_cache_key(prefix: str, namespace: str, params: Dict) -> str:
+    """
+    拼接带版本号的缓存键：前缀:命名空间:版本号:参数摘要
+    参数字典按键排序后取md5，键的顺序不同也算同一个缓存
+    :param prefix: 缓存用途，比如 response:list
+    :param namespace: 命名空间，一般是表名
+    :param params: 影响结果的参数
+    :return: 缓存键
+    """
+    normalized = json.dumps(params, sort_keys=True, default=str, ensure_ascii=False)
+    digest = hashlib.md5(normalized.encode("utf-8")).hexdigest()
+    return f"{prefix}:{namespace}:{get_generation(namespace)}:{digest}"
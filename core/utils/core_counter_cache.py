@@ -0,0 +1,67 @@
+"""
+数据库计数器缓存后端：给数据版本号（core.utils.core_cache）用的专用缓存，存在 core_cache_counter 表里
+新手必看：
+- incr 是一条 UPDATE ... SET value = value + 1（F表达式），不是“先读再写”，多个进程同时+1也不会少加
+- 所有进程、所有机器共用同一个数据库，导入命令写库后Web进程立即看到新版本号
+- 在写库的事务里+1时，事务回滚版本号也跟着回滚，不会出现“数据没变、缓存全失效”
+- 只能存整数，不支持过期时间（计数器一直有效），不要当普通缓存用
+- 有Redis时也可以把 CACHES["generations"] 换成 RedisCache（INCR同样是原子的），代码不用改
+
+配置：
+    CACHES = {
+        "default": {...},
+        "generations": {"BACKEND": "core.utils.core_counter_cache.DatabaseCounterCache"},
+    }
+"""
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db.models import F
+
+
+class DatabaseCounterCache(BaseCache):
+    """数据库计数器缓存：只支持整数值，incr原子"""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+
+    @staticmethod
+    def _queryset():
+        # 延迟导入：缓存配置在应用加载前就会被读取
+        from core.models import CacheCounter
+        return CacheCounter.objects
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        value = self._queryset().filter(key=key).values_list("value", flat=True).first()
+        return default if value is None else value
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        # get_or_create 并发时唯一键冲突会重新查一次，只有一个进程能写入初始值
+        _, created = self._queryset().get_or_create(key=key, defaults={"value": int(value)})
+        return created
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._queryset().update_or_create(key=key, defaults={"value": int(value)})
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        # 计数器不过期，存在即成功
+        return self.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        """
+        原子加减：数据库里直接 value = value + delta
+        :return: 加完后的值（并发时可能已经包含了其他进程随后的+1）
+        """
+        key = self.make_and_validate_key(key, version=version)
+        if not self._queryset().filter(key=key).update(value=F("value") + delta):
+            raise ValueError("Key '%s' not found" % key)
+        return self._queryset().filter(key=key).values_list("value", flat=True).get()
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        deleted, _ = self._queryset().filter(key=key).delete()
+        return bool(deleted)
+
+    def clear(self):
+        self._queryset().all().delete()
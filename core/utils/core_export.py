@@ -0,0 +1,53 @@
+"""
+项目级通用导出工具：把逐行产生的数据流式输出成CSV / NDJSON
+新手必看：
+- 配合StreamingHttpResponse使用，边查边发，不会把整个文件拼在内存里
+- 行数据是字典，列顺序由columns决定
+"""
+import csv
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class _EchoBuffer:
+    """csv.writer需要一个文件对象：这里write直接返回内容，不做缓存"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _csv_value(value: Any) -> Any:
+    """CSV单元格取值：时间统一成ISO格式，空值输出空字符串"""
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(rows: Iterable[Dict], columns: List[str]) -> Iterator[str]:
+    """
+    流式生成CSV
+    :param rows: 行数据（字典）迭代器
+    :param columns: 列名列表，同时作为表头
+    :return: CSV文本片段迭代器
+    """
+    writer = csv.writer(_EchoBuffer())
+    # 带BOM，Excel打开中文不乱码
+    yield "\ufeff" + writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(row.get(column)) for column in columns])
+
+
+def stream_ndjson(rows: Iterable[Dict], columns: List[str]) -> Iterator[str]:
+    """
+    流式生成NDJSON（每行一个JSON对象）
+    :param rows: 行数据（字典）迭代器
+    :param columns: 列名列表（决定每个对象的键顺序）
+    :return: NDJSON文本片段迭代器
+    """
+    for row in rows:
+        item = {column: row.get(column) for column in columns}
+        yield json.dumps(item, ensure_ascii=False, cls=DjangoJSONEncoder) + "\n"
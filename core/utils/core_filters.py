@@ -4,9 +4,15 @@
 - 去掉参数空格、转换类型、校验格式
 - 不用在每个接口里写重复的校验代码
 """
-from typing import Dict, Any
+from datetime import date, datetime
+from typing import Dict, Any, Iterable, List, Optional
 
-from core.constants.core_constants import MSG_INT_PARAM_INVALID, MSG_STR_PARAM_INVALID
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.constants.core_constants import (
+    MSG_INT_PARAM_INVALID, MSG_STR_PARAM_INVALID, MSG_CHOICE_PARAM_INVALID, MSG_DATE_PARAM_INVALID,
+    MSG_FLOAT_PARAM_INVALID, MSG_RANGE_PARAM_INVALID
+)
 from core.exceptions.core_exceptions import ParamError
 
 
@@ -51,6 +57,28 @@ def validate_int(value: Any, param_name: str = "参数") -> int:
         raise ParamError(detail=MSG_INT_PARAM_INVALID % param_name)
 
 
+def validate_float(value: Any, param_name: str = "参数", min_value: Optional[float] = None,
+                   max_value: Optional[float] = None) -> float:
+    """
+    校验并转换为浮点数（可选范围校验，包含边界）
+    :param value: 要校验的值
+    :param param_name: 参数名（用于错误提示）
+    :param min_value: 最小值
+    :param max_value: 最大值
+    :return: 浮点数
+    :raise ParamError: 校验失败抛出异常
+    """
+    try:
+        result = float(value)
+    except (ValueError, TypeError):
+        raise ParamError(detail=MSG_FLOAT_PARAM_INVALID % param_name)
+    # NaN和任何数比较都是False，这里一并拦掉
+    if not result == result or (min_value is not None and result < min_value) or \
+            (max_value is not None and result > max_value):
+        raise ParamError(detail=MSG_RANGE_PARAM_INVALID % (param_name, min_value, max_value))
+    return result
+
+
 def validate_str(value: Any, param_name: str = "参数") -> str:
     """
     校验并转换为字符串
@@ -64,6 +92,60 @@ def validate_str(value: Any, param_name: str = "参数") -> str:
     return str(value).strip()
 
 
+def validate_date(value: Any, param_name: str = "日期") -> date:
+    """
+    校验并转换为日期（支持 2025-01-01 或 2025-01-01T08:00:00，时间部分会被忽略）
+    :param value: 要校验的值
+    :param param_name: 参数名
+    :return: 日期
+    :raise ParamError: 校验失败抛出异常
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = validate_str(value, param_name)
+    try:
+        parsed = parse_date(text) or parse_datetime(text)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ParamError(detail=MSG_DATE_PARAM_INVALID % param_name)
+    return parsed.date() if isinstance(parsed, datetime) else parsed
+
+
+def validate_choice(value: Any, choices: Iterable[str], param_name: str = "参数") -> str:
+    """
+    校验参数是否在可选值范围内
+    :param value: 要校验的值
+    :param choices: 可选值列表
+    :param param_name: 参数名
+    :return: 字符串
+    :raise ParamError: 不在可选值范围内时抛出异常
+    """
+    choices = tuple(choices)
+    value = validate_str(value, param_name)
+    if value not in choices:
+        raise ParamError(detail=MSG_CHOICE_PARAM_INVALID % (param_name, "/".join(choices)))
+    return value
+
+
+def parse_list_param(value: Any) -> Optional[List[str]]:
+    """
+    解析逗号分隔的列表参数，比如 fields=cell_id,latitude,longitude
+    :param value: 原始参数值
+    :return: 去空格、去重后的列表（保持原顺序），参数为空时返回None
+    """
+    if value is None:
+        return None
+    items = []
+    for item in str(value).split(","):
+        item = item.strip()
+        if item and item not in items:
+            items.append(item)
+    return items or None
+
+
 # ==================== 业务常用校验函数 ====================
 def validate_phone(value: str) -> str:
     """
@@ -3,12 +3,27 @@
 新手必看：
 - 日志会自动美化，带时间、级别
 - 调试时看控制台，能清楚看到请求参数和流程
+- 默认异步输出：接口线程只把日志放进队列，由后台线程写控制台，不拖慢接口（后台线程每个进程各一个，第一次写日志时启动）
+- 请求体、响应数据超过 settings.CORE_LOG_MAX_BYTES 字节会截断，响应再大打日志的耗时也有上限
+- 按接口采样：settings.CORE_LOG_SAMPLE_RATES = {"/api/feellist/network-scene/": 0.1} 表示该前缀的接口只记10%的请求
+  （按最长前缀匹配，出错的响应（状态码>=400）总是记录）
 """
+import atexit
 import logging
+import os
+import queue
+import random
+import threading
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, List
 
 import coloredlogs
+from django.conf import settings
 from django.http import HttpRequest
 
+from core.constants.core_constants import LOG_MAX_BYTES, LOG_QUEUE_SIZE
+
 # 配置日志
 logger = logging.getLogger("network_optimization")  # 项目名作为日志名
 
@@ -20,19 +35,176 @@ coloredlogs.install(
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 
+# 当前请求是否被采样记录（log_request 决定，同一请求的 log_response 沿用）
+_sampled = ContextVar("core_log_sampled", default=True)
+
+
+class DrainingQueueListener(QueueListener):
+    """
+    停止时等队列腾出位置再放结束标记：队列满时 stop() 不会抛 queue.Full，剩余日志照样写完；
+    重复调用 stop()（手动停止后进程退出时atexit再调一次）直接返回
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    队列满时直接丢弃日志（计数），不阻塞接口线程
+    后台监听线程在每个进程第一次写日志时才启动（按进程号判断）：
+    fork出来的子进程（比如 gunicorn --preload 的worker）没有父进程的线程，会新建自己的队列和监听线程，
+    避免往没人消费的队列里写（写满之后日志会被全部丢弃）
+    """
+
+    def __init__(self, targets: List[logging.Handler], maxsize: int = LOG_QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize))
+        self.targets = targets
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def ensure_listener(self) -> QueueListener:
+        """当前进程还没有监听线程时新建队列并启动（进程退出时自动停止并写完剩余日志）"""
+        if self._pid != os.getpid():
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    self.queue = queue.Queue(self.maxsize)
+                    self.listener = DrainingQueueListener(self.queue, *self.targets, respect_handler_level=True)
+                    self.listener.start()
+                    atexit.register(self.listener.stop)
+                    self._pid = os.getpid()
+        return self.listener
+
+    def enqueue(self, record: logging.LogRecord):
+        self.ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def install_queue_logging(target: logging.Logger, maxsize: int = LOG_QUEUE_SIZE) -> DroppingQueueHandler:
+    """
+    把日志器现有的输出（控制台等）挪到后台线程：日志器只挂一个队列处理器
+    导入时只替换处理器，不启动线程；监听线程由每个进程第一次写日志时启动
+    :param target: 日志器
+    :param maxsize: 队列长度
+    :return: 队列处理器（listener属性是当前进程的后台监听器）
+    """
+    handlers = list(target.handlers)
+    for handler in handlers:
+        target.removeHandler(handler)
+    queue_handler = DroppingQueueHandler(handlers, maxsize)
+    target.addHandler(queue_handler)
+    return queue_handler
+
+
+if getattr(settings, "CORE_LOG_ASYNC", True):
+    install_queue_logging(logger)
 
+
+# ==================== 截断、采样工具 ====================
+class _Truncated(Exception):
+    """字节预算用完"""
+
+
+class _BoundedWriter:
+    """按字节预算拼接字符串，预算用完抛出 _Truncated"""
+
+    def __init__(self, max_bytes: int):
+        self.parts = []
+        self.remaining = max_bytes
+
+    def write(self, text: str):
+        data = text.encode("utf-8")
+        if len(data) > self.remaining:
+            self.parts.append(data[:self.remaining].decode("utf-8", "ignore"))
+            self.remaining = 0
+            raise _Truncated
+        self.parts.append(text)
+        self.remaining -= len(data)
+
+
+def _write_value(writer: _BoundedWriter, value: Any):
+    """按repr的格式逐项写入，遇到大列表/长字符串不会先整体格式化"""
+    if isinstance(value, dict):
+        writer.write("{")
+        for index, (key, item) in enumerate(value.items()):
+            writer.write(f"{', ' if index else ''}{key!r}: ")
+            _write_value(writer, item)
+        writer.write("}")
+    elif isinstance(value, (list, tuple)):
+        writer.write("[")
+        for index, item in enumerate(value):
+            if index:
+                writer.write(", ")
+            _write_value(writer, item)
+        writer.write("]")
+    elif isinstance(value, (str, bytes)):
+        # 先按预算切片再repr，超长字符串不会整段转义
+        writer.write(repr(value[:writer.remaining + 1]))
+    else:
+        writer.write(repr(value))
+
+
+def truncate_repr(value: Any, max_bytes: int = None) -> str:
+    """
+    把数据转成日志字符串（格式同repr），超过字节预算的部分截断
+    :param value: 要打印的数据（dict/list/str等）
+    :param max_bytes: 字节预算，为空时读取 settings.CORE_LOG_MAX_BYTES
+    :return: 日志字符串
+    """
+    if max_bytes is None:
+        max_bytes = getattr(settings, "CORE_LOG_MAX_BYTES", LOG_MAX_BYTES)
+    writer = _BoundedWriter(max_bytes)
+    try:
+        _write_value(writer, value)
+    except _Truncated:
+        return "".join(writer.parts) + f"...(已截断，超过{max_bytes}字节)"
+    return "".join(writer.parts)
+
+
+def get_sample_rate(path: str) -> float:
+    """
+    接口的日志采样率：按 settings.CORE_LOG_SAMPLE_RATES 里最长的匹配前缀
+    :param path: 请求路径
+    :return: 采样率（0~1），没有配置时为1（全部记录）
+    """
+    rates = getattr(settings, "CORE_LOG_SAMPLE_RATES", None) or {}
+    matched = max((prefix for prefix in rates if path.startswith(prefix)), key=len, default=None)
+    return 1.0 if matched is None else float(rates[matched])
+
+
+# ==================== 请求/响应日志 ====================
 def log_request(request: HttpRequest):
     """
     打印请求日志
     :param request: Django/DRF的请求对象
     """
+    rate = get_sample_rate(request.path)
+    sampled = rate >= 1 or random.random() < rate
+    _sampled.set(sampled)
+    if not sampled:
+        return
+
     logger.info("===== 接收到新请求 =====")
     logger.info(f"请求路径: {request.path}")
     logger.info(f"请求方法: {request.method}")
     logger.info(f"客户端IP: {request.META.get('REMOTE_ADDR')}")
-    logger.info(f"URL参数: {dict(request.GET)}")
+    logger.info(f"URL参数: {truncate_repr(dict(request.GET))}")
     if request.body:
-        logger.info(f"请求体: {request.body.decode('utf-8')}")
+        max_bytes = getattr(settings, "CORE_LOG_MAX_BYTES", LOG_MAX_BYTES)
+        body = request.body[:max_bytes].decode("utf-8", "ignore")
+        if len(request.body) > max_bytes:
+            body += f"...(已截断，共{len(request.body)}字节)"
+        logger.info(f"请求体: {body}")
     logger.info("=======================\n")
 
 
@@ -42,7 +214,15 @@ def log_response(data: dict, status_code: int):
     :param data: 响应数据
     :param status_code: 响应状态码
     """
+    sampled = _sampled.get()
+    # 采样决定只对当前请求有效，避免同一线程的下一个请求沿用
+    _sampled.set(True)
+    if not sampled and status_code < 400:
+        return
+
     logger.info("===== 发送响应数据 =====")
     logger.info(f"状态码: {status_code}")
-    logger.info(f"响应数据: {data}")
+    if isinstance(data, dict) and isinstance(data.get("list"), list):
+        logger.info(f"列表条数: {len(data['list'])}")
+    logger.info(f"响应数据: {truncate_repr(data)}")
     logger.info("=======================\n")
@@ -4,23 +4,22 @@
 - 支持所有可迭代对象（列表、查询集等）
 - 自动处理页码越界、每页条数超限
 """
-from typing import List, Tuple, Any
+import base64
+import json
+from typing import List, Tuple, Any, Optional
+
+from django.db.models import QuerySet
 
 from core.constants.core_constants import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from core.exceptions.core_exceptions import ParamError
 
 
-def paginate_data(
-        data: List[Any],
-        page: int = DEFAULT_PAGE,
-        page_size: int = DEFAULT_PAGE_SIZE
-) -> Tuple[List[Any], int]:
+def normalize_page_params(page: Any = DEFAULT_PAGE, page_size: Any = DEFAULT_PAGE_SIZE) -> Tuple[int, int]:
     """
-    通用分页函数
-    :param data: 要分页的原始数据列表
-    :param page: 当前页码
-    :param page_size: 每页条数
-    :return: (分页后的数据列表, 总条数)
+    校验并规范分页参数
+    :param page: 当前页码（可以是字符串）
+    :param page_size: 每页条数（可以是字符串）
+    :return: (页码, 每页条数)
     :raise ParamError: 页码或每页条数非法时抛出异常
     """
     # 步骤1：校验并转换分页参数
@@ -34,6 +33,24 @@ def paginate_data(
     page_size_int = max(1, min(page_size_int, MAX_PAGE_SIZE))
     # 步骤3：限制页码的范围（至少是第1页）
     page_int = max(1, page_int)
+    return page_int, page_size_int
+
+
+def paginate_data(
+        data: List[Any],
+        page: int = DEFAULT_PAGE,
+        page_size: int = DEFAULT_PAGE_SIZE
+) -> Tuple[List[Any], int]:
+    """
+    通用分页函数
+    :param data: 要分页的原始数据列表
+    :param page: 当前页码
+    :param page_size: 每页条数
+    :return: (分页后的数据列表, 总条数)
+    :raise ParamError: 页码或每页条数非法时抛出异常
+    """
+    # 步骤1~3：校验并规范分页参数
+    page_int, page_size_int = normalize_page_params(page, page_size)
 
     # 步骤4：计算切片范围
     total = len(data)
@@ -46,3 +63,84 @@ def paginate_data(
 
     # 步骤6：返回分页数据和总条数
     return data[start:end], total
+
+
+def paginate_queryset(
+        queryset: QuerySet,
+        page: int = DEFAULT_PAGE,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        total: Optional[int] = None
+) -> Tuple[List[Any], int]:
+    """
+    数据库分页函数：分页下推到SQL，只发一条COUNT(*)和一条LIMIT/OFFSET查询
+    新手必看：
+    - 不会把整张表加载到内存，表再大内存占用也不变
+    - 返回格式和paginate_data一致，可以直接替换
+    :param queryset: 未执行的查询集（必须已排序）
+    :param page: 当前页码
+    :param page_size: 每页条数
+    :param total: 已知的总条数（比如估算值），传了就不再COUNT(*)
+    :return: (分页后的数据列表, 总条数)
+    :raise ParamError: 页码或每页条数非法时抛出异常
+    """
+    page_int, page_size_int = normalize_page_params(page, page_size)
+    start = (page_int - 1) * page_size_int
+
+    if total is None:
+        # 步骤1：COUNT(*)统计总条数
+        total = queryset.count()
+        # 步骤2：页码越界直接返回空列表，不再发起查询
+        if start >= total:
+            return [], total
+
+    # 步骤3：切片 → SQL的LIMIT/OFFSET
+    return list(queryset[start:start + page_size_int]), total
+
+
+def paginate_queryset_without_count(
+        queryset: QuerySet,
+        page: int = DEFAULT_PAGE,
+        page_size: int = DEFAULT_PAGE_SIZE
+) -> Tuple[List[Any], bool]:
+    """
+    不统计总数的数据库分页：多查一条判断是否有下一页
+    :param queryset: 未执行的查询集（必须已排序）
+    :param page: 当前页码
+    :param page_size: 每页条数
+    :return: (分页后的数据列表, 是否有下一页)
+    :raise ParamError: 页码或每页条数非法时抛出异常
+    """
+    page_int, page_size_int = normalize_page_params(page, page_size)
+    start = (page_int - 1) * page_size_int
+    rows = list(queryset[start:start + page_size_int + 1])
+    return rows[:page_size_int], len(rows) > page_size_int
+
+
+# ==================== 游标分页（keyset）工具 ====================
+def encode_cursor(values: List[Any]) -> str:
+    """
+    把最后一行的排序键编码成不透明游标
+    :param values: 排序键的值列表，比如[日期字符串, ID]
+    :return: URL安全的游标字符串
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    """
+    解析游标
+    :param cursor: encode_cursor生成的游标，为空表示第一页
+    :return: 排序键的值列表，第一页返回None
+    :raise ParamError: 游标被篡改或格式错误时抛出异常
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, TypeError, UnicodeError):
+        raise ParamError(detail="游标参数无效")
+    if not isinstance(values, list) or not values:
+        raise ParamError(detail="游标参数无效")
+    return values
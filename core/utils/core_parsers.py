@@ -0,0 +1,35 @@
+"""
+项目级通用请求体解析器：补充DRF默认解析器不支持的格式
+新手必看：
+- NDJSON：每行一个JSON对象，适合批量推送大量数据
+- 在视图的parser_classes里加上就能用
+"""
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    NDJSON解析器：Content-Type为application/x-ndjson时生效
+    解析结果是字典列表，和JSON数组请求体的解析结果格式一致
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        rows = []
+        # 逐行读取，不需要先把整个请求体解码成一个大字符串
+        for line_no, line in enumerate(codecs.getreader(encoding)(stream), 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as exc:
+                raise ParseError(f"第{line_no}行不是合法的JSON：{exc}")
+        return rows
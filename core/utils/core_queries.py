@@ -0,0 +1,163 @@
+"""
+项目级SQL记录工具：记录一段代码执行的每条SQL（语句、耗时、调用位置），检查SQL预算和N+1查询
+新手必看：
+- with record_queries() as recorder: ... 结束后 recorder.queries 就是期间执行的全部SQL
+- 调用位置取项目代码里离SQL最近的一层（比如某个仓储方法），一眼看出是谁发的查询
+- N+1：同一条SQL只有参数不同、却执行了很多次，一般是循环里逐条查库，应该改成一次批量查询
+- 请求级检查见 core.middleware.core_query_budget，测试断言见 core.utils.core_testing
+"""
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import connections
+
+from core.constants.core_constants import (
+    QUERY_BUDGET_MAX_COUNT, QUERY_BUDGET_MAX_SECONDS, QUERY_REPEAT_THRESHOLD
+)
+
+# 项目根目录：调用位置只认这个目录下、且不在第三方包里的代码
+_PROJECT_ROOT = str(getattr(settings, "BASE_DIR", os.getcwd()))
+_SKIP_PATH_PARTS = ("site-packages", "dist-packages", os.path.join("core", "utils", "core_queries.py"))
+
+# 归一化SQL：数字字面量、IN列表里的多个占位符 都视为相同
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_IN_LIST_RE = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+
+
+class QueryRecord:
+    """一条SQL的记录"""
+    __slots__ = ("sql", "seconds", "caller")
+
+    def __init__(self, sql: str, seconds: float, caller: Optional[str]):
+        self.sql = sql
+        self.seconds = seconds
+        self.caller = caller
+
+
+class QueryRecorder:
+    """
+    execute_wrapper 回调：记录每条SQL的语句、耗时、调用位置
+    """
+
+    def __init__(self, capture_caller: bool = True):
+        self.capture_caller = capture_caller
+        self.queries: List[QueryRecord] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            caller = find_caller() if self.capture_caller else None
+            self.queries.append(QueryRecord(sql, time.perf_counter() - started, caller))
+
+    @property
+    def count(self) -> int:
+        """SQL条数"""
+        return len(self.queries)
+
+    @property
+    def seconds(self) -> float:
+        """SQL总耗时（秒）"""
+        return sum(query.seconds for query in self.queries)
+
+    def repeated(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> List[Dict]:
+        """
+        找出重复执行的查询语句（N+1）
+        :param threshold: 重复次数达到多少算N+1
+        :return: [{"sql": 归一化后的SQL, "count": 次数, "callers": 调用位置列表}]，按次数倒序
+        """
+        groups = defaultdict(list)
+        for query in self.queries:
+            # 只看查询语句：批量INSERT/UPDATE按batch_size拆成多条是正常的
+            if query.sql.lstrip()[:6].upper() == "SELECT":
+                groups[normalize_sql(query.sql)].append(query)
+        result = [
+            {
+                "sql": sql,
+                "count": len(queries),
+                "callers": sorted({query.caller for query in queries if query.caller}),
+            }
+            for sql, queries in groups.items() if len(queries) >= threshold
+        ]
+        return sorted(result, key=lambda item: item["count"], reverse=True)
+
+    def report(self, limit: int = 10) -> str:
+        """最慢的几条SQL（耗时、调用位置、语句），用于日志和断言失败信息"""
+        lines = [f"共 {self.count} 条SQL，总耗时 {self.seconds * 1000:.1f}ms"]
+        for query in sorted(self.queries, key=lambda item: item.seconds, reverse=True)[:limit]:
+            lines.append(f"  {query.seconds * 1000:8.1f}ms  {query.caller or '-'}  {query.sql[:300]}")
+        return "\n".join(lines)
+
+
+def normalize_sql(sql: str) -> str:
+    """归一化SQL：去掉只影响参数的差异（数字字面量、IN列表长度），用来判断是不是同一条查询"""
+    return _IN_LIST_RE.sub("(...)", _NUMBER_RE.sub("?", sql))
+
+
+def find_caller() -> Optional[str]:
+    """调用栈里离当前SQL最近的项目代码位置，格式：文件:行号 函数名"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_ROOT) and not any(part in filename for part in _SKIP_PATH_PARTS):
+            return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+@contextmanager
+def record_queries(capture_caller: bool = True) -> Iterator[QueryRecorder]:
+    """
+    记录with块内所有数据库连接执行的SQL
+    用法：
+        with record_queries() as recorder:
+            service.get_list(filters)
+        print(recorder.count, recorder.report())
+    :param capture_caller: 是否记录调用位置（要遍历调用栈，开销稍大）
+    :return: QueryRecorder
+    """
+    recorder = QueryRecorder(capture_caller)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
+
+
+def budget_violations(
+        recorder: QueryRecorder,
+        max_queries: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        repeat_threshold: Optional[int] = None
+) -> List[str]:
+    """
+    检查SQL预算，返回超预算的说明（没有超预算返回空列表）
+    参数为空时读取settings：CORE_QUERY_MAX_COUNT / CORE_QUERY_MAX_SECONDS / CORE_QUERY_REPEAT_THRESHOLD
+    :param recorder: record_queries 的记录结果
+    :param max_queries: SQL条数上限
+    :param max_seconds: SQL总耗时上限（秒）
+    :param repeat_threshold: 同一条SQL重复多少次算N+1
+    :return: 超预算说明列表
+    """
+    if max_queries is None:
+        max_queries = getattr(settings, "CORE_QUERY_MAX_COUNT", QUERY_BUDGET_MAX_COUNT)
+    if max_seconds is None:
+        max_seconds = getattr(settings, "CORE_QUERY_MAX_SECONDS", QUERY_BUDGET_MAX_SECONDS)
+    if repeat_threshold is None:
+        repeat_threshold = getattr(settings, "CORE_QUERY_REPEAT_THRESHOLD", QUERY_REPEAT_THRESHOLD)
+
+    problems = []
+    if recorder.count > max_queries:
+        problems.append(f"SQL条数 {recorder.count} 超过预算 {max_queries}")
+    if recorder.seconds > max_seconds:
+        problems.append(f"SQL总耗时 {recorder.seconds * 1000:.1f}ms 超过预算 {max_seconds * 1000:.0f}ms")
+    for item in recorder.repeated(repeat_threshold):
+        callers = "，".join(item["callers"]) or "-"
+        problems.append(f"疑似N+1：同一条SQL执行了 {item['count']} 次（调用位置：{callers}）：{item['sql'][:300]}")
+    return problems
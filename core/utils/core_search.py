@@ -0,0 +1,62 @@
+"""
+项目级搜索工具：关键词解析、MySQL全文检索语句、结果摘要
+新手必看：
+- 关键词按空格拆分，每个词都必须命中（AND）
+- MySQL用 MATCH ... AGAINST（BOOLEAN MODE，每个词按短语匹配），其他数据库由仓储层退回LIKE
+- 摘要：截取第一个命中关键词附近的一段文字，前端可以直接高亮
+"""
+import re
+from typing import List, Optional
+
+from core.constants.core_constants import SEARCH_MIN_TERM_LENGTH, SEARCH_MAX_TERMS, SEARCH_SNIPPET_LENGTH
+from core.exceptions.core_exceptions import ParamError
+
+# BOOLEAN MODE里有特殊含义的字符，关键词里出现时直接去掉
+BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+
+def parse_search_terms(keyword: Optional[str]) -> List[str]:
+    """
+    解析搜索关键词
+    :param keyword: 原始关键词，多个词用空格分隔
+    :return: 去重后的关键词列表
+    :raise ParamError: 关键词为空、太短或太多时抛出异常
+    """
+    terms = []
+    for term in BOOLEAN_OPERATORS.sub(" ", keyword or "").split():
+        if term not in terms:
+            terms.append(term)
+    if not terms:
+        raise ParamError(detail="搜索关键词不能为空")
+    if len(terms) > SEARCH_MAX_TERMS:
+        raise ParamError(detail=f"最多支持{SEARCH_MAX_TERMS}个关键词")
+    if any(len(term) < SEARCH_MIN_TERM_LENGTH for term in terms):
+        raise ParamError(detail=f"每个关键词至少{SEARCH_MIN_TERM_LENGTH}个字")
+    return terms
+
+
+def boolean_query(terms: List[str]) -> str:
+    """关键词 → MySQL BOOLEAN MODE 查询串：+"词1" +"词2"（每个词都必须出现，词内按短语匹配）"""
+    return " ".join(f'+"{term}"' for term in terms)
+
+
+def build_snippet(text: Optional[str], terms: List[str], length: int = SEARCH_SNIPPET_LENGTH) -> Optional[str]:
+    """
+    截取命中关键词附近的摘要
+    :param text: 原文
+    :param terms: 关键词列表
+    :param length: 摘要长度
+    :return: 摘要（前后被截断时加省略号），没有命中时返回None
+    """
+    if not text:
+        return None
+    lowered = text.lower()
+    positions = [lowered.find(term.lower()) for term in terms]
+    positions = [position for position in positions if position >= 0]
+    if not positions:
+        return None
+    # 让第一个命中的词落在摘要前三分之一
+    start = max(0, min(positions) - length // 3)
+    end = min(len(text), start + length)
+    start = max(0, end - length)
+    return f"{'…' if start > 0 else ''}{text[start:end]}{'…' if end < len(text) else ''}"
@@ -0,0 +1,62 @@
+"""
+项目级测试工具：断言接口或代码块的SQL预算
+新手必看：
+- 防止“每一步筛选都count()一次”、循环里逐条查库之类的写法混进来
+- 超预算时断言失败信息里带每条SQL的耗时和调用位置
+
+用法1：断言代码块
+    with assert_query_budget(max_queries=2):
+        NetworkSceneDataService().get_list({"city": 11201})
+用法2：断言接口
+    assert_endpoint_query_budget(self.client, "/api/feellist/network-scene/", max_queries=2, page_size=100)
+"""
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from core.utils.core_queries import QueryRecorder, budget_violations, record_queries
+
+
+@contextmanager
+def assert_query_budget(
+        max_queries: int,
+        max_seconds: Optional[float] = None,
+        repeat_threshold: Optional[int] = None
+) -> Iterator[QueryRecorder]:
+    """
+    断言with块内的SQL条数、总耗时不超预算，且没有N+1查询
+    :param max_queries: SQL条数上限
+    :param max_seconds: SQL总耗时上限（秒），为空时读取 settings.CORE_QUERY_MAX_SECONDS
+    :param repeat_threshold: 同一条SQL重复多少次算N+1，为空时读取 settings.CORE_QUERY_REPEAT_THRESHOLD
+    :return: QueryRecorder（with块结束后可以继续检查）
+    :raise AssertionError: 超预算时抛出
+    """
+    with record_queries() as recorder:
+        yield recorder
+    problems = budget_violations(recorder, max_queries, max_seconds, repeat_threshold)
+    if problems:
+        raise AssertionError("\n".join(problems) + "\n" + recorder.report())
+
+
+def assert_endpoint_query_budget(
+        client,
+        path: str,
+        max_queries: int,
+        max_seconds: Optional[float] = None,
+        method: str = "get",
+        **params
+):
+    """
+    请求一次接口并断言SQL预算
+    :param client: django.test.Client 或 DRF的APIClient
+    :param path: 接口路径
+    :param max_queries: SQL条数上限
+    :param max_seconds: SQL总耗时上限（秒）
+    :param method: 请求方法（get/post/...）
+    :param params: 请求参数（GET为URL参数，其他方法为请求体）
+    :return: 响应对象
+    :raise AssertionError: 超预算或接口返回5xx时抛出
+    """
+    with assert_query_budget(max_queries, max_seconds):
+        response = getattr(client, method.lower())(path, params)
+    assert response.status_code < 500, f"{method.upper()} {path} 返回 {response.status_code}"
+    return response
@@ -67,3 +67,26 @@ COMPLAINT_STATUS_CHOICES = [
 ]
 # ==================== 区域类型 ====================
 AREA_CHOICES = [(0, "农村"), (1, "乡镇"), (2, "城市"), (3, "县城")]
+
+# ==================== 选择字段解码表 ====================
+# 字段名 → {编码: 名称}，导出数据等场景把编码翻译成友好名称
+CHOICE_LABEL_MAPS = {
+    "city": CITY_NAME_MAP,
+    "net_type": dict(NET_TYPE_CHOICES),
+    "scene_level1": dict(SCENE_LEVEL1_CHOICES),
+    "manufacturer": dict(MANUFACTURER_CHOICES),
+    "contractor": dict(CONTRACTOR_CHOICES),
+    "indoor_outdoor": dict(INDOOR_OUTDOOR_CHOICES),
+    "has_complaint": dict(COMPLAINT_STATUS_CHOICES),
+    "area": dict(AREA_CHOICES),
+}
+
+
+def choice_label(labels: dict, value):
+    """
+    编码 → 友好名称，和 Model.get_xxx_display 的规则一致：空值返回None，查不到的编码原样转成字符串
+    列表/详情接口、导出都用这个规则，同一个编码在JSON和CSV里显示一样
+    """
+    if value is None:
+        return None
+    return str(labels.get(value, value))
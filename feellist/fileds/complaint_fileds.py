@@ -113,3 +113,8 @@ def complaint_fields():
                                                         blank=True),
         'special_user_identifier': models.CharField(verbose_name="特殊用户标识", max_length=32, null=True, blank=True),
     }
+
+
+def complaint_text_field_names():
+    """投诉工单里的大文本字段（TextField）名：列表查询默认不查这些列"""
+    return [name for name, field in complaint_fields().items() if isinstance(field, models.TextField)]
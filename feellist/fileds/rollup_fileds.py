@@ -0,0 +1,20 @@
+from django.db import models
+
+from feellist.fileds.cell_indicator_fileds import cell_indicator_fields
+
+
+# 汇总字段组件：生成小区数据日汇总表的度量字段
+def rollup_measure_fields():
+    """生成汇总度量字段：小区数、投诉数、评分统计，以及每个小区指标的合计值和有效数（用于还原均值）"""
+    fields = {
+        "cell_count": models.IntegerField(verbose_name="小区数", default=0),
+        "complaint_count": models.IntegerField(verbose_name="有投诉小区数", default=0),
+        "score_sum": models.FloatField(verbose_name="小区评分合计", null=True, blank=True),
+        "score_count": models.IntegerField(verbose_name="小区评分有效数", default=0),
+        "score_min": models.FloatField(verbose_name="小区评分最小值", null=True, blank=True),
+        "score_max": models.FloatField(verbose_name="小区评分最大值", null=True, blank=True),
+    }
+    for name, field in cell_indicator_fields().items():
+        fields[f"{name}_sum"] = models.FloatField(verbose_name=f"{field.verbose_name}_合计", null=True, blank=True)
+        fields[f"{name}_count"] = models.IntegerField(verbose_name=f"{field.verbose_name}_有效数", default=0)
+    return fields
@@ -0,0 +1,109 @@
+"""
+CSV导入命令基类：主进程流式读文件+写库，进程池并行解析校验
+新手必看：
+- 子类只需要指定model和repository_class，再写好用法说明（docstring）
+- 默认按仓储的自然键upsert（repository.bulk_upsert），--insert-only直接插入
+- 文件按块读取，最多同时在途 2*进程数 块，几百万行的文件内存占用也有上限
+"""
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.constants.core_constants import BULK_BATCH_SIZE
+from feellist.importers.csv_rows import (
+    build_header_mapping, resolve_header, iter_csv_chunks, parse_chunk, init_worker
+)
+
+
+class CsvImportCommand(BaseCommand):
+    """
+    CSV导入命令基类
+    """
+    # 子类必须指定：导入的模型、写库用的仓储类
+    model = None
+    repository_class = None
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', type=str, help='CSV文件路径')
+        parser.add_argument('--encoding', type=str, default='utf-8-sig', help='文件编码（默认utf-8-sig，兼容BOM）')
+        parser.add_argument('--delimiter', type=str, default=',', help='分隔符（默认逗号）')
+        parser.add_argument('--workers', type=int, default=None, help='解析校验的进程数（默认CPU核数）')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='每个解析任务的行数')
+        parser.add_argument('--batch-size', type=int, default=BULK_BATCH_SIZE, help='每条INSERT语句的行数')
+        parser.add_argument('--max-errors', type=int, default=20, help='最多打印的错误行数')
+        parser.add_argument('--dry-run', action='store_true', help='只解析校验，不写库')
+        parser.add_argument('--insert-only', action='store_true', help='直接插入，不做upsert')
+
+    def handle(self, *args, **options):
+        """核心执行逻辑：主进程读文件+写库，进程池并行解析校验"""
+        model_label = self.model._meta.label
+        repository = self.repository_class()
+        workers = options['workers'] or os.cpu_count() or 1
+        self._printed_errors = 0
+        try:
+            file_obj = open(options['csv_path'], encoding=options['encoding'], newline='')
+        except OSError as e:
+            raise CommandError(f'❌ 打开文件失败：{e}')
+
+        with file_obj, self.write_context(repository), \
+                ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            # 步骤1：解析表头（中文指标名 → 字段名）
+            header = next(csv.reader(file_obj, delimiter=options['delimiter']), None)
+            if not header:
+                raise CommandError('❌ 文件为空！')
+            columns, unknown = resolve_header(header, build_header_mapping(self.model))
+            if not any(columns):
+                raise CommandError('❌ 表头无法识别，请检查文件编码或分隔符')
+            if unknown:
+                self.stdout.write(self.style.WARNING(f'⚠️  忽略无法识别的列：{"，".join(unknown)}'))
+
+            # 步骤2：分块提交给进程池，最多同时在途 2*进程数 个任务，内存占用有上限
+            started = time.perf_counter()
+            total = created = failed = 0
+            pending = deque()
+            max_pending = 2 * workers
+            for chunk in iter_csv_chunks(file_obj, options['chunk_size'], options['delimiter']):
+                pending.append(executor.submit(parse_chunk, model_label, columns, chunk))
+                total += len(chunk)
+                if len(pending) >= max_pending:
+                    c, f = self.write_result(pending.popleft().result(), repository, options)
+                    created, failed = created + c, failed + f
+                    self.report_progress(created, failed, started)
+            while pending:
+                c, f = self.write_result(pending.popleft().result(), repository, options)
+                created, failed = created + c, failed + f
+
+        # 步骤3：汇总
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS('\n=== 导入汇总 ==='))
+        self.stdout.write(f'总行数：{total} | 写入：{created} | 失败：{failed}'
+                          f'{"（dry-run，未写库）" if options["dry_run"] else ""}')
+        self.stdout.write(f'耗时：{elapsed:.2f}s | 吞吐：{total / elapsed if elapsed else 0:.0f} 行/秒')
+
+    def write_context(self, repository):
+        """整个导入过程外层的上下文（比如延迟刷新派生数据），子类按需重写"""
+        return nullcontext()
+
+    def write_result(self, result, repository, options):
+        """写入一块解析结果，返回(写入条数, 失败条数)"""
+        valid, errors = result
+        for line_no, message in errors:
+            if self._printed_errors < options['max_errors']:
+                self.stdout.write(self.style.ERROR(f'  第{line_no}行：{message}'))
+                self._printed_errors += 1
+        if options['dry_run']:
+            return len(valid), len(errors)
+        if options['insert_only']:
+            return repository.bulk_create(valid, batch_size=options['batch_size']), len(errors)
+        return repository.bulk_upsert(valid, batch_size=options['batch_size']), len(errors)
+
+    def report_progress(self, created, failed, started):
+        """打印进度（行/秒）"""
+        elapsed = time.perf_counter() - started
+        rate = (created + failed) / elapsed if elapsed else 0
+        self.stdout.write(f'已处理 {created + failed} 行（失败 {failed}），{rate:.0f} 行/秒')
@@ -0,0 +1,122 @@
+"""
+CSV导入通用工具：表头映射 + 分块解析校验
+新手必看：
+- 源文件表头是中文指标名，按模型字段的verbose_name映射到字段名
+- parse_chunk是模块级函数，可以直接交给进程池并行执行
+"""
+import csv
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from feellist.common.constants import CHOICE_LABEL_MAPS
+
+# 不从文件导入的字段：主键和自动维护的时间戳
+SKIP_FIELDS = ("id", "create_time", "update_time")
+
+
+def build_header_mapping(model) -> Dict[str, str]:
+    """
+    生成 表头 → 模型字段名 的映射
+    表头可以是中文名（verbose_name），也可以直接是字段名
+    :param model: Django模型类
+    :return: 映射字典
+    """
+    mapping = {}
+    for field in model._meta.concrete_fields:
+        if field.name in SKIP_FIELDS:
+            continue
+        mapping[str(field.verbose_name)] = field.name
+        mapping[field.name] = field.name
+    return mapping
+
+
+def resolve_header(header: List[str], mapping: Dict[str, str]) -> Tuple[List[Optional[str]], List[str]]:
+    """
+    把CSV表头翻译成字段名
+    :param header: CSV第一行
+    :param mapping: build_header_mapping的结果
+    :return: (每列对应的字段名（不认识的列为None）, 不认识的表头列表)
+    """
+    columns, unknown = [], []
+    for name in header:
+        field_name = mapping.get(name.strip())
+        columns.append(field_name)
+        if field_name is None:
+            unknown.append(name)
+    return columns, unknown
+
+
+def iter_csv_chunks(file_obj, chunk_size: int, delimiter: str = ",") -> Iterator[List[Tuple[int, List[str]]]]:
+    """
+    流式读取CSV（不含表头），每chunk_size行打包一次
+    :return: [(行号, 行数据), ...] 迭代器，行号从2开始（第1行是表头）
+    """
+    chunk = []
+    for line_no, row in enumerate(csv.reader(file_obj, delimiter=delimiter), 2):
+        if not any(cell.strip() for cell in row):
+            continue
+        chunk.append((line_no, row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _reverse_labels(field) -> Dict[str, int]:
+    """选择字段的 名称 → 编码 反查表，非选择字段返回空字典"""
+    if field is None or not field.choices or field.name not in CHOICE_LABEL_MAPS:
+        return {}
+    return {label: code for code, label in CHOICE_LABEL_MAPS[field.name].items()}
+
+
+def _convert(field, labels: Dict[str, int], raw: str):
+    """把单元格文本转换成字段值，选择字段支持直接写名称（比如“南昌”）"""
+    value = raw.strip()
+    if value == "":
+        return None
+    if value in labels:
+        return labels[value]
+    value = field.clean(value, None)
+    if isinstance(value, datetime) and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def parse_chunk(
+        model_label: str,
+        columns: List[Optional[str]],
+        rows: List[Tuple[int, List[str]]]
+) -> Tuple[List[Dict], List[Tuple[int, str]]]:
+    """
+    解析并校验一块CSV数据（在子进程中执行）
+    :param model_label: 模型标识，比如 "feellist.NetworkSceneData"
+    :param columns: resolve_header返回的列字段名
+    :param rows: iter_csv_chunks产出的一块数据
+    :return: (合法行的字段字典列表, [(行号, 错误原因), ...])
+    """
+    model = apps.get_model(model_label)
+    fields = [model._meta.get_field(name) if name else None for name in columns]
+    labels = [_reverse_labels(field) for field in fields]
+    valid, errors = [], []
+    for line_no, row in rows:
+        data = {}
+        try:
+            for field, field_labels, raw in zip(fields, labels, row):
+                if field is not None:
+                    data[field.name] = _convert(field, field_labels, raw)
+        except ValidationError as exc:
+            errors.append((line_no, f"{field.verbose_name}：{'；'.join(exc.messages)}"))
+            continue
+        valid.append(data)
+    return valid, errors
+
+
+def init_worker():
+    """进程池初始化：spawn方式启动的子进程（比如Windows）需要重新加载Django"""
+    import django
+    django.setup()
@@ -0,0 +1,142 @@
+import json
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from feellist.models import NetworkSceneData, UserScore
+from feellist.synthetic.benchmark import BenchmarkCase, compare_results, run_suite
+from feellist.synthetic.generator import SyntheticDataGenerator
+
+# 写入用例的数据日期：离真实数据足够远，回滚前也不会和已有数据冲突
+INGEST_DATE = date(2099, 12, 31)
+# 深分页用例翻到数据的这个位置（按比例算页码，不管库里有多少数据都是真正的“深”页，也不会翻过最后一页）
+DEEP_PAGE_RATIO = 0.9
+
+
+class Command(BaseCommand):
+    """
+    feellist接口基准测试：列表、筛选、详情、统计、写入，记录p50/p95耗时、峰值内存、SQL条数
+    用法1：先生成数据，再跑基准测试，结果存JSON
+      python manage.py generate_synthetic_data --cells 20000 --days 7 --users 200000
+      python manage.py bench_endpoints --output bench_v1.json
+    用法2：和上一个版本的结果对比
+      python manage.py bench_endpoints --output bench_v2.json --compare bench_v1.json
+    用法3：只跑部分分组
+      python manage.py bench_endpoints --groups list,detail --iterations 50
+    说明：
+    - 建议在本地SQLite库上跑（settings里DATABASES指向SQLite），两个版本用同一份合成数据
+    - 写入用例在事务里执行后回滚，不会改动库里的数据；写入时的数据版本号+1在同一个事务里（版本号存在
+      数据库计数器表，见 settings.CACHES["generations"]），也一起回滚，不会让其他进程的响应缓存白白失效。
+      generations 换成Redis时版本号不回滚，只是多失效一次缓存，不影响结果
+    - 跑的时候关闭列表/详情的响应缓存，否则预热后全是缓存命中，测不到真实的查询耗时和SQL条数
+    """
+    help = __doc__
+
+    groups = ("list", "filter", "detail", "aggregate", "ingest")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='每个用例的请求次数')
+        parser.add_argument('--warmup', type=int, default=2, help='每个用例的预热次数')
+        parser.add_argument('--page-size', type=int, default=100, help='列表用例的每页条数')
+        parser.add_argument('--ingest-rows', type=int, default=500, help='写入用例每次提交的行数')
+        parser.add_argument('--groups', type=str, default=','.join(self.groups), help='要跑的分组（逗号分隔）')
+        parser.add_argument('--output', type=str, default=None, help='结果JSON文件路径')
+        parser.add_argument('--compare', type=str, default=None, help='基线结果JSON文件路径')
+
+    def handle(self, *args, **options):
+        """核心执行逻辑"""
+        groups = [group.strip() for group in options['groups'].split(',') if group.strip()]
+        unknown = [group for group in groups if group not in self.groups]
+        if unknown:
+            raise CommandError(f"❌ 不支持的分组：{','.join(unknown)}，可选：{','.join(self.groups)}")
+        if not NetworkSceneData.objects.exists() or not UserScore.objects.exists():
+            raise CommandError('❌ 库里没有数据，请先执行 generate_synthetic_data')
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.WARNING(f"⚠️ 当前数据库是 {connection.vendor}，不同数据库的结果不能直接对比"))
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'❌ 读取基线结果失败：{e}')
+
+        cases = [case for case in self.build_cases(options) if case.group in groups]
+        self.stdout.write(f"{'用例':<28}{'p50(ms)':>10}{'p95(ms)':>10}{'峰值内存(KB)':>14}{'SQL条数':>8}")
+
+        def progress(name, result):
+            self.stdout.write(
+                f"{name:<28}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['peak_memory_kb']:>14.1f}{result['queries']:>8}"
+            )
+
+        # 测试客户端的Host是testserver；关闭响应缓存，测的是每次真正查库的开销
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                               FEELLIST_RESPONSE_CACHE_TTL=0, FEELLIST_RESPONSE_CACHE_TTLS={}):
+            report = run_suite(cases, options['iterations'], options['warmup'], progress)
+        report['meta']['rows'] = {
+            'network_scene_data': NetworkSceneData.objects.count(),
+            'user_score': UserScore.objects.count(),
+        }
+
+        if baseline is not None:
+            report['comparison'] = compare_results(report, baseline)
+            self.stdout.write('\n与基线对比（正数表示变慢）：')
+            for row in report['comparison']:
+                self.stdout.write(
+                    f"{row['name']:<28}p50 {row['p50_change']:+.1%}  p95 {row['p95_change']:+.1%}  "
+                    f"SQL {row['baseline_queries']}→{row['queries']}"
+                    if row['p50_change'] is not None and row['p95_change'] is not None else f"{row['name']:<28}-"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ 结果已保存到 {options['output']}"))
+
+    @staticmethod
+    def build_cases(options):
+        """根据库里的数据构造用例：详情用例取中间的一行，深分页按数据量算页码，写入用例用合成数据"""
+        page_size = options['page_size']
+        scene_count = NetworkSceneData.objects.count()
+        scene = NetworkSceneData.objects.order_by('id').values('id', 'city')[scene_count // 2]
+        deep_page = int(scene_count * DEEP_PAGE_RATIO) // page_size + 1
+        user_id = UserScore.objects.order_by('id').values_list('id', flat=True)[UserScore.objects.count() // 2]
+        city = scene['city']
+
+        generator = SyntheticDataGenerator(options['ingest_rows'], days=1, end_date=INGEST_DATE, seed=0)
+        scene_rows = next(generator.iter_scene_rows(options['ingest_rows']))
+        user_rows = next(generator.iter_user_rows(options['ingest_rows'], options['ingest_rows']))
+
+        return [
+            # 列表
+            BenchmarkCase('scene_list', 'list', 'get', 'network-scene/', {'page_size': page_size}),
+            BenchmarkCase('scene_list_cursor', 'list', 'get', 'network-scene/', {'cursor': '', 'page_size': page_size}),
+            BenchmarkCase('scene_list_deep_page', 'list', 'get', 'network-scene/',
+                          {'page': deep_page, 'page_size': page_size, 'count': 'estimate'}),
+            BenchmarkCase('user_list', 'list', 'get', 'userscore/', {'page_size': page_size}),
+            # 筛选
+            BenchmarkCase('scene_filter', 'filter', 'get', 'network-scene/',
+                          {'city': city, 'scene_level1': 0, 'page_size': page_size}),
+            BenchmarkCase('scene_filter_fields', 'filter', 'get', 'network-scene/',
+                          {'city': city, 'fields': 'cell_id,cell_score,latitude,longitude', 'page_size': page_size}),
+            BenchmarkCase('user_filter', 'filter', 'get', 'userscore/',
+                          {'city': city, 'net_type': 1, 'page_size': page_size}),
+            # 详情
+            BenchmarkCase('scene_detail', 'detail', 'get', f"network-scene/{scene['id']}/"),
+            BenchmarkCase('user_detail', 'detail', 'get', f'userscore/{user_id}/'),
+            # 统计
+            BenchmarkCase('scene_analytics', 'aggregate', 'get', 'network-scene/analytics/',
+                          {'group_by': 'city,scene_level1', 'metrics': 'count,avg:cell_score'}),
+            BenchmarkCase('scene_stats', 'aggregate', 'get', 'network-scene/stats/'),
+            BenchmarkCase('user_analytics', 'aggregate', 'get', 'userscore/analytics/',
+                          {'group_by': 'city', 'metrics': 'count,avg:cell_score'}),
+            BenchmarkCase('user_top_cells', 'aggregate', 'get', 'userscore/top-cells/', {'city': city}),
+            # 写入（事务内执行后回滚）
+            BenchmarkCase('scene_ingest', 'ingest', 'post', 'network-scene/', scene_rows, rollback=True),
+            BenchmarkCase('user_ingest', 'ingest', 'post', 'userscore/', user_rows, rollback=True),
+        ]
@@ -0,0 +1,72 @@
+import time
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from feellist.models import NetworkSceneData, UserScore
+from feellist.serializers import NetworkSceneDataSerializer, UserScoreSerializer
+
+
+class Command(BaseCommand):
+    """
+    对比列表接口的两种序列化方式：ModelSerializer vs 只读快速序列化（values()+预计算选择字典）
+    用法1：默认对比100行和10000行
+      python manage.py bench_serialization
+    用法2：指定行数和重复次数
+      python manage.py bench_serialization --rows 100 10000 50000 --repeat 5
+    说明：
+    - 从库里取数据，不够指定行数时循环复用已有行
+    - 每种方式重复执行多次取最快的一次（含查库和渲染JSON），并校验两者输出的JSON逐字节一致
+    """
+    help = __doc__
+
+    targets = (
+        (NetworkSceneData, NetworkSceneDataSerializer),
+        (UserScore, UserScoreSerializer),
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100, 10000], help='每次序列化的行数')
+        parser.add_argument('--repeat', type=int, default=3, help='每种方式重复次数（取最快）')
+
+    def handle(self, *args, **options):
+        """核心执行逻辑"""
+        renderer = JSONRenderer()
+        for model, serializer_class in self.targets:
+            if not model.objects.exists():
+                self.stdout.write(self.style.WARNING(f"⚠️ {model._meta.db_table} 没有数据，跳过"))
+                continue
+            for rows in options['rows']:
+                queryset = model.objects.order_by('id')[:rows]
+
+                def slow():
+                    objs = list(islice(cycle(list(queryset)), rows))
+                    return renderer.render(serializer_class(objs, many=True).data)
+
+                def fast():
+                    values = list(islice(cycle(list(queryset.values())), rows))
+                    return renderer.render(serializer_class.to_representation_rows(values))
+
+                slow_seconds, slow_body = self.best_of(slow, options['repeat'])
+                fast_seconds, fast_body = self.best_of(fast, options['repeat'])
+                if slow_body != fast_body:
+                    raise CommandError(f"{model._meta.db_table} {rows}行：两种序列化输出不一致")
+                self.stdout.write(
+                    f"{model._meta.db_table:<22} {rows:>7}行  "
+                    f"ModelSerializer {slow_seconds * 1000:9.1f}ms  "
+                    f"快速序列化 {fast_seconds * 1000:8.1f}ms  "
+                    f"加速 {slow_seconds / fast_seconds:5.1f}x"
+                )
+        self.stdout.write(self.style.SUCCESS("✅ 两种序列化输出一致"))
+
+    @staticmethod
+    def best_of(func, repeat):
+        """重复执行取最快的一次，返回(耗时秒数, 最后一次的结果)"""
+        best, result = None, None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
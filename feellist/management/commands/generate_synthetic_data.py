@@ -0,0 +1,69 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from feellist.repositories.network_scene import NetworkSceneDataRepository
+from feellist.repositories.user_score import UserScoreRepository
+from feellist.synthetic.generator import SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    """
+    生成合成数据（小区数据 + 用户评分），用于压测和性能对比
+    用法1：1万个小区×7天（7万行小区数据）+ 10万条用户评分
+      python manage.py generate_synthetic_data --cells 10000 --days 7 --users 100000
+    用法2：大数据量（500万行小区数据），固定随机种子和日期，保证不同版本用同一份数据
+      python manage.py generate_synthetic_data --cells 500000 --days 10 --users 1000000 --seed 7 --end-date 2025-01-31
+    说明：
+    - 小区数据按(date, cell_id)upsert，同样的参数重跑不会产生重复行
+    - 用户评分直接插入，重跑会追加；生成后执行 recompute_cell_user_avg 刷新小区用户均分
+    """
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cells', type=int, default=10000, help='小区数')
+        parser.add_argument('--days', type=int, default=7, help='小区数据的天数（行数 = 小区数×天数）')
+        parser.add_argument('--users', type=int, default=100000, help='用户评分行数')
+        parser.add_argument('--end-date', type=str, default=None, help='最后一天（YYYY-MM-DD），默认今天')
+        parser.add_argument('--seed', type=int, default=42, help='随机种子')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='每批写库的行数')
+
+    def handle(self, *args, **options):
+        """核心执行逻辑"""
+        if options['cells'] <= 0 or options['days'] <= 0 or options['users'] < 0:
+            raise CommandError('❌ --cells、--days 必须大于0，--users 不能小于0')
+        end_date = None
+        if options['end_date']:
+            try:
+                end_date = date.fromisoformat(options['end_date'])
+            except ValueError:
+                raise CommandError('❌ --end-date 格式必须是 YYYY-MM-DD')
+
+        generator = SyntheticDataGenerator(options['cells'], options['days'], end_date, options['seed'])
+        chunk_size = options['chunk_size']
+
+        # 步骤1：小区数据（汇总表在全部写完后统一刷新一次）
+        started = time.perf_counter()
+        scene_repository = NetworkSceneDataRepository()
+        scene_total = 0
+        with scene_repository.defer_rollup():
+            for rows in generator.iter_scene_rows(chunk_size):
+                scene_total += scene_repository.bulk_upsert(rows, batch_size=chunk_size)
+                self.stdout.write(f"  小区数据 {scene_total}/{options['cells'] * options['days']}", ending='\r')
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 小区数据 {scene_total} 行，耗时 {time.perf_counter() - started:.1f}s"
+        ))
+
+        # 步骤2：用户评分
+        started = time.perf_counter()
+        user_repository = UserScoreRepository()
+        user_total = 0
+        for rows in generator.iter_user_rows(options['users'], chunk_size):
+            user_total += user_repository.bulk_create(rows, batch_size=chunk_size)
+            self.stdout.write(f"  用户评分 {user_total}/{options['users']}", ending='\r')
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ 用户评分 {user_total} 行，耗时 {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,20 @@
+from feellist.importers.command import CsvImportCommand
+from feellist.models import ComplaintWorkOrder
+from feellist.repositories.complaint_work_order import ComplaintWorkOrderRepository
+
+
+class Command(CsvImportCommand):
+    """
+    投诉工单（complaint_work_order）CSV导入工具
+    表头支持中文名（模型字段的verbose_name，比如“工单号”“受理号码”）或字段名，不认识的列会被忽略
+    默认按工单号upsert：工单状态变化后重新导出导入，会更新已有工单，不会产生重复行
+    用法1：默认参数导入
+      python manage.py import_complaint_orders D:\\data\\complaint_20250101.csv
+    用法2：指定编码、并行进程数、每块行数
+      python manage.py import_complaint_orders complaint.csv --encoding gbk --workers 4 --chunk-size 2000
+    用法3：只解析校验，不写库
+      python manage.py import_complaint_orders complaint.csv --dry-run
+    """
+    help = __doc__
+    model = ComplaintWorkOrder
+    repository_class = ComplaintWorkOrderRepository
@@ -0,0 +1,26 @@
+from feellist.importers.command import CsvImportCommand
+from feellist.models import NetworkSceneData
+from feellist.repositories.network_scene import NetworkSceneDataRepository
+
+
+class Command(CsvImportCommand):
+    """
+    小区场景数据（network_scene_data）每日CSV导入工具
+    表头支持中文指标名（模型字段的verbose_name）或字段名，不认识的列会被忽略
+    默认按(date, cell_id)upsert：重跑同一天的文件会更新已有数据，不会产生重复行
+    用法1：默认参数导入
+      python manage.py import_scene_data D:\\data\\scene_20250101.csv
+    用法2：指定编码、并行进程数、每块行数
+      python manage.py import_scene_data scene.csv --encoding gbk --workers 4 --chunk-size 5000
+    用法3：只解析校验，不写库
+      python manage.py import_scene_data scene.csv --dry-run
+    用法4：确定是全新数据时，直接插入（跳过冲突判断）
+      python manage.py import_scene_data scene.csv --insert-only
+    """
+    help = __doc__
+    model = NetworkSceneData
+    repository_class = NetworkSceneDataRepository
+
+    def write_context(self, repository):
+        """汇总表只在导入结束时统一刷新一次"""
+        return repository.defer_rollup()
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exceptions.core_exceptions import ParamError
+from core.utils.core_filters import validate_date
+from feellist.repositories.scene_rollup import NetworkSceneRollupRepository
+
+
+class Command(BaseCommand):
+    """
+    重建小区数据日汇总表（network_scene_daily_rollup）
+    日常写入会自动增量维护汇总表，这个命令用于首次上线、手工改库或怀疑汇总不一致时
+    用法1：全量重建
+      python manage.py rebuild_scene_rollup
+    用法2：只重建某个日期范围（包含首尾）
+      python manage.py rebuild_scene_rollup --date-start 2025-01-01 --date-end 2025-01-31
+    """
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-start', type=str, default=None, help='开始日期（YYYY-MM-DD）')
+        parser.add_argument('--date-end', type=str, default=None, help='结束日期（YYYY-MM-DD）')
+
+    def handle(self, *args, **options):
+        """核心执行逻辑"""
+        try:
+            date_start = validate_date(options['date_start'], '开始日期') if options['date_start'] else None
+            date_end = validate_date(options['date_end'], '结束日期') if options['date_end'] else None
+        except ParamError as e:
+            raise CommandError(f'❌ {e.detail}')
+
+        started = time.perf_counter()
+        written = NetworkSceneRollupRepository().rebuild(date_start, date_end)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ 汇总表重建完成：写入 {written} 行，耗时 {elapsed:.2f}s'))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from feellist.services.user_score import UserScoreService
+
+
+class Command(BaseCommand):
+    """
+    重算小区数据表的用户均分（network_scene_data.cell_user_avg_score）
+    用法1：增量重算（只算UserScore增删改过的小区，适合定时任务）
+      python manage.py recompute_cell_user_avg
+    用法2：全量重算（首次上线、手工改库后执行）
+      python manage.py recompute_cell_user_avg --full
+    """
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='全量重算所有小区')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='每批处理的小区数')
+
+    def handle(self, *args, **options):
+        """核心执行逻辑"""
+        started = time.perf_counter()
+        result = UserScoreService().recompute_cell_user_avg_scores(options['full'], options['chunk_size'])
+        elapsed = time.perf_counter() - started
+        mode = '全量' if options['full'] else '增量'
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {mode}重算完成：{result['cells']} 个小区，更新 {result['updated']} 行，耗时 {elapsed:.2f}s"
+        ))
@@ -0,0 +1,56 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.constants.core_constants import BULK_BATCH_SIZE
+from core.exceptions.core_exceptions import ParamError
+from feellist.scoring.cell_score import ScoringProfile
+from feellist.services.network_scene import NetworkSceneDataService
+
+
+class Command(BaseCommand):
+    """
+    按评分配置重算小区评分（network_scene_data.cell_score）
+    评分配置优先级：--profile JSON文件 > settings.FEELLIST_SCORING_PROFILE > 默认配置
+    用法1：重算某个日期范围（包含首尾）
+      python manage.py rescore_cells --date-start 2025-01-01 --date-end 2025-01-31
+    用法2：只算不写，查看评分分布变化
+      python manage.py rescore_cells --date-start 2025-01-01 --profile new_profile.json --dry-run
+    用法3：只重算某个地市
+      python manage.py rescore_cells --date-start 2025-01-01 --city 11201
+    """
+    help = __doc__
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-start', type=str, default=None, help='开始日期（YYYY-MM-DD）')
+        parser.add_argument('--date-end', type=str, default=None, help='结束日期（YYYY-MM-DD）')
+        parser.add_argument('--city', type=str, default=None, help='地市编码')
+        parser.add_argument('--profile', type=str, default=None, help='评分配置JSON文件路径')
+        parser.add_argument('--batch-size', type=int, default=BULK_BATCH_SIZE, help='每条UPDATE语句的行数')
+        parser.add_argument('--dry-run', action='store_true', help='只计算评分分布变化，不写库')
+
+    def handle(self, *args, **options):
+        """核心执行逻辑"""
+        filters = {key: options[key] for key in ('date_start', 'date_end', 'city') if options[key]}
+        started = time.perf_counter()
+        try:
+            profile = ScoringProfile.load(options['profile'])
+            report = NetworkSceneDataService().rescore_cells(
+                profile, filters, dry_run=options['dry_run'], batch_size=options['batch_size']
+            )
+        except ParamError as e:
+            raise CommandError(f'❌ {e.detail}')
+        elapsed = time.perf_counter() - started
+
+        shift = report['shift']
+        self.stdout.write(f"评分分布（重算前）：{json.dumps(shift['before'], ensure_ascii=False)}")
+        self.stdout.write(f"评分分布（重算后）：{json.dumps(shift['after'], ensure_ascii=False)}")
+        self.stdout.write(
+            f"变化小区：{shift['changed']}，平均变化：{shift['mean_delta']}，最大变化：{shift['max_abs_delta']}"
+        )
+        action = '试算' if options['dry_run'] else '重算'
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {action}完成：{report['days']} 天，{report['cells']} 个小区天，写回 {report['updated']} 行，"
+            f"耗时 {elapsed:.2f}s"
+        ))
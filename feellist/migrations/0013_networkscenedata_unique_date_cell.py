@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-17 17:40
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_scene_rows(apps, schema_editor):
+    """加唯一约束前先去重：同一(date, cell_id)只保留ID最大（最后导入）的一条"""
+    NetworkSceneData = apps.get_model('feellist', 'NetworkSceneData')
+    duplicates = (
+        NetworkSceneData.objects
+        .filter(date__isnull=False, cell_id__isnull=False)
+        .values('date', 'cell_id')
+        .annotate(row_count=Count('id'), keep_id=Max('id'))
+        .filter(row_count__gt=1)
+    )
+    for item in duplicates.iterator():
+        (NetworkSceneData.objects
+         .filter(date=item['date'], cell_id=item['cell_id'])
+         .exclude(id=item['keep_id'])
+         .delete())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feellist', '0012_networkscenedata_carrier_avg_noise_interference_health_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_scene_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='networkscenedata',
+            constraint=models.UniqueConstraint(fields=('date', 'cell_id'), name='uniq_scene_date_cell'),
+        ),
+    ]
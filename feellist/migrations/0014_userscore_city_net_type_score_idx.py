@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-17 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feellist', '0013_networkscenedata_unique_date_cell'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userscore',
+            index=models.Index(fields=['city', 'net_type', 'cell_score'], name='user_score_city_624b60_idx'),
+        ),
+    ]
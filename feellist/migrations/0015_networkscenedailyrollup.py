@@ -0,0 +1,69 @@
+# Generated by Django 6.0 on 2026-10-17 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feellist', '0014_userscore_city_net_type_score_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NetworkSceneDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(blank=True, null=True, verbose_name='日期')),
+                ('city', models.IntegerField(blank=True, choices=[(11204, '九江'), (11201, '南昌'), (11207, '赣州'), (11210, '抚州'), (11208, '吉安'), (11209, '宜春'), (11205, '新余'), (11202, '景德镇'), (11206, '鹰潭'), (11203, '萍乡'), (11211, '上饶')], null=True, verbose_name='地市')),
+                ('scene_level1', models.IntegerField(blank=True, choices=[(0, '住宅小区'), (1, '重点商超'), (2, '政务中心'), (3, '医疗机构'), (4, '文旅景区'), (5, '商务楼宇及酒店'), (6, '交通枢纽'), (7, '高等学校')], null=True, verbose_name='一级场景')),
+                ('area', models.IntegerField(blank=True, choices=[(0, '农村'), (1, '乡镇'), (2, '城市'), (3, '县城')], null=True, verbose_name='区域')),
+                ('cell_count', models.IntegerField(default=0, verbose_name='小区数')),
+                ('complaint_count', models.IntegerField(default=0, verbose_name='有投诉小区数')),
+                ('score_sum', models.FloatField(blank=True, null=True, verbose_name='小区评分合计')),
+                ('score_count', models.IntegerField(default=0, verbose_name='小区评分有效数')),
+                ('score_min', models.FloatField(blank=True, null=True, verbose_name='小区评分最小值')),
+                ('score_max', models.FloatField(blank=True, null=True, verbose_name='小区评分最大值')),
+                ('volte_connect_rate_sum', models.FloatField(blank=True, null=True, verbose_name='VOLTE接通率_合计')),
+                ('volte_connect_rate_count', models.IntegerField(default=0, verbose_name='VOLTE接通率_有效数')),
+                ('lte_service_drop_rate_qci1_sum', models.FloatField(blank=True, null=True, verbose_name='LTE业务掉线率(QCI1)_合计')),
+                ('lte_service_drop_rate_qci1_count', models.IntegerField(default=0, verbose_name='LTE业务掉线率(QCI1)_有效数')),
+                ('qci1_ul_pdcp_sdu_loss_rate_sum', models.FloatField(blank=True, null=True, verbose_name='QCI1的上行PDCP SDU丢包率_合计')),
+                ('qci1_ul_pdcp_sdu_loss_rate_count', models.IntegerField(default=0, verbose_name='QCI1的上行PDCP SDU丢包率_有效数')),
+                ('qci1_dl_pdcp_sdu_loss_rate_sum', models.FloatField(blank=True, null=True, verbose_name='QCI1的下行PDCP SDU丢包率_合计')),
+                ('qci1_dl_pdcp_sdu_loss_rate_count', models.IntegerField(default=0, verbose_name='QCI1的下行PDCP SDU丢包率_有效数')),
+                ('cqi_good_rate_sum', models.FloatField(blank=True, null=True, verbose_name='CQI优良率_合计')),
+                ('cqi_good_rate_count', models.IntegerField(default=0, verbose_name='CQI优良率_有效数')),
+                ('dl_prb_utilization_mean_sum', models.FloatField(blank=True, null=True, verbose_name='下行PRB利用率_Mean_合计')),
+                ('dl_prb_utilization_mean_count', models.IntegerField(default=0, verbose_name='下行PRB利用率_Mean_有效数')),
+                ('carrier_avg_noise_interference_health_sum', models.FloatField(blank=True, null=True, verbose_name='载波平均噪声干扰-健康度_合计')),
+                ('carrier_avg_noise_interference_health_count', models.IntegerField(default=0, verbose_name='载波平均噪声干扰-健康度_有效数')),
+                ('total_sample_points_sum_sum', models.FloatField(blank=True, null=True, verbose_name='总采样点数_Sum_合计')),
+                ('total_sample_points_sum_count', models.IntegerField(default=0, verbose_name='总采样点数_Sum_有效数')),
+                ('overlap_coverage_sample_points_sum_sum', models.FloatField(blank=True, null=True, verbose_name='重叠覆盖采样点数_Sum_合计')),
+                ('overlap_coverage_sample_points_sum_count', models.IntegerField(default=0, verbose_name='重叠覆盖采样点数_Sum_有效数')),
+                ('overlap_coverage_ratio_sum', models.FloatField(blank=True, null=True, verbose_name='重叠覆盖比例_合计')),
+                ('overlap_coverage_ratio_count', models.IntegerField(default=0, verbose_name='重叠覆盖比例_有效数')),
+                ('mro_rsrp_ge_110_sample_points_sum_sum', models.FloatField(blank=True, null=True, verbose_name='MRO-RSRP≥-110采样点数_Sum_合计')),
+                ('mro_rsrp_ge_110_sample_points_sum_count', models.IntegerField(default=0, verbose_name='MRO-RSRP≥-110采样点数_Sum_有效数')),
+                ('total_sample_point_sum_sum', models.FloatField(blank=True, null=True, verbose_name='总采样点_Sum_合计')),
+                ('total_sample_point_sum_count', models.IntegerField(default=0, verbose_name='总采样点_Sum_有效数')),
+                ('rsrp_ge_110_ratio_sum', models.FloatField(blank=True, null=True, verbose_name='RSRP>=-110比例_合计')),
+                ('rsrp_ge_110_ratio_count', models.IntegerField(default=0, verbose_name='RSRP>=-110比例_有效数')),
+                ('total_sample_points_mod3_sum_sum', models.FloatField(blank=True, null=True, verbose_name='总采样点数-mod3_Sum_合计')),
+                ('total_sample_points_mod3_sum_count', models.IntegerField(default=0, verbose_name='总采样点数-mod3_Sum_有效数')),
+                ('mod3_interference_sample_points_sum_sum', models.FloatField(blank=True, null=True, verbose_name='mod3干扰采样点数_Sum_合计')),
+                ('mod3_interference_sample_points_sum_count', models.IntegerField(default=0, verbose_name='mod3干扰采样点数_Sum_有效数')),
+                ('mod3_interference_ratio_sum', models.FloatField(blank=True, null=True, verbose_name='MOD3干扰比例_合计')),
+                ('mod3_interference_ratio_count', models.IntegerField(default=0, verbose_name='MOD3干扰比例_有效数')),
+                ('update_time', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '小区数据日汇总表',
+                'verbose_name_plural': '小区数据日汇总表',
+                'db_table': 'network_scene_daily_rollup',
+                'indexes': [models.Index(fields=['date', 'city'], name='network_sce_date_c357d8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'city', 'scene_level1', 'area'), name='uniq_scene_rollup_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-17 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feellist', '0015_networkscenedailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CellUserScoreDirty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell_id', models.BigIntegerField(unique=True, verbose_name='cellID')),
+                ('mark_time', models.DateTimeField(verbose_name='登记时间')),
+            ],
+            options={
+                'verbose_name': '待重算用户均分小区表',
+                'verbose_name_plural': '待重算用户均分小区表',
+                'db_table': 'cell_user_score_dirty',
+                'indexes': [models.Index(fields=['mark_time'], name='cell_user_s_mark_ti_daaf85_idx')],
+            },
+        ),
+    ]
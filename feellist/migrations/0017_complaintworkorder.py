@@ -0,0 +1,110 @@
+# Generated by Django 6.0 on 2026-10-17 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feellist', '0016_celluserscoredirty'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplaintWorkOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.IntegerField(blank=True, choices=[(11204, '九江'), (11201, '南昌'), (11207, '赣州'), (11210, '抚州'), (11208, '吉安'), (11209, '宜春'), (11205, '新余'), (11202, '景德镇'), (11206, '鹰潭'), (11203, '萍乡'), (11211, '上饶')], null=True, verbose_name='地市')),
+                ('work_order_no', models.CharField(blank=True, max_length=64, null=True, verbose_name='工单号')),
+                ('service_flow_no', models.CharField(blank=True, max_length=64, null=True, verbose_name='客服流水号')),
+                ('main_work_order_flow_no', models.CharField(blank=True, max_length=64, null=True, verbose_name='主工单流水号')),
+                ('gis_complaint_flow_no', models.CharField(blank=True, max_length=64, null=True, verbose_name='GIS投诉流水号')),
+                ('report_phone', models.CharField(blank=True, max_length=20, null=True, verbose_name='受理号码')),
+                ('report_path', models.CharField(blank=True, max_length=64, null=True, verbose_name='受理路径')),
+                ('report_channel', models.CharField(blank=True, max_length=32, null=True, verbose_name='受理渠道')),
+                ('user_package', models.CharField(blank=True, max_length=64, null=True, verbose_name='用户套餐')),
+                ('customer_level', models.CharField(blank=True, max_length=16, null=True, verbose_name='客户级别')),
+                ('area', models.CharField(blank=True, max_length=64, null=True, verbose_name='区域')),
+                ('complaint_content', models.TextField(blank=True, null=True, verbose_name='投诉内容')),
+                ('complaint_address', models.CharField(blank=True, max_length=255, null=True, verbose_name='投诉地址')),
+                ('complaint_detail', models.TextField(blank=True, null=True, verbose_name='投诉详单')),
+                ('complaint_env', models.CharField(blank=True, max_length=128, null=True, verbose_name='投诉点环境')),
+                ('longitude', models.FloatField(blank=True, null=True, verbose_name='经度')),
+                ('latitude', models.FloatField(blank=True, null=True, verbose_name='纬度')),
+                ('reply_service_content', models.TextField(blank=True, null=True, verbose_name='回复客服内容')),
+                ('final_process_result', models.CharField(blank=True, max_length=255, null=True, verbose_name='最终处理结果')),
+                ('work_order_qualification', models.CharField(blank=True, max_length=64, null=True, verbose_name='工单定性')),
+                ('problem_responsibility', models.CharField(blank=True, max_length=64, null=True, verbose_name='问题责任归属')),
+                ('professional_type', models.CharField(blank=True, max_length=32, null=True, verbose_name='专业')),
+                ('network_type', models.CharField(blank=True, max_length=16, null=True, verbose_name='网络类型')),
+                ('network_field', models.CharField(blank=True, max_length=64, null=True, verbose_name='网络字段')),
+                ('business_category', models.CharField(blank=True, max_length=32, null=True, verbose_name='业务类别')),
+                ('problem_solve_conclusion', models.CharField(blank=True, max_length=64, null=True, verbose_name='问题解决结论')),
+                ('management_scope', models.CharField(blank=True, max_length=64, null=True, verbose_name='管理范围')),
+                ('current_link', models.CharField(blank=True, max_length=32, null=True, verbose_name='当前环节')),
+                ('work_order_status', models.CharField(blank=True, max_length=16, null=True, verbose_name='工单状态')),
+                ('complaint_upgrade', models.CharField(blank=True, max_length=8, null=True, verbose_name='投诉升级')),
+                ('work_order_points', models.IntegerField(blank=True, null=True, verbose_name='工单积分')),
+                ('repeat_times', models.IntegerField(blank=True, null=True, verbose_name='重复次数')),
+                ('is_cancel_redo', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否撤单重派')),
+                ('complaint_level', models.CharField(blank=True, max_length=16, null=True, verbose_name='投诉等级')),
+                ('current_processor', models.CharField(blank=True, max_length=32, null=True, verbose_name='当前处理人')),
+                ('system_receive_time', models.DateTimeField(blank=True, null=True, verbose_name='系统接单时')),
+                ('service_reply_require_time', models.DateTimeField(blank=True, null=True, verbose_name='客服要求回复时间')),
+                ('preliminary_reply_time', models.DateTimeField(blank=True, null=True, verbose_name='初步回复时间')),
+                ('preliminary_reply_content', models.TextField(blank=True, null=True, verbose_name='初步回复内容')),
+                ('solve_reply_time', models.DateTimeField(blank=True, null=True, verbose_name='解决回复时间')),
+                ('solve_reply_content', models.TextField(blank=True, null=True, verbose_name='解决回复内容')),
+                ('is_overtime', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否超时')),
+                ('responsible_department', models.CharField(blank=True, max_length=64, null=True, verbose_name='责任部门')),
+                ('is_on_site_process', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否现场处理')),
+                ('is_user_on_site', models.CharField(blank=True, max_length=8, null=True, verbose_name='用户是否在现场')),
+                ('longitude_latitude_source', models.CharField(blank=True, max_length=32, null=True, verbose_name='经纬度来源')),
+                ('tag', models.CharField(blank=True, max_length=128, null=True, verbose_name='标签')),
+                ('confirmed_longitude', models.FloatField(blank=True, null=True, verbose_name='确认经度')),
+                ('confirmed_latitude', models.FloatField(blank=True, null=True, verbose_name='确认纬度')),
+                ('problem_category', models.CharField(blank=True, max_length=64, null=True, verbose_name='问题类别')),
+                ('administrative_scene', models.CharField(blank=True, max_length=64, null=True, verbose_name='行政场景')),
+                ('complaint_scene', models.CharField(blank=True, max_length=64, null=True, verbose_name='投诉场景')),
+                ('problem_area', models.CharField(blank=True, max_length=64, null=True, verbose_name='问题区域')),
+                ('is_solved', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否解决')),
+                ('qualification_category', models.CharField(blank=True, max_length=64, null=True, verbose_name='定性类别')),
+                ('final_problem_qualification', models.CharField(blank=True, max_length=128, null=True, verbose_name='最终问题定性')),
+                ('final_problem_qualification_supp1', models.CharField(blank=True, max_length=128, null=True, verbose_name='最终问题定性补充一')),
+                ('final_problem_qualification_supp2', models.CharField(blank=True, max_length=128, null=True, verbose_name='最终问题定性补充二')),
+                ('process_type', models.CharField(blank=True, max_length=32, null=True, verbose_name='处理类型')),
+                ('is_tracked', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否跟踪')),
+                ('is_filed', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否归档')),
+                ('is_voice_complaint', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否语音投诉')),
+                ('is_upload_attachment', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否上传附件')),
+                ('situation_trend', models.CharField(blank=True, max_length=32, null=True, verbose_name='事态发展倾向')),
+                ('is_high_compensation', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否高额赔偿')),
+                ('is_upgrade_tendency', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否升级倾向')),
+                ('is_media_exposure_tendency', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否媒体曝光倾向')),
+                ('customer_special_identity', models.CharField(blank=True, max_length=32, null=True, verbose_name='客户特殊身份')),
+                ('is_word_of_mouth_publicity', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否做口碑宣传')),
+                ('user_think_timely_response', models.CharField(blank=True, max_length=8, null=True, verbose_name='用户认为是否及时响应')),
+                ('user_think_solved', models.CharField(blank=True, max_length=8, null=True, verbose_name='用户认为是否解决')),
+                ('user_satisfaction', models.CharField(blank=True, max_length=8, null=True, verbose_name='用户是否满意')),
+                ('word_of_mouth_unmet_reason', models.TextField(blank=True, null=True, verbose_name='口碑未达情况原因')),
+                ('whole_order_time_limit', models.IntegerField(blank=True, null=True, verbose_name='整单时限')),
+                ('is_generate_sub_work_order', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否生成子工单')),
+                ('is_app_process_link', models.CharField(blank=True, max_length=8, null=True, verbose_name='是否有APP处理环节')),
+                ('app_process_link', models.CharField(blank=True, max_length=64, null=True, verbose_name='APP处理环节')),
+                ('app_processor_name', models.CharField(blank=True, max_length=32, null=True, verbose_name='APP处理人姓名')),
+                ('app_processor_account', models.CharField(blank=True, max_length=32, null=True, verbose_name='APP处理人账号')),
+                ('app_process_time', models.DateTimeField(blank=True, null=True, verbose_name='APP处理时间')),
+                ('app_processor_is_upload_img', models.CharField(blank=True, max_length=8, null=True, verbose_name='APP处理人是否上传图片')),
+                ('special_user_identifier', models.CharField(blank=True, max_length=32, null=True, verbose_name='特殊用户标识')),
+                ('create_time', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('update_time', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '投诉工单表',
+                'verbose_name_plural': '投诉工单表',
+                'db_table': 'complaint_work_order',
+                'indexes': [models.Index(fields=['report_phone'], name='complaint_w_report__574597_idx'), models.Index(fields=['system_receive_time'], name='complaint_w_system__ffd488_idx'), models.Index(fields=['work_order_status'], name='complaint_w_work_or_78c6c1_idx'), models.Index(fields=['city', 'area'], name='complaint_w_city_d97212_idx')],
+                'constraints': [models.UniqueConstraint(fields=('work_order_no',), name='uniq_complaint_work_order_no')],
+            },
+        ),
+    ]
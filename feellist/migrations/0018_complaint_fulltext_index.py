@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-17 20:40
+
+from django.db import migrations
+
+# 全文索引覆盖的字段（和 ComplaintWorkOrderRepository.search_fields 保持一致）
+FULLTEXT_COLUMNS = 'complaint_content, complaint_detail, complaint_address, reply_service_content'
+
+
+def add_fulltext_index(apps, schema_editor):
+    """MySQL：建ngram分词的全文索引（支持中文）；其他数据库没有对应能力，搜索时退回LIKE"""
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        f'ALTER TABLE complaint_work_order ADD FULLTEXT INDEX ft_complaint_text ({FULLTEXT_COLUMNS}) WITH PARSER ngram'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('ALTER TABLE complaint_work_order DROP INDEX ft_complaint_text')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feellist', '0017_complaintworkorder'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -5,7 +5,10 @@ from feellist.fileds.base_fileds import city_field, phone_field, net_type_field,
     time_fields, sent_time_field, manufacturer_field, contractor_field, complaint_field, coordinate_field, \
     indoor_outdoor_field, area_field
 from feellist.fileds.cell_indicator_fileds import cell_indicator_fields
+from feellist.fileds.complaint_fileds import complaint_fields
+from feellist.common.constants import SCENE_LEVEL1_CHOICES
 from feellist.fileds.meta import FieldComposeMeta
+from feellist.fileds.rollup_fileds import rollup_measure_fields
 from feellist.fileds.user_indicator_fileds import user_indicator_fields
 
 
@@ -27,6 +30,8 @@ class UserScore(models.Model, metaclass=FieldComposeMeta):
             models.Index(fields=["phone_number"]),
             models.Index(fields=["cell_id"]),
             models.Index(fields=["scene_id"]),
+            # 地市均分 / 评分TopN：WHERE city AND net_type ORDER BY cell_score DESC
+            models.Index(fields=["city", "net_type", "cell_score"]),
         ]
 
     def __str__(self):
@@ -71,6 +76,78 @@ class NetworkSceneData(models.Model, metaclass=FieldComposeMeta):
             models.Index(fields=["scene_id"]),
             models.Index(fields=["city"]),
         ]
+        constraints = [
+            # 自然键：每个小区每天一条数据，重复导入走upsert
+            models.UniqueConstraint(fields=["date", "cell_id"], name="uniq_scene_date_cell"),
+        ]
 
     def __str__(self):
         return f"{self.date}-{self.city}-{self.cell_id}"
+
+
+class NetworkSceneDailyRollup(models.Model, metaclass=FieldComposeMeta):
+    """小区数据日汇总表：按 日期+地市+一级场景+区域 预聚合，统计接口优先读这张表"""
+    date = models.DateField(verbose_name="日期", null=True, blank=True)
+    _compose_city = city_field()  # 地市字段
+    scene_level1 = models.IntegerField(verbose_name="一级场景", null=True, blank=True, choices=SCENE_LEVEL1_CHOICES)
+    _compose_area = area_field()  # 区域类型字段
+    _compose_measure = rollup_measure_fields()  # 汇总度量字段
+    update_time = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+
+    class Meta:
+        db_table = "network_scene_daily_rollup"
+        verbose_name = "小区数据日汇总表"
+        verbose_name_plural = "小区数据日汇总表"
+        indexes = [
+            models.Index(fields=["date", "city"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["date", "city", "scene_level1", "area"], name="uniq_scene_rollup_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.date}-{self.city}-{self.scene_level1}-{self.area}"
+
+
+class CellUserScoreDirty(models.Model):
+    """待重算用户均分的小区：UserScore增删改时登记cell_id，重算 cell_user_avg_score 后清除"""
+    cell_id = models.BigIntegerField(verbose_name="cellID", unique=True)
+    mark_time = models.DateTimeField(verbose_name="登记时间")
+
+    class Meta:
+        db_table = "cell_user_score_dirty"
+        verbose_name = "待重算用户均分小区表"
+        verbose_name_plural = "待重算用户均分小区表"
+        indexes = [
+            models.Index(fields=["mark_time"]),
+        ]
+
+    def __str__(self):
+        return f"{self.cell_id}-{self.mark_time}"
+
+
+class ComplaintWorkOrder(models.Model, metaclass=FieldComposeMeta):
+    """投诉工单表"""
+    _compose_city = city_field()  # 地市字段
+    _compose_complaint = complaint_fields()  # 投诉工单字段（区域area是工单里的文本字段）
+    _compose_time = time_fields()  # 时间字段
+
+    class Meta:
+        db_table = "complaint_work_order"
+        verbose_name = "投诉工单表"
+        verbose_name_plural = "投诉工单表"
+        indexes = [
+            # 按受理号码查用户的历史投诉
+            models.Index(fields=["report_phone"]),
+            # 按接单时间范围筛选、游标分页
+            models.Index(fields=["system_receive_time"]),
+            models.Index(fields=["work_order_status"]),
+            models.Index(fields=["city", "area"]),
+        ]
+        constraints = [
+            # 自然键：工单号唯一，重复导入走upsert（工单号为空的行不受约束）
+            models.UniqueConstraint(fields=["work_order_no"], name="uniq_complaint_work_order_no"),
+        ]
+
+    def __str__(self):
+        return f"{self.work_order_no}-{self.report_phone}"
@@ -4,12 +4,26 @@ feellist APP的仓储基类：封装通用的数据库操作
 - 所有业务仓储都继承这个类
 - 不用重复写增删改查的基础代码
 """
+import copy
+import hashlib
+import json
 from abc import ABC
-from typing import Dict, List, Tuple, Type
+from typing import Dict, Iterator, List, Optional, Tuple, Type
 
-from django.db import models
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Avg, Count, F, Max, Min, Q, QuerySet, Sum
 
-from core.exceptions.core_exceptions import DataNotFoundError
+from core.constants.core_constants import (
+    COUNT_CACHE_TTL, EXPORT_CHUNK_SIZE, BULK_BATCH_SIZE, ANALYTICS_MAX_GROUPS, MSG_DATA_CONFLICT
+)
+from core.exceptions.core_exceptions import DataNotFoundError, ParamError
+from core.utils.core_cache import bump_generation
+from core.utils.core_pagination import decode_cursor, encode_cursor
+
+# 分组统计支持的聚合函数
+AGGREGATE_FUNCTIONS = {"sum": Sum, "avg": Avg, "min": Min, "max": Max, "count": Count}
 
 
 class BaseRepository(ABC):
@@ -18,6 +32,14 @@ class BaseRepository(ABC):
     """
     # 子类必须指定对应的Django模型
     model: Type[models.Model] = None
+    # 游标分页的排序字段（可选）：为空时只按ID倒序翻页
+    cursor_field: Optional[str] = None
+    # 分组统计白名单：可分组的维度（值为None表示直接按字段分组，也可以是表达式，比如按天截断）
+    group_by_fields: Dict[str, Optional[object]] = {}
+    # 分组统计白名单：可以做sum/avg/min/max的数值字段
+    metric_fields: Tuple[str, ...] = ()
+    # 自然键（可选）：bulk_upsert按这些字段判断冲突，需要有对应的唯一约束
+    natural_key: Tuple[str, ...] = ()
 
     def __init__(self):
         if self.model is None:
@@ -31,33 +53,284 @@ class BaseRepository(ABC):
         """
         return list(self.model.objects.all().order_by(order_by))
 
-    def filter(self, filters: Dict, order_by: str = "-id") -> Tuple[List[models.Model], bool]:
+    def validate_filters(self, filters: Dict) -> Dict:
         """
-        条件筛选
+        筛选参数校验：子类重写，只保留并转换本表支持的筛选条件
+        :param filters: 原始筛选条件字典
+        :return: 校验后的筛选条件字典
+        """
+        return filters
+
+    def filter_queryset(
+            self,
+            filters: Dict,
+            order_by: str = "-id",
+            only_fields: Optional[List[str]] = None
+    ) -> Tuple[QuerySet, bool]:
+        """
+        条件筛选（不执行查询）：返回查询集，方便后续在数据库里分页/统计
         :param filters: 筛选条件字典
         :param order_by: 排序字段
-        :return: (模型对象列表, 是否有筛选条件)
+        :param only_fields: 只查询这些列（SELECT列裁剪），为空表示全部列
+        :return: (查询集, 是否有筛选条件)
         """
         queryset = self.model.objects.all().order_by(order_by)
+        if only_fields:
+            queryset = queryset.only(*only_fields)
         has_filter = False
 
-        # 应用筛选条件
-        for key, value in filters.items():
-            if hasattr(self.model, key):
+        # 应用筛选条件（支持 date__gte 这类带查询后缀的条件）
+        for key, value in self.validate_filters(filters).items():
+            if hasattr(self.model, key.split("__")[0]):
                 queryset = queryset.filter(**{key: value})
                 has_filter = True
 
+        return queryset, has_filter
+
+    def estimate_count(self, filters: Dict) -> int:
+        """
+        估算筛选结果的总条数（允许有误差，换取更快的响应）
+        1. 无筛选条件：优先读数据库的表统计信息（MySQL的TABLE_ROWS / PostgreSQL的reltuples）
+        2. 其他情况：精确COUNT(*)一次，按规范化后的筛选条件缓存COUNT_CACHE_TTL秒
+        :param filters: 筛选条件字典
+        :return: 估算总条数
+        """
+        validated_filters = {
+            key: value for key, value in self.validate_filters(filters).items()
+            if hasattr(self.model, key.split("__")[0])
+        }
+        if not validated_filters:
+            table_rows = self._table_stat_rows()
+            if table_rows is not None:
+                return table_rows
+
+        # 规范化筛选条件（排序+统一序列化），保证同样的条件命中同一个缓存
+        normalized = json.dumps(validated_filters, sort_keys=True, default=str)
+        cache_key = f"count:{self.model._meta.db_table}:{hashlib.md5(normalized.encode('utf-8')).hexdigest()}"
+        total = cache.get(cache_key)
+        if total is None:
+            total = self.model.objects.filter(**validated_filters).count()
+            cache.set(cache_key, total, COUNT_CACHE_TTL)
+        return total
+
+    def _table_stat_rows(self) -> Optional[int]:
+        """读取数据库维护的表行数统计，不支持的数据库返回None"""
+        table = self.model._meta.db_table
+        if connection.vendor == "mysql":
+            sql = ("SELECT TABLE_ROWS FROM information_schema.TABLES "
+                   "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s")
+        elif connection.vendor == "postgresql":
+            sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+        else:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+        # PostgreSQL未ANALYZE过的表reltuples为-1，视为没有统计信息
+        if not row or row[0] is None or row[0] < 0:
+            return None
+        return int(row[0])
+
+    def group_aggregate(
+            self,
+            filters: Dict,
+            group_by: List[str],
+            metrics: List[Tuple[str, Optional[str]]]
+    ) -> List[Dict]:
+        """
+        多维分组统计：编译成一条 SELECT 维度, 聚合... GROUP BY 维度 的SQL
+        :param filters: 筛选条件字典
+        :param group_by: 分组维度列表（必须在group_by_fields白名单内），为空表示整体汇总
+        :param metrics: [(聚合函数, 字段名)]，比如[("avg", "cell_score"), ("count", None)]
+        :return: 每个分组一行的字典列表，聚合列名为 函数_字段（count不带字段时就叫count）
+        :raise ParamError: 维度或指标不在白名单内、分组数超过ANALYTICS_MAX_GROUPS时抛出异常
+        """
+        unknown = [name for name in group_by if name not in self.group_by_fields]
+        if unknown:
+            raise ParamError(detail=f"不支持的分组维度：{','.join(unknown)}")
+        aggregates = {}
+        for func, field in metrics:
+            if func not in AGGREGATE_FUNCTIONS:
+                raise ParamError(detail=f"不支持的聚合函数：{func}")
+            if field is None:
+                if func != "count":
+                    raise ParamError(detail=f"{func}必须指定字段")
+                aggregates["count"] = Count("id")
+                continue
+            if field not in self.metric_fields:
+                raise ParamError(detail=f"不支持的统计字段：{field}")
+            aggregates[f"{func}_{field}"] = AGGREGATE_FUNCTIONS[func](field)
+
+        queryset, _ = self.filter_queryset(filters)
+        queryset = queryset.order_by()
+        if not group_by:
+            return [queryset.aggregate(**aggregates)]
+
+        # 表达式维度先起一个临时别名（不能和模型字段同名），查完再改回维度名
+        aliases = {name: f"{name}__group" if self.group_by_fields[name] is not None else name for name in group_by}
+        expressions = {
+            aliases[name]: self.group_by_fields[name] for name in group_by if self.group_by_fields[name] is not None
+        }
+        rows = (
+            queryset.annotate(**expressions)
+            .values(*aliases.values())
+            .annotate(**aggregates)
+            .order_by(*aliases.values())[:ANALYTICS_MAX_GROUPS + 1]
+        )
+        rows = self.check_group_limit(rows)
+        return [
+            {**{name: row[alias] for name, alias in aliases.items()}, **{key: row[key] for key in aggregates}}
+            for row in rows
+        ]
+
+    @staticmethod
+    def check_group_limit(rows) -> List[Dict]:
+        """
+        分组数上限检查：查询时多取一行（LIMIT ANALYTICS_MAX_GROUPS + 1），多出来说明结果不完整，
+        直接报错而不是悄悄截断，避免调用方拿不全的分组当总数用
+        :raise ParamError: 分组数超过ANALYTICS_MAX_GROUPS时抛出异常
+        """
+        rows = list(rows)
+        if len(rows) > ANALYTICS_MAX_GROUPS:
+            raise ParamError(detail=f"分组数超过{ANALYTICS_MAX_GROUPS}个，请增加筛选条件或减少分组维度")
+        return rows
+
+    def filter(self, filters: Dict, order_by: str = "-id") -> Tuple[List[models.Model], bool]:
+        """
+        条件筛选
+        :param filters: 筛选条件字典
+        :param order_by: 排序字段
+        :return: (模型对象列表, 是否有筛选条件)
+        """
+        queryset, has_filter = self.filter_queryset(filters, order_by)
         return list(queryset), has_filter
 
-    def get_by_id(self, pk: int) -> models.Model:
+    def filter_cursor_page(
+            self,
+            filters: Dict,
+            cursor: Optional[str],
+            page_size: int,
+            only_fields: Optional[List[str]] = None,
+            as_values: bool = False
+    ) -> Tuple[List[models.Model], Optional[str], bool]:
+        """
+        游标分页（keyset）：按(cursor_field, id)倒序，用WHERE条件跳到上一页末尾
+        新手必看：
+        - 不用OFFSET，翻到第几页耗时都一样
+        - cursor_field为空值的行排在最后
+        :param filters: 筛选条件字典
+        :param cursor: 上一页返回的next_cursor，为空表示第一页
+        :param page_size: 每页条数
+        :param only_fields: 只查询这些列，为空表示全部列
+        :param as_values: 为True时返回行字典（QuerySet.values）而不是模型对象
+        :return: (模型对象列表, 下一页游标（没有下一页时为None）, 是否有筛选条件)
+        :raise ParamError: 游标无效时抛出异常
+        """
+        if only_fields and self.cursor_field and self.cursor_field not in only_fields:
+            # 生成游标要用到排序字段，必须一起查出来，否则每行都会回表
+            only_fields = [*only_fields, self.cursor_field]
+        queryset, has_filter = self.filter_queryset(filters, only_fields=only_fields)
+        if as_values:
+            # 生成游标要用到主键
+            value_fields = ["id", *[name for name in only_fields if name != "id"]] if only_fields else []
+            queryset = queryset.values(*value_fields)
+        if self.cursor_field:
+            queryset = queryset.order_by(F(self.cursor_field).desc(nulls_last=True), "-id")
+        else:
+            queryset = queryset.order_by("-id")
+
+        # 步骤1：根据游标拼接seek条件
+        last_values = decode_cursor(cursor)
+        if last_values is not None:
+            queryset = queryset.filter(self._cursor_condition(last_values))
+
+        # 步骤2：多查一条，判断是否还有下一页
+        rows = list(queryset[:page_size + 1])
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = self._make_cursor(rows[-1])
+        return rows, next_cursor, has_filter
+
+    def _make_cursor(self, obj) -> str:
+        """根据一页的最后一行（模型对象或values()行字典）生成游标"""
+        if isinstance(obj, dict):
+            pk, value = obj["id"], obj.get(self.cursor_field)
+        else:
+            pk, value = obj.pk, getattr(obj, self.cursor_field) if self.cursor_field else None
+        if self.cursor_field:
+            return encode_cursor([value.isoformat() if value is not None else None, pk])
+        return encode_cursor([pk])
+
+    def _cursor_condition(self, last_values: List) -> Q:
+        """把游标里的排序键转换成 (cursor_field, id) < (...) 的查询条件"""
+        try:
+            last_id = int(last_values[-1])
+        except (ValueError, TypeError):
+            raise ParamError(detail="游标参数无效")
+        if not self.cursor_field:
+            return Q(id__lt=last_id)
+        if len(last_values) != 2:
+            raise ParamError(detail="游标参数无效")
+
+        field = self.cursor_field
+        if last_values[0] is None:
+            # 已经翻到空值区：只剩下空值且ID更小的行
+            return Q(**{f"{field}__isnull": True, "id__lt": last_id})
+        try:
+            last_value = self.model._meta.get_field(field).to_python(last_values[0])
+        except ValidationError:
+            raise ParamError(detail="游标参数无效")
+        return (
+                Q(**{f"{field}__lt": last_value})
+                | Q(**{field: last_value, "id__lt": last_id})
+                | Q(**{f"{field}__isnull": True})
+        )
+
+    def iter_values(
+            self,
+            filters: Dict,
+            columns: List[str],
+            chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> Iterator[Dict]:
+        """
+        分批迭代筛选结果（字典形式），用于大批量导出
+        新手必看：
+        - 按ID倒序，每批用 id < 上一批最小ID 取下一批（keyset），不用OFFSET
+        - 每次只有一批数据在内存里，且不依赖数据库驱动的服务端游标
+        :param filters: 筛选条件字典
+        :param columns: 要查询的列
+        :param chunk_size: 每批行数
+        :return: 行字典迭代器
+        """
+        queryset, _ = self.filter_queryset(filters, order_by="-id")
+        fetch_columns = columns if "id" in columns else ["id", *columns]
+        queryset = queryset.values(*fetch_columns)
+
+        last_id = None
+        while True:
+            chunk_queryset = queryset if last_id is None else queryset.filter(id__lt=last_id)
+            rows = list(chunk_queryset[:chunk_size])
+            if not rows:
+                return
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1]["id"]
+
+    def get_by_id(self, pk: int, only_fields: Optional[List[str]] = None) -> models.Model:
         """
         按ID查询单条数据
         :param pk: 主键ID
+        :param only_fields: 只查询这些列，为空表示全部列
         :return: 模型对象
         :raise DataNotFoundError: 数据不存在时抛出异常
         """
+        queryset = self.model.objects.all()
+        if only_fields:
+            queryset = queryset.only(*only_fields)
         try:
-            return self.model.objects.get(pk=pk)
+            return queryset.get(pk=pk)
         except self.model.DoesNotExist:
             raise DataNotFoundError(detail=f"ID为{pk}的数据不存在")
 
@@ -67,7 +340,90 @@ class BaseRepository(ABC):
         :param data: 新增数据字典
         :return: 新增的模型对象
         """
-        return self.model.objects.create(**data)
+        with transaction.atomic():
+            obj = self.model.objects.create(**self.normalize_natural_key(data))
+            self.on_write([obj])
+        return obj
+
+    def bulk_create(self, data_list: List[Dict], batch_size: int = BULK_BATCH_SIZE) -> int:
+        """
+        批量新增数据：一个事务内按batch_size分批INSERT
+        :param data_list: 新增数据字典列表（已校验）
+        :param batch_size: 每条INSERT语句包含的行数
+        :return: 新增条数
+        """
+        if not data_list:
+            return 0
+        with transaction.atomic():
+            objs = self.model.objects.bulk_create(
+                [self.model(**data) for data in data_list], batch_size=batch_size
+            )
+            self.on_write(objs)
+        return len(objs)
+
+    def bulk_upsert(self, data_list: List[Dict], batch_size: int = BULK_BATCH_SIZE) -> int:
+        """
+        按自然键（natural_key）批量upsert：已存在的行更新，不存在的行插入
+        新手必看：
+        - 一条 INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE 完成，不用先删后插
+        - 重跑同一批数据、补录更正数据都只需要再导一遍
+        - 同一批里自然键重复的行只保留最后一条（PostgreSQL同一条语句不能更新同一行两次）
+        :param data_list: 数据字典列表（已校验）
+        :param batch_size: 每条SQL包含的行数
+        :return: 处理条数（插入+更新）
+        """
+        if not self.natural_key:
+            raise NotImplementedError("使用bulk_upsert的仓储必须指定natural_key属性")
+        data_list = self.dedupe_by_natural_key([self.normalize_natural_key(data) for data in data_list])
+        if not data_list:
+            return 0
+        # 冲突时更新除主键、自然键、创建时间以外的所有字段
+        update_fields = [
+            field.name for field in self.model._meta.concrete_fields
+            if not field.primary_key and field.name not in self.natural_key and field.name != "create_time"
+        ]
+        options = {"update_conflicts": True, "update_fields": update_fields, "batch_size": batch_size}
+        # MySQL的ON DUPLICATE KEY UPDATE不能指定冲突列，由唯一约束自动判断
+        if connection.features.supports_update_conflicts_with_target:
+            options["unique_fields"] = list(self.natural_key)
+        with transaction.atomic():
+            previous = self.existing_rows(data_list)
+            objs = self.model.objects.bulk_create([self.model(**data) for data in data_list], **options)
+            self.on_write([*previous, *objs])
+        return len(objs)
+
+    def normalize_natural_key(self, data: Dict) -> Dict:
+        """
+        写入前统一自然键的取值（默认原样返回，子类按需重写，比如把日期时间截断到当天0点）
+        :param data: 数据字典
+        :return: 处理后的数据字典（不修改传入的字典）
+        """
+        return data
+
+    def dedupe_by_natural_key(self, data_list: List[Dict]) -> List[Dict]:
+        """
+        同一批数据按自然键去重：重复的只保留最后一条，和逐条upsert的结果一致
+        自然键有空值的行不去重（数据库里NULL不会触发唯一约束冲突）
+        :param data_list: 数据字典列表
+        :return: 去重后的数据字典列表（保持首次出现的顺序）
+        """
+        positions, result = {}, []
+        for data in data_list:
+            key = tuple(data.get(name) for name in self.natural_key)
+            if None not in key and key in positions:
+                result[positions[key]] = data
+                continue
+            if None not in key:
+                positions[key] = len(result)
+            result.append(data)
+        return result
+
+    def existing_rows(self, data_list: List[Dict]) -> List[models.Model]:
+        """
+        upsert前查出会被更新的旧行，和新行一起传给on_write（默认不查，子类需要旧值时重写）
+        :param data_list: 即将upsert的数据字典列表
+        """
+        return []
 
     def update(self, pk: int, data: Dict) -> models.Model:
         """
@@ -76,12 +432,21 @@ class BaseRepository(ABC):
         :param data: 修改数据字典
         :return: 修改后的模型对象
         :raise DataNotFoundError: 数据不存在时抛出异常
+        :raise ParamError: 改到已存在的唯一字段（比如自然键）上时抛出异常
         """
         obj = self.get_by_id(pk)
-        for key, value in data.items():
+        previous = copy.copy(obj)
+        for key, value in self.normalize_natural_key(data).items():
             if hasattr(obj, key):
                 setattr(obj, key, value)
-        obj.save()
+        with transaction.atomic():
+            try:
+                # 保存点：序列化器校验之后并发写入造成的唯一约束冲突，返回参数错误而不是500
+                with transaction.atomic():
+                    obj.save()
+            except IntegrityError:
+                raise ParamError(detail=MSG_DATA_CONFLICT)
+            self.on_write([previous, obj])
         return obj
 
     def delete(self, pk: int) -> bool:
@@ -92,5 +457,25 @@ class BaseRepository(ABC):
         :raise DataNotFoundError: 数据不存在时抛出异常
         """
         obj = self.get_by_id(pk)
-        obj.delete()
+        with transaction.atomic():
+            obj.delete()
+            self.on_write([obj])
         return True
+
+    def on_write(self, instances: List[models.Model]) -> None:
+        """
+        写操作钩子：新增/修改/删除/批量写入后、在同一个事务里调用，子类重写来维护派生数据（比如汇总表）
+        新手必看：
+        - 和写入同一个事务：派生数据维护失败时写入一起回滚，不会出现数据已保存、接口却返回500
+        - bulk_create不会触发Django的post_save信号，所以派生数据统一在这里维护
+        - 修改操作会同时传入修改前、修改后两个对象，方便同时刷新新旧两组数据
+        - 子类重写时要调用super().on_write()，表的数据版本号在这里+1，依赖它的缓存/内存索引才会失效
+        :param instances: 受影响的模型对象
+        """
+        self.bump_generation()
+
+    def bump_generation(self) -> int:
+        """
+        表的数据版本号+1：不经过on_write的批量更新（比如bulk_update）写完后直接调用
+        """
+        return bump_generation(self.model._meta.db_table)
@@ -0,0 +1,64 @@
+"""
+CellUserScoreDirty 业务仓储：登记和领取待重算用户均分的小区
+新手必看：
+- UserScore增删改后登记cell_id，同一个小区只保留一行，重复登记只刷新登记时间
+- 重算时先记下开始时间，只清除开始之前登记的小区；重算期间又被修改的小区会留到下一轮
+"""
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from django.db import connection
+from django.utils import timezone
+
+from core.constants.core_constants import BULK_BATCH_SIZE
+from feellist.models import CellUserScoreDirty
+from feellist.repositories.base import BaseRepository
+
+
+class CellUserScoreDirtyRepository(BaseRepository):
+    """
+    CellUserScoreDirty 仓储类
+    """
+    model = CellUserScoreDirty
+
+    def mark(self, cell_ids: Iterable) -> int:
+        """
+        登记待重算的小区（已登记的刷新登记时间）
+        :param cell_ids: 小区ID，None会被忽略
+        :return: 登记的小区数
+        """
+        now = timezone.now()
+        objs = [self.model(cell_id=cell_id, mark_time=now) for cell_id in set(cell_ids) if cell_id is not None]
+        if not objs:
+            return 0
+        options = {"update_conflicts": True, "update_fields": ["mark_time"], "batch_size": BULK_BATCH_SIZE}
+        # MySQL的ON DUPLICATE KEY UPDATE不能指定冲突列，由唯一约束自动判断
+        if connection.features.supports_update_conflicts_with_target:
+            options["unique_fields"] = ["cell_id"]
+        self.model.objects.bulk_create(objs, **options)
+        return len(objs)
+
+    def pending(self, before: datetime, after_cell_id: int = -1, limit: int = BULK_BATCH_SIZE) -> List[int]:
+        """
+        按cell_id顺序领取一批登记时间早于before的小区（键集分页）
+        :param before: 本轮重算的开始时间
+        :param after_cell_id: 上一批最后一个cell_id
+        :param limit: 每批数量
+        """
+        return list(
+            self.model.objects.filter(mark_time__lte=before, cell_id__gt=after_cell_id)
+            .order_by("cell_id").values_list("cell_id", flat=True)[:limit]
+        )
+
+    def clear(self, before: datetime, cell_ids: Optional[List[int]] = None) -> int:
+        """
+        清除已重算的小区（重算开始后又被登记的保留）
+        :param before: 本轮重算的开始时间
+        :param cell_ids: 已重算的小区，为None表示全部（全量重算后）
+        :return: 清除条数
+        """
+        queryset = self.model.objects.filter(mark_time__lte=before)
+        if cell_ids is not None:
+            queryset = queryset.filter(cell_id__in=cell_ids)
+        deleted, _ = queryset.delete()
+        return deleted
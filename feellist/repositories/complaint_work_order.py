@@ -0,0 +1,86 @@
+"""
+ComplaintWorkOrder 业务仓储：专门处理投诉工单表的数据库操作
+"""
+from datetime import datetime, time, timedelta
+from functools import reduce
+from operator import and_, or_
+from typing import Dict, List
+
+from django.db import connection
+from django.db.models import FloatField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from core.utils.core_filters import validate_city, validate_date, validate_str
+from core.utils.core_search import boolean_query
+from feellist.models import ComplaintWorkOrder
+from feellist.repositories.base import BaseRepository
+
+
+class ComplaintWorkOrderRepository(BaseRepository):
+    """
+    ComplaintWorkOrder 仓储类
+    """
+    model = ComplaintWorkOrder
+    # 游标分页按(接单时间, id)倒序，命中system_receive_time索引
+    cursor_field = "system_receive_time"
+    # 自然键：工单号（对应唯一约束 uniq_complaint_work_order_no）
+    natural_key = ("work_order_no",)
+    # 分组统计白名单
+    group_by_fields = dict.fromkeys([
+        "city", "area", "work_order_status", "complaint_level", "professional_type", "network_type",
+        "problem_category", "complaint_scene", "is_solved", "is_overtime"
+    ])
+    metric_fields = ("work_order_points", "repeat_times", "whole_order_time_limit")
+    # 全文搜索字段（MySQL上对应全文索引 ft_complaint_text，见迁移0018）
+    search_fields = ("complaint_content", "complaint_detail", "complaint_address", "reply_service_content")
+    # 搜索结果返回的列（不含大文本字段）
+    search_result_fields = ("id", "work_order_no", "report_phone", "city", "area", "work_order_status",
+                            "system_receive_time")
+
+    def validate_filters(self, filters: Dict) -> Dict:
+        """
+        重写筛选参数校验：添加投诉工单特有的参数校验
+        """
+        validated_filters = {}
+        if "city" in filters:
+            validated_filters["city"] = validate_city(filters["city"])
+        # 文本类等值条件：都有索引或唯一约束
+        for name, param_name in (("area", "区域"), ("work_order_status", "工单状态"),
+                                 ("report_phone", "受理号码"), ("work_order_no", "工单号")):
+            if name in filters:
+                validated_filters[name] = validate_str(filters[name], param_name)
+        # 接单日期范围（按天，包含首尾两天）：转换成半开区间，能走system_receive_time索引
+        if "date_start" in filters:
+            start = validate_date(filters["date_start"], "开始日期")
+            validated_filters["system_receive_time__gte"] = timezone.make_aware(datetime.combine(start, time.min))
+        if "date_end" in filters:
+            end = validate_date(filters["date_end"], "结束日期")
+            validated_filters["system_receive_time__lt"] = timezone.make_aware(
+                datetime.combine(end + timedelta(days=1), time.min)
+            )
+        return validated_filters
+
+    # ==================== 全文搜索 ====================
+    def search_queryset(self, terms: List[str], filters: Dict) -> QuerySet:
+        """
+        关键词搜索的查询集（不执行查询），结果带score（相关度）和搜索字段原文（用于生成摘要）
+        - MySQL：MATCH ... AGAINST 走ngram全文索引，按相关度倒序
+        - 其他数据库：每个词在任一搜索字段里 LIKE '%词%'，按接单时间倒序，score为空
+        :param terms: 关键词列表（parse_search_terms的结果）
+        :param filters: 其他筛选条件（同列表接口）
+        """
+        queryset, _ = self.filter_queryset(filters)
+        columns = (*self.search_result_fields, *self.search_fields)
+        if connection.vendor == "mysql":
+            match_sql = f"MATCH ({', '.join(self.search_fields)}) AGAINST (%s IN BOOLEAN MODE)"
+            query = boolean_query(terms)
+            # WHERE MATCH(...) > 0：全文索引可用的写法（直接把MATCH当布尔条件，Django会生成“= 1”，结果不对）
+            return (queryset.annotate(score=RawSQL(match_sql, [query], output_field=FloatField()))
+                    .filter(score__gt=0).order_by("-score", "-id").values(*columns, "score"))
+
+        condition = reduce(and_, [
+            reduce(or_, [Q(**{f"{field}__icontains": term}) for field in self.search_fields]) for term in terms
+        ])
+        return (queryset.filter(condition).order_by("-system_receive_time", "-id")
+                .values(*columns).annotate(score=RawSQL("NULL", [], output_field=FloatField())))
@@ -1,13 +1,30 @@
 """
 NetworkSceneData 业务仓储：专门处理小区场景数据表的数据库操作
 """
-from typing import Dict, List, Tuple
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
 
+from django.db import transaction
+from django.db.models import Avg, Case, Count, F, FloatField, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Floor, TruncDate
+from django.utils import timezone
+
+from core.constants.core_constants import BULK_BATCH_SIZE
 from core.utils.core_filters import (
-    validate_city, validate_cell_id, validate_int
+    validate_city, validate_cell_id, validate_int, validate_date
+)
+from feellist.fileds.base_fileds import (
+    city_field, area_field, indoor_outdoor_field, manufacturer_field, contractor_field, complaint_field
 )
-from feellist.models import NetworkSceneData
+from feellist.fileds.cell_indicator_fileds import cell_indicator_fields
+from feellist.models import NetworkSceneData, UserScore
 from feellist.repositories.base import BaseRepository
+from feellist.repositories.scene_rollup import ROLLUP_DIMENSIONS, NetworkSceneRollupRepository
+
+# 汇总键对应的原始表字段：写入前后取这几列就能算出受影响的汇总行
+ROLLUP_KEY_FIELDS = ("date", *ROLLUP_DIMENSIONS)
 
 
 class NetworkSceneDataRepository(BaseRepository):
@@ -15,10 +32,29 @@ class NetworkSceneDataRepository(BaseRepository):
     NetworkSceneData 仓储类
     """
     model = NetworkSceneData
+    # 游标分页按(date, id)倒序，命中date索引
+    cursor_field = "date"
+    # 自然键：每个小区每天一条（对应唯一约束 uniq_scene_date_cell）
+    natural_key = ("date", "cell_id")
+    # 分组统计白名单：维度来自组合字段工厂，date按天分组
+    group_by_fields = {
+        **dict.fromkeys([
+            *city_field(), "scene_level1", *area_field(), *indoor_outdoor_field(),
+            *manufacturer_field(), *contractor_field(), *complaint_field()
+        ]),
+        "date": TruncDate("date"),
+    }
+    metric_fields = ("cell_score", "cell_user_avg_score", *cell_indicator_fields())
+
+    def __init__(self):
+        super().__init__()
+        self.rollup = NetworkSceneRollupRepository()
+        # 延迟刷新汇总表时，按线程暂存受影响的(日期, 地市)
+        self._deferred = threading.local()
 
-    def filter(self, filters: Dict, order_by: str = "-id") -> Tuple[List[NetworkSceneData], bool]:
+    def validate_filters(self, filters: Dict) -> Dict:
         """
-        重写筛选方法：添加NetworkSceneData特有的参数校验
+        重写筛选参数校验：添加NetworkSceneData特有的参数校验
         """
         validated_filters = {}
         # 基础筛选条件校验
@@ -33,13 +69,261 @@ class NetworkSceneDataRepository(BaseRepository):
             validated_filters["scene_level1"] = validate_int(filters["scene_level1"], "场景类型")
         if "area" in filters:
             validated_filters["area"] = validate_int(filters["area"], "区域类型")
+        # 日期范围（按天，包含首尾两天）：转换成 date >= 开始日0点 且 date < 结束日次日0点，能走date索引
+        if "date_start" in filters:
+            start = validate_date(filters["date_start"], "开始日期")
+            validated_filters["date__gte"] = timezone.make_aware(datetime.combine(start, time.min))
+        if "date_end" in filters:
+            end = validate_date(filters["date_end"], "结束日期")
+            validated_filters["date__lt"] = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
 
-        return super().filter(validated_filters, order_by)
+        return validated_filters
 
     # ==================== NetworkSceneData 特有方法 ====================
+    def count_complaints(self, filters: Dict) -> Dict[str, int]:
+        """
+        统计小区总数和有投诉小区数（一条SQL聚合，不加载数据行）
+        :param filters: 筛选条件字典
+        :return: {"total": 总小区数, "complaint": 有投诉小区数}
+        """
+        rollup_filters = self._rollup_filters(filters)
+        if rollup_filters is not None:
+            return self.rollup.model.objects.filter(**rollup_filters).aggregate(
+                total=Coalesce(Sum("cell_count"), 0),
+                complaint=Coalesce(Sum("complaint_count"), 0),
+            )
+        queryset, _ = self.filter_queryset(filters)
+        return queryset.order_by().aggregate(
+            total=Count("id"),
+            complaint=Count("id", filter=Q(has_complaint=1)),
+        )
+
+    def count_by_scene(self, filters: Dict) -> Dict[int, int]:
+        """
+        按一级场景分组统计小区数（GROUP BY在数据库完成）
+        :param filters: 筛选条件字典
+        :return: {场景ID: 小区数量}
+        """
+        rollup_filters = self._rollup_filters(filters)
+        if rollup_filters is not None:
+            rows = (self.rollup.model.objects.filter(**rollup_filters).values("scene_level1")
+                    .annotate(count=Sum("cell_count")).order_by("scene_level1"))
+        else:
+            queryset, _ = self.filter_queryset(filters)
+            rows = queryset.order_by().values("scene_level1").annotate(count=Count("id")).order_by("scene_level1")
+        return {row["scene_level1"]: row["count"] for row in rows}
+
+    def latest_day(self) -> Optional[date]:
+        """最新一天的数据日期（按当前时区），没有数据时返回None"""
+        latest = self.model.objects.aggregate(latest=Max("date"))["latest"]
+        return self.rollup.day_of(latest)
+
+    def grid_aggregate(self, filters: Dict, bin_degrees: float, lat_bins: Tuple[int, int],
+                       lon_bins: Tuple[int, int]) -> List[Dict]:
+        """
+        经纬度网格聚合：GROUP BY FLOOR((纬度+90)/网格大小), FLOOR((经度+180)/网格大小)
+        :param filters: 筛选条件字典
+        :param bin_degrees: 网格大小（度）
+        :param lat_bins: 纬度网格编号范围（包含首尾）
+        :param lon_bins: 经度网格编号范围（包含首尾）
+        :return: 每个有数据的网格一行：lat_bin、lon_bin、count、avg_score、complaint_count
+        """
+        queryset, _ = self.filter_queryset(filters)
+        # 先按经纬度范围过滤（能走索引/减少分组行数），再算网格编号
+        queryset = queryset.order_by().filter(
+            latitude__gte=lat_bins[0] * bin_degrees - 90, latitude__lt=(lat_bins[1] + 1) * bin_degrees - 90,
+            longitude__gte=lon_bins[0] * bin_degrees - 180, longitude__lt=(lon_bins[1] + 1) * bin_degrees - 180,
+        )
+        rows = (
+            queryset.values(
+                lat_bin=Floor((F("latitude") + 90) / bin_degrees),
+                lon_bin=Floor((F("longitude") + 180) / bin_degrees),
+            )
+            .annotate(count=Count("id"), avg_score=Avg("cell_score"),
+                      complaint_count=Count("id", filter=Q(has_complaint=1)))
+            .order_by("lat_bin", "lon_bin")
+        )
+        return [{**row, "lat_bin": int(row["lat_bin"]), "lon_bin": int(row["lon_bin"])} for row in rows]
+
+    def group_aggregate(
+            self,
+            filters: Dict,
+            group_by: List[str],
+            metrics: List[Tuple[str, Optional[str]]]
+    ) -> List[Dict]:
+        """
+        重写分组统计：维度、筛选、指标都落在汇总键上时读日汇总表，否则查原始表
+        """
+        rows = self.rollup.group_aggregate(self.validate_filters(filters), group_by, metrics)
+        if rows is not None:
+            return rows
+        return super().group_aggregate(filters, group_by, metrics)
+
+    def _rollup_filters(self, filters: Dict) -> Optional[Dict]:
+        """筛选条件能在汇总表上执行时返回翻译后的条件，否则返回None"""
+        if not self.rollup.enabled():
+            return None
+        return self.rollup.translate_filters(self.validate_filters(filters))
+
+    # ==================== 汇总表维护 ====================
+    def on_write(self, instances: List[NetworkSceneData]) -> None:
+        """
+        写操作后（同一个事务里）刷新受影响的汇总行：(日期, 地市, 一级场景, 区域)
+        """
+        super().on_write(instances)
+        self._refresh_rollup({
+            (self.rollup.day_of(obj.date), obj.city, obj.scene_level1, obj.area) for obj in instances
+        })
+
+    def _refresh_rollup(self, keys: set) -> None:
+        """刷新汇总键；在defer_rollup块内时只记录，退出时统一刷新"""
+        pending = getattr(self._deferred, "keys", None)
+        if pending is not None:
+            pending.update(keys)
+            return
+        self.rollup.refresh(keys)
+
+    @contextmanager
+    def defer_rollup(self):
+        """
+        导入命令使用：块内的写操作只记录受影响的汇总键，退出时统一刷新一次
+        退出时的刷新和块内的写入不在同一个事务里，刷新失败时命令报错，数据已经写入，
+        需要执行 python manage.py rebuild_scene_rollup 补齐汇总；接口请求不用这个方法，每批写入在自己的事务里刷新
+        用法：
+            with repository.defer_rollup():
+                for chunk in chunks:
+                    repository.bulk_upsert(chunk)
+        """
+        self._deferred.keys = set()
+        try:
+            yield
+        finally:
+            keys, self._deferred.keys = self._deferred.keys, None
+            if keys:
+                self.rollup.refresh(keys)
+
     def get_complaint_data_by_city(self, city: int) -> List[NetworkSceneData]:
         """
         查询指定地市的有投诉数据
         """
         city = validate_city(city)
         return list(self.model.objects.filter(city=city, has_complaint=1).order_by("-create_time"))
+
+    def create(self, data: Dict) -> NetworkSceneData:
+        """
+        重写新增：带齐自然键(date, cell_id)时按自然键upsert，重复提交不会产生重复行
+        """
+        data = self.normalize_natural_key(data)
+        if all(data.get(key) is not None for key in self.natural_key):
+            lookup = {key: data[key] for key in self.natural_key}
+            defaults = {key: value for key, value in data.items() if key not in self.natural_key}
+            with transaction.atomic():
+                previous = self.model.objects.filter(**lookup).only(*ROLLUP_KEY_FIELDS).first()
+                obj, _ = self.model.objects.update_or_create(defaults=defaults, **lookup)
+                self.on_write([obj] if previous is None else [previous, obj])
+            return obj
+        return super().create(data)
+
+    def normalize_natural_key(self, data: Dict) -> Dict:
+        """
+        重写自然键处理：date截断到当天0点（当前时区），同一天不同时间点的数据算同一条
+        """
+        value = data.get("date")
+        if isinstance(value, datetime):
+            day_start = timezone.make_aware(datetime.combine(self.rollup.day_of(value), time.min))
+            if day_start != value:
+                data = {**data, "date": day_start}
+        return data
+
+    def existing_rows(self, data_list: List[Dict]) -> List[NetworkSceneData]:
+        """
+        重写upsert前的查询：按自然键查出已存在的行（只取汇总键的列）
+        被更新的行可能改了地市，修改前的汇总键也要刷新
+        """
+        existing = []
+        for start in range(0, len(data_list), BULK_BATCH_SIZE):
+            batch = data_list[start:start + BULK_BATCH_SIZE]
+            dates = {data.get("date") for data in batch if data.get("date") is not None}
+            cell_ids = {data.get("cell_id") for data in batch if data.get("cell_id") is not None}
+            if dates and cell_ids:
+                existing.extend(self.model.objects.filter(date__in=dates, cell_id__in=cell_ids).only(*ROLLUP_KEY_FIELDS))
+        return existing
+
+    # ==================== 评分重算 ====================
+    def get_days(self, filters: Dict) -> List:
+        """
+        符合筛选条件的数据日期列表（按天去重、升序）
+        """
+        queryset, _ = self.filter_queryset(filters)
+        days = queryset.order_by().annotate(day=TruncDate("date")).values_list("day", flat=True).distinct()
+        return sorted(day for day in days if day is not None)
+
+    def get_day_values(self, filters: Dict, day, fields: List[str]) -> List[tuple]:
+        """
+        读取某一天的指定列（values_list，不创建模型对象）
+        :param filters: 筛选条件（同列表接口，date_start/date_end会被这一天覆盖）
+        :param day: 日期
+        :param fields: 列名列表
+        :return: 元组列表，列顺序同fields
+        """
+        day_filters = {**filters, "date_start": day.isoformat(), "date_end": day.isoformat()}
+        queryset, _ = self.filter_queryset(day_filters)
+        return list(queryset.order_by().values_list(*fields))
+
+    def bulk_update_scores(self, day, rows: List[Tuple[int, Optional[int], float]],
+                           batch_size: int = BULK_BATCH_SIZE) -> int:
+        """
+        按ID分批写回评分（bulk_update，每批一条UPDATE ... CASE语句），并在同一个事务里刷新这一天受影响的汇总行
+        :param day: 数据日期（用于刷新汇总表）
+        :param rows: [(ID, 地市, 一级场景, 区域, 新评分)]
+        :param batch_size: 每条SQL更新的行数
+        :return: 更新条数
+        """
+        if not rows:
+            return 0
+        # bulk_update不会自动刷新auto_now字段，手动带上，快照等按update_time增量同步的地方才能感知
+        now = timezone.now()
+        objs = [self.model(id=pk, cell_score=score, update_time=now) for pk, *_, score in rows]
+        with transaction.atomic():
+            for start in range(0, len(objs), batch_size):
+                self.model.objects.bulk_update(objs[start:start + batch_size], ["cell_score", "update_time"])
+            self.bump_generation()
+            self._refresh_rollup({(day, city, scene_level1, area) for _, city, scene_level1, area, _ in rows})
+        return len(objs)
+
+    # ==================== 小区用户均分 ====================
+    def update_user_avg_scores(self, averages: Dict[int, Optional[float]], batch_size: int = BULK_BATCH_SIZE) -> int:
+        """
+        按小区ID批量写回用户均分：每批一条 UPDATE ... SET cell_user_avg_score = CASE cell_id WHEN ... END
+        同一个小区所有日期的行都会更新（用户均分是小区级的，不区分日期）
+        :param averages: {小区ID: 均分}，均分为None表示清空
+        :param batch_size: 每条SQL包含的小区数
+        :return: 更新的行数
+        """
+        now = timezone.now()
+        items = list(averages.items())
+        updated = 0
+        with transaction.atomic():
+            for start in range(0, len(items), batch_size):
+                batch = items[start:start + batch_size]
+                score = Case(
+                    *[When(cell_id=cell_id, then=Value(avg)) for cell_id, avg in batch],
+                    output_field=FloatField()
+                )
+                updated += self.model.objects.filter(cell_id__in=[cell_id for cell_id, _ in batch]).update(
+                    cell_user_avg_score=score, update_time=now
+                )
+            self.bump_generation()
+        return updated
+
+    def clear_stale_user_avg_scores(self) -> int:
+        """
+        清空已经没有任何用户评分的小区的用户均分（全量重算时使用）
+        :return: 更新的行数
+        """
+        scored_cells = UserScore.objects.filter(cell_score__isnull=False, cell_id__isnull=False).values("cell_id")
+        updated = (self.model.objects.filter(cell_user_avg_score__isnull=False)
+                   .exclude(cell_id__in=scored_cells)
+                   .update(cell_user_avg_score=None, update_time=timezone.now()))
+        self.bump_generation()
+        return updated
@@ -0,0 +1,257 @@
+"""
+NetworkSceneDailyRollup 业务仓储：维护和查询小区数据日汇总表
+新手必看：
+- 汇总键：日期 + 地市 + 一级场景 + 区域
+- 原始数据写入时，在同一个事务里按汇总键重算受影响的汇总行（upsert），不用全表重算
+- 统计查询的维度/筛选/指标都落在汇总键上时，直接读汇总表
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, FloatField, IntegerField, Max, Min, Q, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf, TruncDate
+from django.utils import timezone
+
+from core.constants.core_constants import ANALYTICS_MAX_GROUPS
+from feellist.fileds.cell_indicator_fileds import cell_indicator_fields
+from feellist.models import NetworkSceneData, NetworkSceneDailyRollup
+from feellist.repositories.base import BaseRepository
+
+# 汇总键中除日期以外的维度
+ROLLUP_DIMENSIONS = ("city", "scene_level1", "area")
+# 小区指标字段名
+INDICATOR_FIELDS = tuple(cell_indicator_fields())
+# 整数型小区指标：汇总表的合计列是浮点数，读出时转回整数，和原始表聚合的类型一致
+INTEGER_INDICATOR_FIELDS = frozenset(
+    name for name, field in cell_indicator_fields().items() if isinstance(field, IntegerField)
+)
+
+
+
+def _nulls_last(value) -> Tuple:
+    """排序键：空值排在最后（日期、维度取值可能为空）"""
+    return value is None, value
+
+
+class NetworkSceneRollupRepository(BaseRepository):
+    """
+    NetworkSceneDailyRollup 仓储类
+    """
+    model = NetworkSceneDailyRollup
+    source_model = NetworkSceneData
+
+    # ==================== 汇总表维护 ====================
+    @staticmethod
+    def rollup_aggregates() -> Dict:
+        """从原始数据计算汇总度量的聚合表达式"""
+        aggregates = {
+            "cell_count": Count("id"),
+            "complaint_count": Count("id", filter=Q(has_complaint=1)),
+            "score_sum": Sum("cell_score"),
+            "score_count": Count("cell_score"),
+            "score_min": Min("cell_score"),
+            "score_max": Max("cell_score"),
+        }
+        for name in INDICATOR_FIELDS:
+            aggregates[f"{name}_sum"] = Sum(name)
+            aggregates[f"{name}_count"] = Count(name)
+        return aggregates
+
+    @staticmethod
+    def day_of(value: Optional[datetime]) -> Optional[date]:
+        """原始数据的date（时间）→ 汇总表的日期（按当前时区截断到天）"""
+        if value is None:
+            return None
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+    def refresh(self, keys: Iterable[Tuple]) -> int:
+        """
+        增量刷新：按汇总键 (日期, 地市, 一级场景, 区域) 重算汇总行，和原始数据的写入在同一个事务里执行
+        新手必看：
+        - 只聚合受影响的 场景+区域，单行写入不会重算整个(日期, 地市)
+        - 先锁住已有的汇总行（select_for_update，按主键顺序加锁，不会互相死锁）再聚合原始数据：
+          同一个汇总键的并发刷新排队执行，后一个能看到前一个提交的数据
+        - 已有的行原地更新；新出现的键用 INSERT ... ON CONFLICT 写入，并发插入同一个键不会唯一约束冲突；
+          原始数据里已经没有的键删除
+        - 维度有空值的键不受唯一约束保护（NULL互不冲突），极端并发下可能重复，rebuild_scene_rollup 可以修正
+        :param keys: 受影响的 (日期, 地市, 一级场景, 区域) 集合
+        :return: 写入（新增+更新）的汇总行数
+        """
+        keys_by_day = defaultdict(set)
+        for day, *dimensions in keys:
+            keys_by_day[day].add(tuple(dimensions))
+        written = 0
+        with transaction.atomic():
+            for day in sorted(keys_by_day, key=_nulls_last):
+                written += self._refresh_day(day, keys_by_day[day])
+        return written
+
+    def _refresh_day(self, day: Optional[date], dimension_keys: set) -> int:
+        """重算一天里指定 (地市, 一级场景, 区域) 的汇总行"""
+        source, rollups = self._day_querysets(day)
+        condition = Q()
+        for position, name in enumerate(ROLLUP_DIMENSIONS):
+            values = {key[position] for key in dimension_keys}
+            component = Q(**{f"{name}__in": [value for value in values if value is not None]})
+            if None in values:
+                component |= Q(**{f"{name}__isnull": True})
+            condition &= component
+
+        # 按各维度的取值集合筛选（可能多出几个键），再在内存里只保留受影响的键
+        existing = {}
+        for obj in rollups.filter(condition).select_for_update().order_by("pk"):
+            key = tuple(getattr(obj, name) for name in ROLLUP_DIMENSIONS)
+            if key in dimension_keys:
+                existing[key] = obj
+        computed = {}
+        for row in source.filter(condition).order_by().values(*ROLLUP_DIMENSIONS).annotate(**self.rollup_aggregates()):
+            key = tuple(row[name] for name in ROLLUP_DIMENSIONS)
+            if key in dimension_keys:
+                computed[key] = row
+
+        measures = list(self.rollup_aggregates())
+        now = timezone.now()
+        updated, created = [], []
+        for key in sorted(computed, key=lambda k: tuple(map(_nulls_last, k))):
+            row = computed[key]
+            obj = existing.pop(key, None)
+            if obj is None:
+                created.append(self.model(date=day, **row))
+                continue
+            for name in measures:
+                setattr(obj, name, row[name])
+            obj.update_time = now
+            updated.append(obj)
+        if existing:
+            self.model.objects.filter(pk__in=[obj.pk for obj in existing.values()]).delete()
+        if updated:
+            self.model.objects.bulk_update(updated, [*measures, "update_time"])
+        if created:
+            options = {"update_conflicts": True, "update_fields": [*measures, "update_time"]}
+            if connection.features.supports_update_conflicts_with_target:
+                options["unique_fields"] = ["date", *ROLLUP_DIMENSIONS]
+            self.model.objects.bulk_create(created, **options)
+        return len(updated) + len(created)
+
+    def rebuild(self, date_start: Optional[date] = None, date_end: Optional[date] = None) -> int:
+        """
+        全量重建（可限定日期范围，包含首尾）
+        :return: 写入的汇总行数
+        """
+        source = self.source_model.objects.all()
+        rollups = self.model.objects.all()
+        if date_start:
+            source = source.filter(date__gte=self._day_start(date_start))
+            rollups = rollups.filter(date__gte=date_start)
+        if date_end:
+            source = source.filter(date__lt=self._day_start(date_end + timedelta(days=1)))
+            rollups = rollups.filter(date__lte=date_end)
+        days = set(source.order_by().annotate(day=TruncDate("date")).values_list("day", flat=True).distinct())
+        if date_start or date_end:
+            days.discard(None)
+
+        written = 0
+        with transaction.atomic():
+            rollups.delete()
+            for day in sorted(days, key=_nulls_last):
+                source, _ = self._day_querysets(day)
+                rows = source.order_by().values(*ROLLUP_DIMENSIONS).annotate(**self.rollup_aggregates())
+                objs = self.model.objects.bulk_create([self.model(date=day, **row) for row in rows])
+                written += len(objs)
+        return written
+
+    def _day_querysets(self, day: Optional[date]):
+        """某一天的 (原始数据, 汇总行) 查询集"""
+        if day is None:
+            return (self.source_model.objects.filter(date__isnull=True),
+                    self.model.objects.filter(date__isnull=True))
+        return (self.source_model.objects.filter(date__gte=self._day_start(day),
+                                                 date__lt=self._day_start(day + timedelta(days=1))),
+                self.model.objects.filter(date=day))
+
+    @staticmethod
+    def _day_start(day: date) -> datetime:
+        """某天0点（当前时区）"""
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    # ==================== 汇总表查询 ====================
+    @staticmethod
+    def enabled() -> bool:
+        """是否允许统计接口读汇总表（默认关闭：先执行 rebuild_scene_rollup 生成历史汇总再打开）"""
+        return getattr(settings, "FEELLIST_SCENE_ROLLUP_ENABLED", False)
+
+    def translate_filters(self, validated_filters: Dict) -> Optional[Dict]:
+        """
+        把原始表的筛选条件翻译成汇总表的筛选条件
+        :param validated_filters: 原始表仓储validate_filters的结果
+        :return: 汇总表筛选条件；有汇总键以外的条件时返回None（只能查原始表）
+        """
+        translated = {}
+        for key, value in validated_filters.items():
+            if key in ROLLUP_DIMENSIONS:
+                translated[key] = value
+            elif key in ("date__gte", "date__lt"):
+                # 日期范围的边界都是某天0点，换算成日期
+                translated[key] = self.day_of(value)
+            else:
+                return None
+        return translated
+
+    def translate_metric(self, func: str, field: Optional[str]):
+        """
+        把原始表的聚合指标翻译成汇总表上的聚合表达式，不支持时返回None
+        :param func: 聚合函数 sum/avg/min/max/count
+        :param field: 字段名，count时可以为空
+        """
+        if func == "count" and field is None:
+            return Coalesce(Sum("cell_count"), 0)
+        if field == "cell_score":
+            prefix = "score"
+        elif field in INDICATOR_FIELDS:
+            prefix = field
+        else:
+            return None
+        if func == "sum":
+            if field in INTEGER_INDICATOR_FIELDS:
+                return Cast(Sum(f"{prefix}_sum"), IntegerField())
+            return Sum(f"{prefix}_sum")
+        if func == "avg":
+            return Cast(Sum(f"{prefix}_sum"), FloatField()) / NullIf(Sum(f"{prefix}_count"), 0)
+        if func == "count":
+            return Coalesce(Sum(f"{prefix}_count"), 0)
+        if prefix == "score" and func in ("min", "max"):
+            return (Min if func == "min" else Max)(f"score_{func}")
+        return None
+
+    def group_aggregate(
+            self,
+            filters: Dict,
+            group_by: List[str],
+            metrics: List[Tuple[str, Optional[str]]]
+    ) -> Optional[List[Dict]]:
+        """
+        在汇总表上做分组统计，查询形状不匹配汇总键时返回None
+        :param filters: 原始表校验后的筛选条件
+        :param group_by: 分组维度
+        :param metrics: [(聚合函数, 字段名)]
+        """
+        if not self.enabled():
+            return None
+        translated = self.translate_filters(filters)
+        if translated is None or any(name not in ("date", *ROLLUP_DIMENSIONS) for name in group_by):
+            return None
+        aggregates = {}
+        for func, field in metrics:
+            expression = self.translate_metric(func, field)
+            if expression is None:
+                return None
+            aggregates["count" if field is None else f"{func}_{field}"] = expression
+
+        queryset = self.model.objects.filter(**translated).order_by()
+        if not group_by:
+            return [queryset.aggregate(**aggregates)]
+        rows = queryset.values(*group_by).annotate(**aggregates).order_by(*group_by)[:ANALYTICS_MAX_GROUPS + 1]
+        return self.check_group_limit(rows)
@@ -4,11 +4,18 @@ UserScore 业务仓储：专门处理用户评分表的数据库操作
 - 继承BaseRepository，复用基础增删改查
 - 只需要写UserScore特有的筛选逻辑
 """
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional
 
+from django.db.models import Avg, F, Window
+from django.db.models.functions import RowNumber
+
+from core.constants.core_constants import BULK_BATCH_SIZE
 from core.utils.core_filters import validate_city, validate_cell_id, validate_phone
+from feellist.fileds.base_fileds import city_field, net_type_field
+from feellist.fileds.user_indicator_fileds import user_indicator_fields
 from feellist.models import UserScore
 from feellist.repositories.base import BaseRepository
+from feellist.repositories.cell_dirty import CellUserScoreDirtyRepository
 
 
 class UserScoreRepository(BaseRepository):
@@ -16,12 +23,20 @@ class UserScoreRepository(BaseRepository):
     UserScore 仓储类
     """
     model = UserScore  # 指定对应的模型
+    # 分组统计白名单：维度和指标都来自组合字段工厂
+    group_by_fields = dict.fromkeys([*city_field(), *net_type_field(), "scene_level1"])
+    metric_fields = ("cell_score", *user_indicator_fields())
+
+    def __init__(self):
+        super().__init__()
+        self.dirty_cells = CellUserScoreDirtyRepository()
 
-    def filter(self, filters: Dict, order_by: str = "-id") -> Tuple[List[UserScore], bool]:
+    def validate_filters(self, filters: Dict) -> Dict:
         """
-        重写筛选方法：添加UserScore特有的参数校验
+        重写筛选参数校验：添加UserScore特有的参数校验
+        这里只校验、转换参数，不查库；所有条件由父类filter_queryset一次拼进同一条SQL
         """
-        # 步骤1：参数校验（转换为正确的类型）
+        # 参数校验（转换为正确的类型）
         validated_filters = {}
         if "city" in filters:
             validated_filters["city"] = validate_city(filters["city"])
@@ -31,9 +46,7 @@ class UserScoreRepository(BaseRepository):
             validated_filters["phone_number"] = validate_phone(filters["phone_number"])
         if "net_type" in filters:
             validated_filters["net_type"] = validate_cell_id(filters["net_type"])  # net_type也是整数
-
-        # 步骤2：调用父类的filter方法执行筛选
-        return super().filter(validated_filters, order_by)
+        return validated_filters
 
     # ==================== UserScore 特有方法 ====================
     def get_by_city_and_net_type(self, city: int, net_type: int) -> List[UserScore]:
@@ -43,3 +56,79 @@ class UserScoreRepository(BaseRepository):
         city = validate_city(city)
         net_type = validate_cell_id(net_type)
         return list(self.model.objects.filter(city=city, net_type=net_type).order_by("-create_time"))
+
+    def avg_score_by_city_and_net_type(self, city: int, net_type: int) -> Optional[float]:
+        """
+        地市+网络类型的平均小区评分（数据库AVG，走(city, net_type, cell_score)索引）
+        :return: 平均分，没有有效评分时返回None
+        """
+        city = validate_city(city)
+        net_type = validate_cell_id(net_type)
+        return (self.model.objects.filter(city=city, net_type=net_type)
+                .aggregate(avg=Avg("cell_score"))["avg"])
+
+    def get_top_by_score(self, city: int, net_type: int, top_n: int) -> List[UserScore]:
+        """
+        地市+网络类型评分最高的N条（ORDER BY cell_score DESC LIMIT N，走索引，不全量排序）
+        没有评分的数据不参与排名
+        """
+        city = validate_city(city)
+        net_type = validate_cell_id(net_type)
+        return list(
+            self.model.objects.filter(city=city, net_type=net_type, cell_score__isnull=False)
+            .order_by("-cell_score", "-id")[:top_n]
+        )
+
+    def get_top_by_score_per_city(self, net_type: int, top_n: int) -> List[UserScore]:
+        """
+        全省每个地市评分最高的N条：窗口函数 ROW_NUMBER() OVER (PARTITION BY city ORDER BY cell_score DESC)
+        返回的对象带rank属性（地市内名次，从1开始），按地市、名次排序
+        """
+        net_type = validate_cell_id(net_type)
+        return list(
+            self.model.objects.filter(net_type=net_type, cell_score__isnull=False)
+            .annotate(rank=Window(
+                expression=RowNumber(),
+                partition_by=[F("city")],
+                order_by=[F("cell_score").desc(), F("id").desc()],
+            ))
+            .filter(rank__lte=top_n)
+            .order_by("city", "rank")
+        )
+
+    # ==================== 小区用户均分 ====================
+    def on_write(self, instances: List[UserScore]) -> None:
+        """
+        写操作后登记受影响的小区，下次重算 cell_user_avg_score 时只算这些小区
+        """
+        super().on_write(instances)
+        self.dirty_cells.mark(obj.cell_id for obj in instances)
+
+    def avg_score_by_cells(self, cell_ids: List[int]) -> Dict[int, float]:
+        """
+        指定小区的用户均分（一条GROUP BY cell_id，走cell_id索引）
+        :return: {小区ID: 均分}，没有有效评分的小区不在结果里
+        """
+        return dict(
+            self.model.objects.filter(cell_id__in=cell_ids, cell_score__isnull=False)
+            .values("cell_id").annotate(avg=Avg("cell_score")).order_by().values_list("cell_id", "avg")
+        )
+
+    def iter_avg_score_by_cell(self, chunk_size: int = BULK_BATCH_SIZE) -> Iterator[Dict[int, float]]:
+        """
+        全表按小区分组求均分，按cell_id键集分块返回（大表不用一次性把所有分组结果读进内存）
+        :return: 迭代器，每次返回 {小区ID: 均分}
+        """
+        last_cell_id = -1
+        while True:
+            rows = list(
+                self.model.objects.filter(cell_id__gt=last_cell_id, cell_score__isnull=False)
+                .values("cell_id").annotate(avg=Avg("cell_score")).order_by("cell_id")
+                .values_list("cell_id", "avg")[:chunk_size]
+            )
+            if not rows:
+                return
+            last_cell_id = rows[-1][0]
+            yield dict(rows)
+            if len(rows) < chunk_size:
+                return
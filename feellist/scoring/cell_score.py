@@ -0,0 +1,134 @@
+"""
+小区评分引擎：按权重/阈值配置，从小区指标（cell_indicator_fields）批量计算 cell_score
+新手必看：
+- 每个指标按 bad → good 线性映射到 0~1（超出阈值截断），good < bad 表示越小越好（比如干扰比例）
+- 小区评分 = 100 × Σ(权重 × 得分) / Σ(参与计算的指标权重)，空指标不参与计算
+- 所有指标都为空的小区算不出评分（NaN），保留原评分不改
+- 一整天的小区在一次NumPy运算里算完，不逐行循环
+"""
+import json
+from typing import Dict, Optional
+
+import numpy as np
+from django.conf import settings
+
+from core.exceptions.core_exceptions import ParamError
+from feellist.fileds.cell_indicator_fileds import cell_indicator_fields
+
+# 默认评分配置：{指标字段: {"weight": 权重, "good": 满分阈值, "bad": 零分阈值}}
+# 比例类指标都是0~1的小数
+DEFAULT_SCORING_PROFILE = {
+    "volte_connect_rate": {"weight": 0.2, "good": 0.99, "bad": 0.9},
+    "lte_service_drop_rate_qci1": {"weight": 0.1, "good": 0.001, "bad": 0.01},
+    "cqi_good_rate": {"weight": 0.2, "good": 0.95, "bad": 0.8},
+    "rsrp_ge_110_ratio": {"weight": 0.15, "good": 0.95, "bad": 0.8},
+    "overlap_coverage_ratio": {"weight": 0.15, "good": 0.05, "bad": 0.2},
+    "mod3_interference_ratio": {"weight": 0.1, "good": 0.05, "bad": 0.2},
+    "dl_prb_utilization_mean": {"weight": 0.1, "good": 0.5, "bad": 0.9},
+}
+# 评分分布直方图的分桶边界
+SCORE_BINS = tuple(range(0, 101, 10))
+
+
+class ScoringProfile:
+    """
+    评分配置：校验权重/阈值，并对指标数组批量打分
+    用法：
+        profile = ScoringProfile.load()  # 读取settings.FEELLIST_SCORING_PROFILE，没配置用默认值
+        scores = profile.score({"cqi_good_rate": np.array([...]), ...})
+    """
+
+    def __init__(self, profile: Dict[str, Dict]):
+        if not profile:
+            raise ParamError(detail="评分配置不能为空")
+        indicator_fields = cell_indicator_fields()
+        self.fields = []
+        self.weights, self.good, self.bad = [], [], []
+        for field, rule in profile.items():
+            if field not in indicator_fields:
+                raise ParamError(detail=f"评分配置包含未知指标：{field}")
+            try:
+                weight, good, bad = float(rule["weight"]), float(rule["good"]), float(rule["bad"])
+            except (KeyError, TypeError, ValueError):
+                raise ParamError(detail=f"{field}的评分配置必须包含数字类型的weight、good、bad")
+            if weight <= 0 or good == bad:
+                raise ParamError(detail=f"{field}的评分配置无效：weight必须大于0，good和bad不能相等")
+            self.fields.append(field)
+            self.weights.append(weight)
+            self.good.append(good)
+            self.bad.append(bad)
+        self.weights = np.array(self.weights)
+        self.good = np.array(self.good)
+        self.bad = np.array(self.bad)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "ScoringProfile":
+        """
+        加载评分配置：优先读取JSON文件，其次settings.FEELLIST_SCORING_PROFILE，最后用默认配置
+        :param path: JSON配置文件路径，内容格式同DEFAULT_SCORING_PROFILE
+        """
+        if path:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    return cls(json.load(f))
+            except (OSError, ValueError) as e:
+                raise ParamError(detail=f"评分配置文件读取失败：{e}")
+        return cls(getattr(settings, "FEELLIST_SCORING_PROFILE", None) or DEFAULT_SCORING_PROFILE)
+
+    def score(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        批量计算评分
+        :param columns: {指标字段: float64数组}，空值为NaN，所有数组等长
+        :return: 评分数组（0~100，保留两位小数），算不出的为NaN
+        """
+        # 矩阵形状：指标数 × 小区数
+        values = np.stack([np.asarray(columns[field], dtype=np.float64) for field in self.fields])
+        normalized = np.clip((values - self.bad[:, None]) / (self.good - self.bad)[:, None], 0.0, 1.0)
+        valid = ~np.isnan(values)
+        weights = np.where(valid, self.weights[:, None], 0.0)
+        weight_total = weights.sum(axis=0)
+        weighted = np.where(valid, normalized, 0.0) * weights
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores = weighted.sum(axis=0) / weight_total * 100
+        return np.round(np.where(weight_total > 0, scores, np.nan), 2)
+
+
+def score_distribution(scores: np.ndarray) -> Dict:
+    """
+    评分分布：数量、均值、分位数和分桶直方图（忽略NaN）
+    """
+    scores = scores[~np.isnan(scores)]
+    if not len(scores):
+        return {"count": 0, "mean": None, "p10": None, "p50": None, "p90": None, "histogram": []}
+    p10, p50, p90 = np.quantile(scores, (0.1, 0.5, 0.9))
+    histogram, _ = np.histogram(np.clip(scores, SCORE_BINS[0], SCORE_BINS[-1]), bins=SCORE_BINS)
+    return {
+        "count": int(len(scores)),
+        "mean": round(float(scores.mean()), 2),
+        "p10": round(float(p10), 2),
+        "p50": round(float(p50), 2),
+        "p90": round(float(p90), 2),
+        "histogram": [int(v) for v in histogram],
+    }
+
+
+def distribution_shift(old: np.ndarray, new: np.ndarray) -> Dict:
+    """
+    新旧评分的分布变化报告
+    :param old: 原评分数组（NaN表示原来没有评分）
+    :param new: 新评分数组（NaN表示算不出，不会写回）
+    """
+    both = ~np.isnan(old) & ~np.isnan(new)
+    delta = new[both] - old[both]
+    return {
+        "before": score_distribution(old),
+        "after": score_distribution(np.where(np.isnan(new), old, new)),
+        "changed": int(np.count_nonzero(changed_mask(old, new))),
+        "mean_delta": round(float(delta.mean()), 2) if len(delta) else None,
+        "max_abs_delta": round(float(np.abs(delta).max()), 2) if len(delta) else None,
+    }
+
+
+def changed_mask(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """需要写回的行：新评分算得出，并且和原评分不同（原评分为空也算不同）"""
+    return ~np.isnan(new) & (np.isnan(old) | (np.abs(new - old) > 1e-9))
@@ -5,10 +5,15 @@ feellist APP的序列化器：负责数据格式转换和验证
 - 前端JSON → 校验后的数据（给后端）
 - 自定义展示字段，比如把city=1转成"南昌市"
 """
+from typing import Iterable, List, Optional
+
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
 from core.constants.core_constants import MSG_PHONE_INVALID
-from feellist.models import UserScore, NetworkSceneData
+from core.exceptions.core_exceptions import ParamError
+from feellist.common.constants import CHOICE_LABEL_MAPS
+from feellist.models import UserScore, NetworkSceneData, ComplaintWorkOrder
 
 
 # ==================== 工具函数 ====================
@@ -20,8 +25,145 @@ def get_choice_name(choices: list, value: int) -> str:
     return choice_dict.get(value, "")
 
 
+# 只读快速序列化时可以直接用内置函数转换的字段类型（和对应字段的to_representation等价）
+FAST_CONVERTERS = {
+    serializers.IntegerField: int,
+    serializers.FloatField: float,
+    serializers.CharField: str,
+}
+
+
+# ==================== 按需返回字段（?fields=） ====================
+class SparseFieldsMixin:
+    """
+    按需返回字段：序列化器传入fields参数，只保留指定的字段
+    用法：NetworkSceneDataSerializer(data_list, many=True, fields=["cell_id", "latitude"])
+    """
+
+    def __init__(self, *args, fields: Optional[Iterable[str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            allowed = set(fields)
+            for field_name in list(self.fields):
+                if field_name not in allowed:
+                    self.fields.pop(field_name)
+
+    @classmethod
+    def resolve_fields(cls, fields: Optional[Iterable[str]]) -> Optional[List[str]]:
+        """
+        校验前端传入的字段名，并换算成需要从数据库查询的模型字段
+        比如 city_display 的数据来源是 get_city_display，需要查 city 列
+        :param fields: 前端要求返回的字段名列表，为空表示全部字段
+        :return: 需要查询的模型字段名列表（传给QuerySet.only），为空表示全部字段
+        :raise ParamError: 存在未知字段时抛出异常
+        """
+        if not fields:
+            return None
+        sources = cls._field_sources()
+        unknown = [name for name in fields if name not in sources]
+        if unknown:
+            raise ParamError(detail=f"不支持的返回字段：{','.join(unknown)}")
+
+        columns = []
+        for name in fields:
+            if sources[name] not in columns:
+                columns.append(sources[name])
+        return columns
+
+    @classmethod
+    def field_names(cls, exclude: Iterable[str] = ()) -> List[str]:
+        """序列化器的全部字段名（按声明顺序），可排除部分字段"""
+        exclude = set(exclude)
+        return [name for name in cls._field_sources() if name not in exclude]
+
+    @classmethod
+    def to_representation_rows(cls, rows: Iterable[dict], fields: Optional[Iterable[str]] = None) -> List[dict]:
+        """
+        只读快速序列化：把 QuerySet.values() 查出来的行字典直接转换成输出字典
+        新手必看：
+        - 输出和 serializer(data_list, many=True, fields=fields).data 渲染出的JSON逐字节一致
+        - 不创建模型对象、不走ModelSerializer的逐字段get_attribute，列表接口大页时快很多
+        - *_display 字段用 feellist.common.constants 里预先算好的字典解码
+        :param rows: 行字典列表（键是模型字段名）
+        :param fields: 只输出这些字段，为空表示全部字段
+        :return: 输出字典列表
+        """
+        plan = cls._fast_plan()
+        if fields is not None:
+            allowed = set(fields)
+            plan = [item for item in plan if item[0] in allowed]
+
+        result = []
+        for row in rows:
+            item = {}
+            for name, source, convert, labels in plan:
+                value = row[source]
+                if value is None:
+                    item[name] = None
+                elif labels is not None:
+                    item[name] = str(labels.get(value, value))
+                else:
+                    item[name] = convert(value)
+            result.append(item)
+        return result
+
+    @classmethod
+    def _fast_plan(cls) -> List[tuple]:
+        """快速序列化的字段计划：[(字段名, 模型字段名, 转换函数, 选择字典)]（每个序列化器类只计算一次）"""
+        if "_fast_field_plan" not in cls.__dict__:
+            sources = cls._field_sources()
+            plan = []
+            for name, field in cls().fields.items():
+                source = sources[name]
+                if source != field.source:
+                    # get_xxx_display：和Model.get_xxx_display一样，查不到的编码原样转成字符串
+                    labels = CHOICE_LABEL_MAPS.get(source)
+                    if labels is None:
+                        labels = dict(cls.Meta.model._meta.get_field(source).flatchoices)
+                    plan.append((name, source, None, labels))
+                else:
+                    plan.append((name, source, FAST_CONVERTERS.get(type(field), field.to_representation), None))
+            cls._fast_field_plan = plan
+        return cls._fast_field_plan
+
+    @classmethod
+    def _field_sources(cls) -> dict:
+        """字段名 → 模型字段名 的映射（每个序列化器类只计算一次）"""
+        if "_sparse_field_sources" not in cls.__dict__:
+            sources = {}
+            for name, field in cls().fields.items():
+                source = field.source
+                if source.startswith("get_") and source.endswith("_display"):
+                    source = source[len("get_"):-len("_display")]
+                sources[name] = source
+            cls._sparse_field_sources = sources
+        return cls._sparse_field_sources
+
+
+# ==================== 按自然键upsert时的唯一校验 ====================
+class UpsertValidatorsMixin:
+    """
+    按自然键upsert写入时去掉唯一约束自动生成的校验：重复数据由仓储层按自然键更新，
+    逐行校验唯一性还会让批量写入每行多查一次库
+    单条新增（非upsert）和修改仍然保留唯一校验，改到已存在的自然键上返回400
+    用法：NetworkSceneDataSerializer(data=row, context={"upsert": True})
+    """
+
+    def get_validators(self):
+        if self.context.get("upsert"):
+            return []
+        return super().get_validators()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get("upsert"):
+            for field in fields.values():
+                field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+        return fields
+
+
 # ==================== UserScore 序列化器 ====================
-class UserScoreSerializer(serializers.ModelSerializer):
+class UserScoreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     UserScore 序列化器
     """
@@ -47,7 +189,7 @@ class UserScoreSerializer(serializers.ModelSerializer):
 
 
 # ==================== NetworkSceneData 序列化器 ====================
-class NetworkSceneDataSerializer(serializers.ModelSerializer):
+class NetworkSceneDataSerializer(UpsertValidatorsMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     NetworkSceneData 序列化器
     """
@@ -69,3 +211,16 @@ class NetworkSceneDataSerializer(serializers.ModelSerializer):
     class Meta:
         model = NetworkSceneData
         fields = "__all__"
+
+
+# ==================== ComplaintWorkOrder 序列化器 ====================
+class ComplaintWorkOrderSerializer(UpsertValidatorsMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    ComplaintWorkOrder 序列化器
+    """
+    # 自定义展示字段
+    city_display = serializers.CharField(source='get_city_display', read_only=True)
+
+    class Meta:
+        model = ComplaintWorkOrder
+        fields = "__all__"
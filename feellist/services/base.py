@@ -5,10 +5,17 @@ feellist APP的服务基类：封装通用的业务逻辑
 - 复用分页、筛选的通用逻辑
 """
 from abc import ABC
-from typing import Dict, List, Tuple, Any
+from contextlib import nullcontext
+from typing import Dict, Iterator, List, Tuple, Any, Optional
 
-from core.constants.core_constants import DEFAULT_PAGE, DEFAULT_PAGE_SIZE
-from core.utils.core_pagination import paginate_data
+from core.constants.core_constants import (
+    DEFAULT_PAGE, DEFAULT_PAGE_SIZE, COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE, COUNT_MODES
+)
+from core.utils.core_filters import validate_choice
+from core.utils.core_pagination import (
+    paginate_queryset, paginate_queryset_without_count, normalize_page_params
+)
+from feellist.common.constants import CHOICE_LABEL_MAPS, choice_label
 from feellist.repositories.base import BaseRepository
 
 
@@ -26,29 +33,122 @@ class BaseService(ABC):
             self,
             filters: Dict = None,
             page: int = DEFAULT_PAGE,
-            page_size: int = DEFAULT_PAGE_SIZE
-    ) -> Tuple[List[Any], int, bool]:
+            page_size: int = DEFAULT_PAGE_SIZE,
+            count: str = COUNT_EXACT,
+            only_fields: Optional[List[str]] = None,
+            as_values: bool = False
+    ) -> Tuple[List[Any], Optional[int], bool, bool]:
         """
         获取列表数据（筛选+分页）
         :param filters: 筛选条件
         :param page: 页码
         :param page_size: 每页条数
-        :return: (分页后的数据列表, 总条数, 是否有筛选条件)
+        :param count: 总数统计方式：exact（精确）/ estimate（估算）/ none（不统计）
+        :param only_fields: 只查询这些列，为空表示全部列
+        :param as_values: 为True时返回行字典（QuerySet.values）而不是模型对象，给只读快速序列化用
+        :return: (分页后的数据列表, 总条数（none时为None）, 是否有筛选条件, 是否有下一页)
         """
         filters = filters or {}
-        # 步骤1：仓储层筛选数据
-        data_list, has_filter = self.repository.filter(filters)
-        # 步骤2：分页处理
-        paginated_data, total = paginate_data(data_list, page, page_size)
-        return paginated_data, total, has_filter
+        count = validate_choice(count or COUNT_EXACT, COUNT_MODES, "count")
+        # 步骤1：仓储层构造查询集（此时还没有查库）
+        queryset, has_filter = self.repository.filter_queryset(filters, only_fields=only_fields)
+        if as_values:
+            queryset = queryset.values(*(only_fields or ()))
 
-    def get_detail(self, pk: int) -> Any:
+        # 步骤2：不统计总数，多查一条判断是否有下一页
+        if count == COUNT_NONE:
+            paginated_data, has_more = paginate_queryset_without_count(queryset, page, page_size)
+            return paginated_data, None, has_filter, has_more
+
+        # 步骤3：分页下推到数据库（LIMIT/OFFSET），总数精确COUNT(*)或估算
+        total = self.repository.estimate_count(filters) if count == COUNT_ESTIMATE else None
+        paginated_data, total = paginate_queryset(queryset, page, page_size, total=total)
+        page_int, page_size_int = normalize_page_params(page, page_size)
+        has_more = page_int * page_size_int < total
+        return paginated_data, total, has_filter, has_more
+
+    def get_cursor_list(
+            self,
+            filters: Dict = None,
+            cursor: Optional[str] = None,
+            page_size: int = DEFAULT_PAGE_SIZE,
+            only_fields: Optional[List[str]] = None,
+            as_values: bool = False
+    ) -> Tuple[List[Any], Optional[str], bool]:
+        """
+        获取列表数据（筛选+游标分页），适合前端无限滚动
+        :param filters: 筛选条件
+        :param cursor: 上一页返回的游标，为空表示第一页
+        :param page_size: 每页条数
+        :param only_fields: 只查询这些列，为空表示全部列
+        :param as_values: 为True时返回行字典（QuerySet.values）而不是模型对象
+        :return: (当前页数据列表, 下一页游标, 是否有筛选条件)
+        """
+        filters = filters or {}
+        _, page_size = normalize_page_params(DEFAULT_PAGE, page_size)
+        return self.repository.filter_cursor_page(filters, cursor, page_size, only_fields, as_values)
+
+    def get_export_columns(self, only_fields: Optional[List[str]] = None) -> List[str]:
+        """
+        导出的列：模型字段（或指定的列），选择字段后面紧跟一列 *_display 友好名称
+        :param only_fields: 只导出这些模型字段，为空表示全部字段
+        :return: 导出列名列表
+        """
+        columns = []
+        for field in self.repository.model._meta.concrete_fields:
+            if only_fields and field.name not in only_fields:
+                continue
+            columns.append(field.name)
+            if field.choices and field.name in CHOICE_LABEL_MAPS:
+                columns.append(f"{field.name}_display")
+        return columns
+
+    def iter_export_rows(self, filters: Dict, columns: List[str]) -> Iterator[Dict]:
+        """
+        流式产出导出行：分批查库，选择字段按 feellist.common.constants 解码（规则同接口的 *_display）
+        :param filters: 筛选条件
+        :param columns: get_export_columns 返回的导出列
+        :return: 行字典迭代器
+        """
+        display_columns = [column for column in columns if column.endswith("_display")]
+        db_columns = [column for column in columns if column not in display_columns]
+        label_maps = {column: CHOICE_LABEL_MAPS[column[:-len("_display")]] for column in display_columns}
+
+        for row in self.repository.iter_values(filters or {}, db_columns):
+            for column, labels in label_maps.items():
+                row[column] = choice_label(labels, row[column[:-len("_display")]])
+            yield row
+
+    def get_analytics(self, filters: Dict = None, group_by: List[str] = None,
+                      metrics: List[str] = None) -> List[Dict]:
+        """
+        多维分组统计
+        :param filters: 筛选条件
+        :param group_by: 分组维度，比如["city", "scene_level1"]
+        :param metrics: 指标，格式 函数:字段，比如["count", "avg:cell_score", "sum:total_sample_points_sum"]
+        :return: 每个分组一行，选择类维度额外带 *_display 友好名称
+        """
+        group_by = group_by or []
+        parsed_metrics = []
+        for metric in metrics or ["count"]:
+            func, _, field = metric.partition(":")
+            parsed_metrics.append((func.strip().lower(), field.strip() or None))
+
+        rows = self.repository.group_aggregate(filters or {}, group_by, parsed_metrics)
+        for row in rows:
+            for name in group_by:
+                if name in CHOICE_LABEL_MAPS:
+                    row[f"{name}_display"] = CHOICE_LABEL_MAPS[name].get(row[name], "")
+        return rows
+
+    def get_detail(self, pk: int, only_fields: Optional[List[str]] = None) -> Any:
         """
         获取单条数据详情
         :param pk: 主键ID
+        :param only_fields: 只查询这些列，为空表示全部列
         :return: 数据对象
         """
-        return self.repository.get_by_id(pk)
+        return self.repository.get_by_id(pk, only_fields)
 
     def create(self, data: Dict) -> Any:
         """
@@ -58,6 +158,24 @@ class BaseService(ABC):
         """
         return self.repository.create(data)
 
+    def bulk_create(self, data_list: List[Dict]) -> int:
+        """
+        批量新增数据
+        :param data_list: 新增数据列表（已校验）
+        :return: 新增条数
+        """
+        return self.repository.bulk_create(data_list)
+
+    def write_context(self):
+        """
+        一次批量写入外层的上下文（比如延迟刷新派生数据），子类按需重写
+        用法：
+            with service.write_context():
+                for chunk in chunks:
+                    service.bulk_create(chunk)
+        """
+        return nullcontext()
+
     def update(self, pk: int, data: Dict) -> Any:
         """
         修改数据
@@ -0,0 +1,45 @@
+"""
+ComplaintWorkOrder 业务服务：封装投诉工单相关的业务逻辑
+"""
+from typing import Dict, List, Optional, Tuple
+
+from core.utils.core_pagination import paginate_queryset
+from core.utils.core_search import build_snippet, parse_search_terms
+from feellist.repositories.complaint_work_order import ComplaintWorkOrderRepository
+from feellist.services.base import BaseService
+
+
+class ComplaintWorkOrderService(BaseService):
+    """
+    ComplaintWorkOrder 业务服务类
+    """
+    repository = ComplaintWorkOrderRepository()
+
+    def bulk_create(self, data_list: List[Dict]) -> int:
+        """
+        重写批量新增：按工单号upsert，重复推送同一张工单只会更新
+        """
+        return self.repository.bulk_upsert(data_list)
+
+    def search(self, keyword: Optional[str], filters: Dict = None, page: int = None,
+               page_size: int = None) -> Tuple[List[Dict], int]:
+        """
+        投诉内容关键词搜索（投诉内容、投诉详单、投诉地址、回复客服内容）
+        :param keyword: 关键词，多个词用空格分隔，每个词都必须命中
+        :param filters: 其他筛选条件（同列表接口）
+        :param page: 页码
+        :param page_size: 每页条数
+        :return: (当前页结果, 总条数)，每条结果带score（相关度）和snippets（命中字段的摘要）
+        """
+        terms = parse_search_terms(keyword)
+        queryset = self.repository.search_queryset(terms, filters or {})
+        rows, total = paginate_queryset(queryset, page, page_size)
+        results = []
+        for row in rows:
+            snippets = {}
+            for field in self.repository.search_fields:
+                snippet = build_snippet(row.pop(field), terms)
+                if snippet:
+                    snippets[field] = snippet
+            results.append({**row, "snippets": snippets})
+        return results, total
@@ -1,8 +1,21 @@
 """
 NetworkSceneData 业务服务：封装小区场景数据相关的业务逻辑
 """
-from typing import Dict
+import hashlib
+import json
+import math
+from collections import defaultdict
+from typing import Dict, List, Tuple
 
+import numpy as np
+from django.core.cache import cache
+
+from core.constants.core_constants import (
+    BULK_BATCH_SIZE, HEATMAP_BINS_PER_TILE, HEATMAP_MAX_TILES, HEATMAP_CACHE_TTL
+)
+from core.exceptions.core_exceptions import ParamError
+from core.utils.core_cache import get_generation
+from feellist.common.constants import CHOICE_LABEL_MAPS
 from feellist.repositories.network_scene import NetworkSceneDataRepository
 from feellist.services.base import BaseService
 
@@ -13,31 +26,229 @@ class NetworkSceneDataService(BaseService):
     """
     repository = NetworkSceneDataRepository()
 
+    def bulk_create(self, data_list: List[Dict]) -> int:
+        """
+        重写批量新增：按自然键(date, cell_id)upsert，重复推送同一天的数据不会产生重复行
+        """
+        return self.repository.bulk_upsert(data_list)
+
     # ==================== 通用业务方法 ====================
-    def get_city_complaint_rate(self, city: int) -> float:
+    def get_complaint_stats(self, filters: Dict = None) -> Dict[str, float]:
+        """
+        投诉统计：总小区数、有投诉小区数、投诉率
+        投诉率 = 有投诉小区数 / 总小区数 * 100%
+        """
+        counts = self.repository.count_complaints(filters or {})
+        total, complaint = counts["total"], counts["complaint"]
+        rate = round(complaint / total * 100, 2) if total else 0.0
+        return {"total_cells": total, "complaint_cells": complaint, "complaint_rate": rate}
+
+    def get_city_complaint_rate(self, city: int, filters: Dict = None) -> float:
         """
         计算指定地市的投诉率
         投诉率 = 有投诉小区数 / 总小区数 * 100%
         """
-        # 获取指定地市的所有数据
-        all_data = list(self.repository.filter({"city": city}))[0]
-        if not all_data:
-            return 0.0
-        # 获取有投诉的数据
-        complaint_data = self.repository.get_complaint_data_by_city(city)
-        # 计算投诉率
-        complaint_rate = (len(complaint_data) / len(all_data)) * 100
-        return round(complaint_rate, 2)
+        return self.get_complaint_stats({**(filters or {}), "city": city})["complaint_rate"]
 
     # ==================== 扩展业务方法 ====================
-    def get_scene_distribution(self, city: int) -> Dict[int, int]:
+    def get_scene_distribution(self, city: int = None, filters: Dict = None) -> Dict[int, int]:
         """
-        获取指定地市的场景分布统计
+        获取场景分布统计（可按地市、日期范围筛选）
         返回格式：{场景ID: 小区数量}
         """
-        data_list = list(self.repository.filter({"city": city}))[0]
-        distribution = {}
-        for item in data_list:
-            scene_id = item.scene_level1
-            distribution[scene_id] = distribution.get(scene_id, 0) + 1
-        return distribution
+        filters = dict(filters or {})
+        if city is not None:
+            filters["city"] = city
+        return self.repository.count_by_scene(filters)
+
+    # ==================== 快照分析（NumPy列式快照，只覆盖最近N天） ====================
+    def get_indicator_distribution(self, field: str, filters: Dict = None,
+                                   group_by: List[str] = None) -> Dict:
+        """
+        指标分布：分位数 + 按维度分组的count/avg/min/max
+        数据来自进程内列式快照（FEELLIST_SNAPSHOT_DAYS天），不经过ORM模型对象
+        :param field: 指标字段，比如cqi_good_rate
+        :param filters: 筛选条件（同列表接口）
+        :param group_by: 分组维度，比如["scene_level1"]
+        :return: {"window": 快照覆盖的日期范围, "quantiles": {...}, "groups": [...]}
+        """
+        from feellist.snapshots.network_scene import get_scene_snapshot
+
+        snapshot = get_scene_snapshot()
+        # 整个请求只取一次列：后台刷新换了新列也不影响本次计算
+        columns = snapshot.columns
+        mask = snapshot.mask(columns, self.repository.validate_filters(filters or {}))
+        group_by = group_by or []
+        metrics = [("count", None), ("count", field), ("avg", field), ("min", field), ("max", field)]
+        groups = snapshot.aggregate(columns, mask, group_by, metrics)
+        for row in groups:
+            for name in group_by:
+                if name in CHOICE_LABEL_MAPS:
+                    row[f"{name}_display"] = CHOICE_LABEL_MAPS[name].get(row[name], "")
+        return {
+            "window": snapshot.window(),
+            "quantiles": snapshot.quantiles(columns, mask, field, (0.05, 0.25, 0.5, 0.75, 0.95)),
+            "groups": groups
+        }
+
+    def get_indicator_rankings(self, field: str, limit: int, ascending: bool = False, filters: Dict = None) -> Dict:
+        """
+        小区指标排名：快照窗口内按小区取指标均值，返回最好（或最差）的limit个小区
+        :param field: 指标字段，比如cqi_good_rate
+        :param limit: 返回数量
+        :param ascending: True返回最差的（从小到大）
+        :param filters: 筛选条件（同列表接口）
+        :return: {"window": 快照覆盖的日期范围, "field": 指标, "list": [...]}
+        """
+        from feellist.snapshots.network_scene import get_scene_snapshot
+
+        snapshot = get_scene_snapshot()
+        columns = snapshot.columns
+        mask = snapshot.mask(columns, self.repository.validate_filters(filters or {}))
+        rows = snapshot.rankings(columns, mask, field, limit, ascending)
+        for row in rows:
+            row["city_display"] = CHOICE_LABEL_MAPS["city"].get(row["city"], "")
+        return {"window": snapshot.window(), "field": field, "list": rows}
+
+    def get_indicator_correlation(self, fields: List[str], filters: Dict = None) -> Dict:
+        """
+        指标相关性矩阵（皮尔逊系数，只用所有指标都非空的行）
+        :param fields: 指标字段列表，至少两个
+        :param filters: 筛选条件（同列表接口）
+        :return: {"window": 快照覆盖的日期范围, "fields": [...], "matrix": [[...]]}
+        """
+        from feellist.snapshots.network_scene import get_scene_snapshot
+
+        if len(fields) < 2:
+            raise ParamError(detail="相关性分析至少需要两个指标")
+        snapshot = get_scene_snapshot()
+        columns = snapshot.columns
+        mask = snapshot.mask(columns, self.repository.validate_filters(filters or {}))
+        return {"window": snapshot.window(), "fields": fields, "matrix": snapshot.correlation(columns, mask, fields)}
+
+    # ==================== 评分重算 ====================
+    def rescore_cells(self, profile, filters: Dict = None, dry_run: bool = False,
+                      batch_size: int = BULK_BATCH_SIZE) -> Dict:
+        """
+        按评分配置重算 cell_score：逐天读取指标，一次NumPy运算算完一天的小区，只写回有变化的行
+        :param profile: 评分配置（feellist.scoring.cell_score.ScoringProfile）
+        :param filters: 筛选条件（同列表接口，比如date_start、date_end、city）
+        :param dry_run: 只计算不写库，返回评分分布变化
+        :param batch_size: 写回时每条SQL更新的行数
+        :return: {"days": 天数, "cells": 小区天数, "updated": 写回条数, "shift": 分布变化报告}
+        """
+        from feellist.scoring.cell_score import changed_mask, distribution_shift
+
+        filters = filters or {}
+        columns = ["id", "city", "scene_level1", "area", "cell_score", *profile.fields]
+        days = self.repository.get_days(filters)
+        old_parts, new_parts, updated = [], [], 0
+        for day in days:
+            rows = self.repository.get_day_values(filters, day, columns)
+            if not rows:
+                continue
+            values = dict(zip(columns, zip(*rows)))
+            old = np.array(values["cell_score"], dtype=np.float64)
+            new = profile.score({field: np.array(values[field], dtype=np.float64) for field in profile.fields})
+            old_parts.append(old)
+            new_parts.append(new)
+            if not dry_run:
+                changed = np.flatnonzero(changed_mask(old, new))
+                updated += self.repository.bulk_update_scores(
+                    day, [(values["id"][i], values["city"][i], values["scene_level1"][i], values["area"][i],
+                          float(new[i])) for i in changed], batch_size
+                )
+
+        old_all = np.concatenate(old_parts) if old_parts else np.empty(0)
+        new_all = np.concatenate(new_parts) if new_parts else np.empty(0)
+        return {
+            "days": len(days),
+            "cells": int(len(old_all)),
+            "updated": updated,
+            "shift": distribution_shift(old_all, new_all)
+        }
+
+    # ==================== 附近小区 ====================
+    def get_nearby_cells(self, lat: float, lon: float, k: int, radius_m: float) -> Dict:
+        """
+        查询最新一天里离指定位置最近的k个小区（进程内网格索引，有新数据写入时自动重建）
+        :param lat: 纬度
+        :param lon: 经度
+        :param k: 返回数量
+        :param radius_m: 搜索半径（米）
+        :return: {"date": 索引对应的数据日期, "list": 按距离升序的小区列表}
+        """
+        from feellist.snapshots.cell_locations import get_cell_location_index
+
+        index = get_cell_location_index()
+        rows = index.nearest(lat, lon, k, radius_m)
+        for row in rows:
+            for name in ("city", "scene_level1"):
+                row[f"{name}_display"] = CHOICE_LABEL_MAPS[name].get(row[name], "")
+        return {"date": index.day, "list": rows}
+
+    # ==================== 地图网格聚合 ====================
+    def get_heatmap(self, filters: Dict, bbox: Tuple[float, float, float, float], zoom: int) -> Dict:
+        """
+        地图网格聚合：按缩放级别把经纬度切成网格，每个网格返回小区数、平均评分、投诉小区数
+        新手必看：
+        - 瓦片宽 360/2^zoom 度，每个瓦片切成 HEATMAP_BINS_PER_TILE × HEATMAP_BINS_PER_TILE 个网格
+        - 结果按 (瓦片, 缩放级别, 筛选条件) 缓存，小区数据有写入时版本号变化，缓存自动失效
+        - 没传日期条件时只统计最新一天，避免同一个小区多天重复计数
+        :param filters: 筛选条件（同列表接口）
+        :param bbox: (最小经度, 最小纬度, 最大经度, 最大纬度)
+        :param zoom: 缩放级别
+        :return: {"date": 默认统计的日期, "bin_degrees": 网格大小, "list": 网格列表}
+        """
+        filters = dict(filters)
+        day = None
+        if "date_start" not in filters and "date_end" not in filters:
+            day = self.repository.latest_day()
+            if day is not None:
+                filters["date_start"] = filters["date_end"] = day.isoformat()
+
+        tile_degrees = 360 / 2 ** zoom
+        bin_degrees = tile_degrees / HEATMAP_BINS_PER_TILE
+        min_lon, min_lat, max_lon, max_lat = bbox
+        tile_ys = range(math.floor((min_lat + 90) / tile_degrees), math.floor((max_lat + 90) / tile_degrees) + 1)
+        tile_xs = range(math.floor((min_lon + 180) / tile_degrees), math.floor((max_lon + 180) / tile_degrees) + 1)
+        if len(tile_ys) * len(tile_xs) > HEATMAP_MAX_TILES:
+            raise ParamError(detail="地图范围太大，请缩小范围或降低缩放级别")
+
+        # 步骤1：按瓦片读缓存
+        normalized = json.dumps(self.repository.validate_filters(filters), sort_keys=True, default=str)
+        key_prefix = (f"heatmap:{get_generation(self.repository.model._meta.db_table)}:{zoom}:"
+                      f"{hashlib.md5(normalized.encode('utf-8')).hexdigest()}")
+        keys = {(y, x): f"{key_prefix}:{y}:{x}" for y in tile_ys for x in tile_xs}
+        cached = cache.get_many(list(keys.values()))
+        tiles = {tile: cached[key] for tile, key in keys.items() if key in cached}
+
+        # 步骤2：没缓存的瓦片合并成一个矩形，一条SQL聚合，再按瓦片拆开写缓存
+        missing = [tile for tile in keys if tile not in tiles]
+        if missing:
+            lat_bins = (min(y for y, _ in missing) * HEATMAP_BINS_PER_TILE,
+                        (max(y for y, _ in missing) + 1) * HEATMAP_BINS_PER_TILE - 1)
+            lon_bins = (min(x for _, x in missing) * HEATMAP_BINS_PER_TILE,
+                        (max(x for _, x in missing) + 1) * HEATMAP_BINS_PER_TILE - 1)
+            fresh = defaultdict(list)
+            for row in self.repository.grid_aggregate(filters, bin_degrees, lat_bins, lon_bins):
+                fresh[(row["lat_bin"] // HEATMAP_BINS_PER_TILE, row["lon_bin"] // HEATMAP_BINS_PER_TILE)].append(row)
+            for tile in missing:
+                tiles[tile] = fresh.get(tile, [])
+            cache.set_many({keys[tile]: tiles[tile] for tile in missing}, HEATMAP_CACHE_TTL)
+
+        # 步骤3：只返回和请求范围相交的网格
+        lat_range = (math.floor((min_lat + 90) / bin_degrees), math.floor((max_lat + 90) / bin_degrees))
+        lon_range = (math.floor((min_lon + 180) / bin_degrees), math.floor((max_lon + 180) / bin_degrees))
+        data_list = []
+        for tile in keys:
+            for row in tiles[tile]:
+                if lat_range[0] <= row["lat_bin"] <= lat_range[1] and lon_range[0] <= row["lon_bin"] <= lon_range[1]:
+                    data_list.append({
+                        "lat": round((row["lat_bin"] + 0.5) * bin_degrees - 90, 6),
+                        "lon": round((row["lon_bin"] + 0.5) * bin_degrees - 180, 6),
+                        "count": row["count"],
+                        "avg_score": None if row["avg_score"] is None else round(row["avg_score"], 2),
+                        "complaint_count": row["complaint_count"],
+                    })
+        return {"date": day, "bin_degrees": bin_degrees, "list": data_list}
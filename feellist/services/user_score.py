@@ -4,9 +4,13 @@ UserScore 业务服务：封装用户评分相关的业务逻辑
 - 视图层只调用这里的方法，不直接操作数据库
 - 复杂业务逻辑写在这里，比如计算平均分
 """
-from typing import List
+from typing import Dict, List
 
+from django.utils import timezone
+
+from core.constants.core_constants import BULK_BATCH_SIZE
 from feellist.models import UserScore
+from feellist.repositories.network_scene import NetworkSceneDataRepository
 from feellist.repositories.user_score import UserScoreRepository
 from feellist.services.base import BaseService
 
@@ -16,31 +20,67 @@ class UserScoreService(BaseService):
     UserScore 业务服务类
     """
     repository = UserScoreRepository()  # 注入仓储实例
+    scene_repository = NetworkSceneDataRepository()  # 写回小区数据表的用户均分
 
     # ==================== 通用业务方法 ====================
-    def calculate_city_avg_score(self, city: int) -> float:
+    def calculate_city_avg_score(self, city: int, net_type: int = 1) -> float:
         """
         计算指定地市的平均小区评分
         :param city: 地市ID
+        :param net_type: 网络类型，默认5G
         :return: 平均分（保留2位小数）
         """
-        # 调用仓储层获取数据
-        data_list = self.repository.get_by_city_and_net_type(city, net_type=1)  # 假设查5G数据
-        if not data_list:
-            return 0.0
-        # 计算有效评分的平均值
-        valid_scores = [item.cell_score for item in data_list if item.cell_score is not None]
-        if not valid_scores:
+        # 数据库直接AVG，不把数据加载到内存
+        avg_score = self.repository.avg_score_by_city_and_net_type(city, net_type)
+        if avg_score is None:
             return 0.0
-        avg_score = sum(valid_scores) / len(valid_scores)
         return round(avg_score, 2)
 
     # ==================== 扩展业务方法 ====================
-    def get_top_score_cells(self, city: int, top_n: int = 10) -> List[UserScore]:
+    def get_top_score_cells(self, city: int, top_n: int = 10, net_type: int = 1) -> List[UserScore]:
         """
         获取指定地市评分最高的N个小区
         """
-        data_list = self.repository.get_by_city_and_net_type(city, net_type=1)
-        # 按评分排序，取前N个
-        sorted_list = sorted(data_list, key=lambda x: x.cell_score or 0, reverse=True)
-        return sorted_list[:top_n]
+        return self.repository.get_top_by_score(city, net_type, top_n)
+
+    def get_top_score_cells_per_city(self, top_n: int = 10, net_type: int = 1) -> List[UserScore]:
+        """
+        获取全省每个地市评分最高的N个小区（对象带rank属性：地市内名次）
+        """
+        return self.repository.get_top_by_score_per_city(net_type, top_n)
+
+    # ==================== 小区用户均分重算 ====================
+    def recompute_cell_user_avg_scores(self, full: bool = False, chunk_size: int = BULK_BATCH_SIZE) -> Dict[str, int]:
+        """
+        重算小区数据表的 cell_user_avg_score（小区内用户评分的平均值）
+        新手必看：
+        - 增量（默认）：只重算UserScore增删改时登记过的小区，没有用户评分的小区清空均分
+        - 全量：按cell_id分块GROUP BY整张UserScore表，并清空已没有用户评分的小区；
+          首次上线或手工改库后执行一次
+        :param full: 是否全量重算
+        :param chunk_size: 每批处理的小区数
+        :return: {"cells": 重算的小区数, "updated": 小区数据表更新行数}
+        """
+        started = timezone.now()
+        cells = updated = 0
+        if full:
+            for averages in self.repository.iter_avg_score_by_cell(chunk_size):
+                cells += len(averages)
+                updated += self.scene_repository.update_user_avg_scores(averages, chunk_size)
+            updated += self.scene_repository.clear_stale_user_avg_scores()
+            # 全量已经覆盖了所有小区，重算开始前的登记都可以清掉
+            self.repository.dirty_cells.clear(started)
+            return {"cells": cells, "updated": updated}
+
+        last_cell_id = -1
+        while True:
+            cell_ids = self.repository.dirty_cells.pending(started, last_cell_id, chunk_size)
+            if not cell_ids:
+                break
+            last_cell_id = cell_ids[-1]
+            found = self.repository.avg_score_by_cells(cell_ids)
+            averages = {cell_id: found.get(cell_id) for cell_id in cell_ids}
+            updated += self.scene_repository.update_user_avg_scores(averages, chunk_size)
+            self.repository.dirty_cells.clear(started, cell_ids)
+            cells += len(cell_ids)
+        return {"cells": cells, "updated": updated}
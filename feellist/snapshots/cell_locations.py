@@ -0,0 +1,176 @@
+"""
+小区位置网格索引：把最新一天有经纬度的小区按经纬度网格分桶，放在进程内存里做最近邻查询
+新手必看：
+- 网格大小 GRID_DEGREES 度（约1公里），查询时只计算搜索半径覆盖到的网格里的小区
+- 小区数据表每次写入都会让数据版本号+1（core_cache，所有进程共用），查询时发现版本号变了就重建索引
+- 重建有节流：距上次重建不到 FEELLIST_SNAPSHOT_REFRESH_SECONDS 秒时继续用旧索引，连续写入不会反复全量重建
+- 重建时只有一个线程在建，其他请求继续用旧索引，不排队等锁（只有进程里第一次建索引时要等）
+- 距离用球面距离（haversine），单位米
+"""
+import threading
+from datetime import datetime, time, timedelta
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from core.utils.core_cache import get_generation
+from feellist.models import NetworkSceneData
+
+# 网格大小（度），0.01度约1.1公里
+GRID_DEGREES = 0.01
+# 地球平均半径（米）
+EARTH_RADIUS_M = 6371008.8
+# 返回给前端的列
+LOCATION_COLUMNS = ("id", "cell_id", "cellName", "city", "scene_level1", "cell_score", "latitude", "longitude")
+
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """一个点到一组点的球面距离（米）"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class CellLocationIndex:
+    """
+    小区位置网格索引
+    用法：
+        index = get_cell_location_index()
+        rows = index.nearest(28.68, 115.89, k=10, radius_m=3000)
+    """
+
+    def __init__(self):
+        self.generation = None
+        self.built_at = 0.0
+        self.day = None
+        self.rows: List[tuple] = []
+        self.lats = np.empty(0)
+        self.lons = np.empty(0)
+        # 网格键 → 该网格内小区在rows里的下标（按网格键排序后切片）
+        self.buckets: Dict[tuple, slice] = {}
+        self.order = np.empty(0, dtype=np.intp)
+
+    @staticmethod
+    def _latest_day_range(latest: datetime) -> Tuple[datetime, datetime]:
+        """最新一天的[当天0点, 次日0点)，按这个范围过滤能走date索引"""
+        day = timezone.localdate(latest) if timezone.is_aware(latest) else latest.date()
+        day_start = timezone.make_aware(datetime.combine(day, time.min))
+        return day_start, day_start + timedelta(days=1)
+
+    def rebuild(self, generation: int) -> None:
+        """
+        从数据库加载最新一天的小区位置并重建网格
+        :param generation: 加载前读到的数据版本号（加载期间有写入时，版本号对不上，下次会再重建）
+        """
+        latest = NetworkSceneData.objects.aggregate(latest=Max("date"))["latest"]
+        rows = []
+        if latest is not None:
+            day_start, day_end = self._latest_day_range(latest)
+            rows = list(
+                NetworkSceneData.objects.filter(
+                    date__gte=day_start, date__lt=day_end,
+                    latitude__isnull=False, longitude__isnull=False
+                ).order_by().values_list(*LOCATION_COLUMNS)
+            )
+            self.day = timezone.localdate(day_start)
+        lat_index, lon_index = LOCATION_COLUMNS.index("latitude"), LOCATION_COLUMNS.index("longitude")
+        lats = np.array([row[lat_index] for row in rows], dtype=np.float64)
+        lons = np.array([row[lon_index] for row in rows], dtype=np.float64)
+
+        # 按网格键排序，每个网格对应一段连续下标
+        grid = np.stack([np.floor(lats / GRID_DEGREES), np.floor(lons / GRID_DEGREES)], axis=1).astype(np.int64)
+        order = np.lexsort((grid[:, 1], grid[:, 0])) if len(rows) else np.empty(0, dtype=np.intp)
+        buckets = {}
+        if len(rows):
+            sorted_grid = grid[order]
+            starts = np.flatnonzero(np.any(np.diff(sorted_grid, axis=0) != 0, axis=1)) + 1
+            bounds = np.concatenate([[0], starts, [len(rows)]])
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                buckets[tuple(sorted_grid[start])] = slice(int(start), int(end))
+
+        self.rows, self.lats, self.lons = rows, lats, lons
+        self.order, self.buckets = order, buckets
+        self.generation = generation
+        self.built_at = monotonic()
+
+    def nearest(self, lat: float, lon: float, k: int, radius_m: float) -> List[Dict]:
+        """
+        半径内最近的k个小区
+        :param lat: 纬度
+        :param lon: 经度
+        :param k: 返回数量
+        :param radius_m: 搜索半径（米）
+        :return: 按距离升序的小区列表，每个带distance_m（米，保留1位小数）
+        """
+        # 半径覆盖的网格范围（经度方向按纬度缩放，靠近两极时退化为全经度）
+        lat_span = np.degrees(radius_m / EARTH_RADIUS_M)
+        cos_lat = max(np.cos(np.radians(min(abs(lat) + lat_span, 90.0))), 1e-6)
+        lon_span = min(lat_span / cos_lat, 180.0)
+        lat_range = range(int(np.floor((lat - lat_span) / GRID_DEGREES)),
+                          int(np.floor((lat + lat_span) / GRID_DEGREES)) + 1)
+        lon_range = range(int(np.floor((lon - lon_span) / GRID_DEGREES)),
+                          int(np.floor((lon + lon_span) / GRID_DEGREES)) + 1)
+        if len(lat_range) * len(lon_range) > len(self.buckets):
+            # 网格数比有数据的网格还多时，直接遍历有数据的网格
+            slices = [bucket for key, bucket in self.buckets.items() if key[0] in lat_range and key[1] in lon_range]
+        else:
+            slices = [self.buckets[(i, j)] for i in lat_range for j in lon_range if (i, j) in self.buckets]
+        if not slices:
+            return []
+
+        candidates = np.concatenate([self.order[bucket] for bucket in slices])
+        distances = haversine_m(lat, lon, self.lats[candidates], self.lons[candidates])
+        within = distances <= radius_m
+        candidates, distances = candidates[within], distances[within]
+        if len(candidates) > k:
+            top = np.argpartition(distances, k - 1)[:k]
+            candidates, distances = candidates[top], distances[top]
+        ranking = np.argsort(distances, kind="stable")
+
+        result = []
+        for position in ranking:
+            row = dict(zip(LOCATION_COLUMNS, self.rows[candidates[position]]))
+            row["distance_m"] = round(float(distances[position]), 1)
+            result.append(row)
+        return result
+
+
+# ==================== 进程级单例 ====================
+_index: Optional[CellLocationIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_cell_location_index() -> CellLocationIndex:
+    """
+    获取当前进程的位置索引：数据版本号变化（有新数据写入）且距上次重建超过 FEELLIST_SNAPSHOT_REFRESH_SECONDS 秒时重建；
+    已经有线程在重建时直接返回旧索引
+    """
+    global _index
+    generation = get_generation(NetworkSceneData._meta.db_table)
+    index = _index
+    if index is None:
+        # 第一次：没有旧索引可用，只能等建好
+        with _index_lock:
+            if _index is None:
+                index = CellLocationIndex()
+                index.rebuild(generation)
+                _index = index
+            return _index
+    interval = getattr(settings, "FEELLIST_SNAPSHOT_REFRESH_SECONDS", 60)
+    if index.generation == generation or monotonic() - index.built_at < interval:
+        return index
+    if not _index_lock.acquire(blocking=False):
+        return index
+    try:
+        if _index.generation != generation:
+            index = CellLocationIndex()
+            index.rebuild(generation)
+            _index = index
+    finally:
+        _index_lock.release()
+    return _index
@@ -0,0 +1,401 @@
+"""
+NetworkSceneData 列式快照：把最近N天的小区数据按列加载到NumPy数组，供分析类查询使用
+新手必看：
+- 每个进程一份快照（get_scene_snapshot），按 update_time 水位增量刷新
+- 刷新在后台线程里做，请求直接用当前这份快照，不等刷新；只有进程里第一次加载时请求要等
+- 增量刷新会把水位往前多读 WATERMARK_OVERLAP：update_time 是保存时取的时间，事务晚提交的行 update_time
+  可能比上次水位还早，多读一段才不会漏掉（重复读到的行按ID覆盖）；超过这个时长的长事务由定时全量重载兜底
+- 刷新时在局部变量里拼好新的列，再一次赋值给 columns；读请求先取一次 columns 再传给各个方法，
+  整个请求用的都是同一份数据，不会读到刷新到一半的列
+- 增量刷新发现不了被删除的行，所以每隔一段时间会全量重载一次
+- 指标列是float64，空值是NaN（np.isnan就是空值掩码）
+- 维度列（地市、场景等）编码成int32，空值是 -1
+- 分布、相关性、排名这类查询不用经过ORM模型对象，百万行也能在100ms内算完
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from core.exceptions.core_exceptions import ParamError
+from core.utils.core_log import logger
+from feellist.fileds.cell_indicator_fileds import cell_indicator_fields
+from feellist.models import NetworkSceneData
+
+# 维度列：编码成int32，空值为-1
+DIMENSION_COLUMNS = (
+    "city", "scene_level1", "area", "indoor_outdoor", "manufacturer", "contractor", "has_complaint"
+)
+# 指标列：float64，空值为NaN
+METRIC_COLUMNS = ("cell_score", "cell_user_avg_score", *cell_indicator_fields())
+# 空值编码
+NULL_CODE = -1
+# 日期列编码：距1970-01-01的天数
+EPOCH = date(1970, 1, 1)
+# 增量刷新时水位往前多读的时长：要比写库事务的最长时间长
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def _day_number(value: Optional[datetime]) -> int:
+    """时间 → 天数编码（按当前时区截断到天），空值为NULL_CODE"""
+    if value is None:
+        return NULL_CODE
+    day = timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return (day - EPOCH).days
+
+
+class SceneColumnarSnapshot:
+    """
+    小区数据列式快照
+    用法：
+        snapshot = get_scene_snapshot()
+        columns = snapshot.columns
+        mask = snapshot.mask(columns, {"city": 11201, "date__gte": ...})
+        rows = snapshot.aggregate(columns, mask, ["scene_level1"], [("avg", "cqi_good_rate")])
+    """
+
+    def __init__(self, days: int, chunk_size: int = 20000):
+        self.days = days
+        self.chunk_size = chunk_size
+        self.columns: Dict[str, np.ndarray] = {}
+        self.watermark: Optional[datetime] = None
+        self.window_start: Optional[int] = None
+        self.loaded_at = 0.0
+        self.full_loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """快照行数"""
+        return len(self.columns["id"]) if self.columns else 0
+
+    def window(self) -> Dict[str, Optional[date]]:
+        """快照覆盖的日期范围（包含首尾）"""
+        if self.window_start is None:
+            return {"date_start": None, "date_end": None}
+        return {"date_start": EPOCH + timedelta(days=self.window_start),
+                "date_end": EPOCH + timedelta(days=self.window_start + self.days - 1)}
+
+    # ==================== 加载与刷新 ====================
+    def refresh(self, full: bool = False) -> int:
+        """
+        刷新快照：首次或full=True时全量加载，否则只加载update_time超过（水位 - WATERMARK_OVERLAP）的行
+        :return: 本次加载（新增或更新）的行数
+        """
+        with self._lock:
+            return self._refresh(full)
+
+    def refresh_in_background(self, full: bool = False) -> bool:
+        """
+        在后台线程里刷新，调用方直接返回；已经在刷新时不重复启动
+        :return: 是否启动了刷新线程
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        thread = threading.Thread(target=self._background_refresh, args=(full,), name="scene-snapshot-refresh",
+                                  daemon=True)
+        try:
+            thread.start()
+        except RuntimeError:
+            self._lock.release()
+            raise
+        return True
+
+    def _background_refresh(self, full: bool) -> None:
+        """后台线程：刷新完释放调用方拿到的锁，关闭本线程的数据库连接"""
+        try:
+            self._refresh(full)
+        except Exception:  # noqa: BLE001 后台线程的异常只能记日志，下个请求会再触发刷新
+            logger.exception("列式快照后台刷新失败")
+        finally:
+            self._lock.release()
+            connection.close()
+
+    def _refresh(self, full: bool) -> int:
+        """刷新快照（调用方持有 self._lock）"""
+        latest = NetworkSceneData.objects.aggregate(latest=Max("date"))["latest"]
+        if latest is None:
+            self.columns, self.watermark = self._empty_columns(), None
+            self.loaded_at = time.monotonic()
+            return 0
+        window_start = _day_number(latest) - self.days + 1
+        columns, watermark = self.columns, self.watermark
+        full = full or not columns or window_start != self.window_start
+        if full:
+            # 首次加载或者窗口滑动：全量重建（窗口外的旧数据一起丢掉）
+            columns, watermark = self._empty_columns(), None
+
+        queryset = NetworkSceneData.objects.filter(
+            date__gte=timezone.make_aware(datetime.combine(EPOCH + timedelta(days=window_start), datetime.min.time()))
+        )
+        if watermark is not None:
+            queryset = queryset.filter(update_time__gt=watermark - WATERMARK_OVERLAP)
+        loaded = self._load(queryset)
+        loaded_watermark = loaded.pop("update_time")
+        count = len(loaded["id"])
+        if count:
+            columns = self._merge(columns, loaded)
+            watermark = max(filter(None, [watermark, loaded_watermark]))
+
+        # 一次赋值发布新列：读请求拿到的要么是旧的一整份，要么是新的一整份
+        self.columns, self.watermark, self.window_start = columns, watermark, window_start
+        self.loaded_at = time.monotonic()
+        if full:
+            self.full_loaded_at = self.loaded_at
+        return count
+
+    def _empty_columns(self) -> Dict[str, np.ndarray]:
+        columns = {"id": np.empty(0, dtype=np.int64), "cell_id": np.empty(0, dtype=np.int64),
+                   "date": np.empty(0, dtype=np.int32)}
+        columns.update({name: np.empty(0, dtype=np.int32) for name in DIMENSION_COLUMNS})
+        columns.update({name: np.empty(0, dtype=np.float64) for name in METRIC_COLUMNS})
+        return columns
+
+    def _load(self, queryset) -> Dict[str, np.ndarray]:
+        """按ID分批读取（values_list，不创建模型对象），逐批转成数组后拼接"""
+        names = ("id", "cell_id", "date", "update_time", *DIMENSION_COLUMNS, *METRIC_COLUMNS)
+        queryset = queryset.order_by("id").values_list(*names)
+        parts = []
+        last_id = 0
+        while True:
+            rows = list(queryset.filter(id__gt=last_id)[:self.chunk_size])
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            parts.append(self._to_arrays(names, rows))
+            if len(rows) < self.chunk_size:
+                break
+        if not parts:
+            return self._empty_columns() | {"update_time": None}
+        merged = {name: np.concatenate([part[name] for part in parts]) for name in parts[0] if name != "update_time"}
+        merged["update_time"] = max(part["update_time"] for part in parts)
+        return merged
+
+    @staticmethod
+    def _to_arrays(names: Sequence[str], rows: List[tuple]) -> Dict:
+        columns = dict(zip(names, zip(*rows)))
+        arrays = {
+            "id": np.array(columns["id"], dtype=np.int64),
+            "cell_id": np.array([NULL_CODE if v is None else v for v in columns["cell_id"]], dtype=np.int64),
+            "date": np.array([_day_number(v) for v in columns["date"]], dtype=np.int32),
+            "update_time": max(v for v in columns["update_time"] if v is not None),
+        }
+        for name in DIMENSION_COLUMNS:
+            arrays[name] = np.array([NULL_CODE if v is None else v for v in columns[name]], dtype=np.int32)
+        for name in METRIC_COLUMNS:
+            # None会被转换成NaN
+            arrays[name] = np.array(columns[name], dtype=np.float64)
+        return arrays
+
+    @staticmethod
+    def _merge(columns: Dict[str, np.ndarray], loaded: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """把新加载的行合并进现有列，返回新的列（不修改传入的数组）：ID已存在的行先删掉再追加"""
+        if not len(columns["id"]):
+            return loaded
+        keep = ~np.isin(columns["id"], loaded["id"])
+        return {name: np.concatenate([columns[name][keep], loaded[name]]) for name in columns}
+
+    # ==================== 筛选 ====================
+    @staticmethod
+    def mask(columns: Dict[str, np.ndarray], filters: Dict) -> np.ndarray:
+        """
+        根据筛选条件生成行掩码
+        :param columns: 请求开始时取的 snapshot.columns
+        :param filters: 仓储层validate_filters的结果（等值维度条件、date__gte/date__lt、cell_id）
+        :return: bool数组
+        :raise ParamError: 快照不支持的筛选条件
+        """
+        mask = np.ones(len(columns["id"]), dtype=bool)
+        for key, value in filters.items():
+            if key in DIMENSION_COLUMNS or key == "cell_id":
+                mask &= columns[key] == value
+            elif key == "date__gte":
+                mask &= columns["date"] >= _day_number(value)
+            elif key == "date__lt":
+                # 边界是某天0点，小于它就是小于那一天
+                mask &= (columns["date"] < _day_number(value)) & (columns["date"] != NULL_CODE)
+            else:
+                raise ParamError(detail=f"快照不支持的筛选条件：{key}")
+        return mask
+
+    # ==================== 聚合 ====================
+    def aggregate(self, columns: Dict[str, np.ndarray], mask: np.ndarray, group_by: List[str],
+                  metrics: List[Tuple[str, Optional[str]]]) -> List[Dict]:
+        """
+        分组聚合（空值不参与sum/avg/min/max，和SQL语义一致）
+        :param columns: 和mask同一份的 snapshot.columns
+        :param mask: 行掩码
+        :param group_by: 维度列（DIMENSION_COLUMNS或date）
+        :param metrics: [(sum/avg/min/max/count, 指标列或None)]
+        :return: 每组一行的字典列表，date维度还原成日期
+        """
+        for name in group_by:
+            if name not in DIMENSION_COLUMNS and name != "date":
+                raise ParamError(detail=f"快照不支持的分组维度：{name}")
+        for func, field in metrics:
+            if func not in ("sum", "avg", "min", "max", "count") or (field and field not in METRIC_COLUMNS):
+                raise ParamError(detail=f"快照不支持的指标：{func}:{field or ''}")
+
+        groups, inverse = self._group_keys(columns, mask, group_by)
+        group_count = len(groups)
+
+        results = {"count": np.bincount(inverse, minlength=group_count)}
+        for func, field in metrics:
+            if field is None:
+                continue
+            values = columns[field][mask]
+            valid = ~np.isnan(values)
+            counts = np.bincount(inverse[valid], minlength=group_count)
+            if func == "count":
+                result = counts
+            elif func in ("sum", "avg"):
+                sums = np.bincount(inverse[valid], weights=values[valid], minlength=group_count)
+                if func == "avg":
+                    sums = np.divide(sums, counts, out=np.zeros(group_count), where=counts > 0)
+                result = np.where(counts > 0, sums, np.nan)
+            else:
+                result = np.full(group_count, np.inf if func == "min" else -np.inf)
+                (np.minimum if func == "min" else np.maximum).at(result, inverse[valid], values[valid])
+                result = np.where(counts > 0, result, np.nan)
+            results[f"{func}_{field}"] = result
+
+        names = ["count" if field is None else f"{func}_{field}" for func, field in metrics]
+        rows = []
+        for index in range(group_count):
+            row = {}
+            for position, name in enumerate(group_by):
+                code = int(groups[index][position])
+                if code == NULL_CODE:
+                    row[name] = None
+                else:
+                    row[name] = EPOCH + timedelta(days=code) if name == "date" else code
+            for name in names:
+                value = results[name][index]
+                row[name] = None if np.isnan(value) else (int(value) if name.startswith("count") else float(value))
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def _group_keys(columns: Dict[str, np.ndarray], mask: np.ndarray,
+                    group_by: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        计算分组：返回(每组的维度编码, 每行所属的组号)
+        维度编码都是小整数，先按混合进制拼成一个整数键再bincount，O(n)不用排序；
+        键空间太大时才退回np.unique
+        """
+        if not group_by:
+            return np.empty((1, 0), dtype=np.int64), np.zeros(int(mask.sum()), dtype=np.intp)
+        keys = [columns[name][mask].astype(np.int64) for name in group_by]
+        if not len(keys[0]):
+            return np.empty((0, len(group_by)), dtype=np.int64), np.empty(0, dtype=np.intp)
+        offsets = [int(key.min()) for key in keys]
+        dims = [int(key.max()) - offset + 1 for key, offset in zip(keys, offsets)]
+        if np.prod(dims, dtype=np.float64) > 1 << 24:
+            groups, inverse = np.unique(np.stack(keys, axis=1), axis=0, return_inverse=True)
+            return groups, inverse.ravel()
+        flat = np.ravel_multi_index([key - offset for key, offset in zip(keys, offsets)], dims)
+        present = np.flatnonzero(np.bincount(flat))
+        lookup = np.empty(int(np.prod(dims)), dtype=np.intp)
+        lookup[present] = np.arange(len(present))
+        groups = np.stack(np.unravel_index(present, dims), axis=1) + np.array(offsets)
+        return groups, lookup[flat]
+
+    @staticmethod
+    def quantiles(columns: Dict[str, np.ndarray], mask: np.ndarray, field: str,
+                  qs: Sequence[float]) -> Dict[str, Optional[float]]:
+        """指标分位数（忽略空值）"""
+        if field not in METRIC_COLUMNS:
+            raise ParamError(detail=f"快照不支持的指标：{field}")
+        values = columns[field][mask]
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return {f"p{int(q * 100)}": None for q in qs}
+        return {f"p{int(q * 100)}": float(v) for q, v in zip(qs, np.quantile(values, qs))}
+
+    @staticmethod
+    def rankings(columns: Dict[str, np.ndarray], mask: np.ndarray, field: str, limit: int,
+                 ascending: bool = False) -> List[Dict]:
+        """
+        小区排名：按小区汇总指标均值（多天取平均，忽略空值），返回最好/最差的limit个
+        :param columns: 和mask同一份的 snapshot.columns
+        :param mask: 行掩码
+        :param field: 指标列
+        :param limit: 返回数量
+        :param ascending: True从小到大（最差的在前），默认从大到小
+        :return: [{"cell_id", "city", "days", "avg_指标"}]，city取小区最新一天的地市
+        """
+        if field not in METRIC_COLUMNS:
+            raise ParamError(detail=f"快照不支持的指标：{field}")
+        values = columns[field][mask]
+        valid = ~np.isnan(values) & (columns["cell_id"][mask] != NULL_CODE)
+        values = values[valid]
+        if not len(values):
+            return []
+        cell_ids, inverse = np.unique(columns["cell_id"][mask][valid], return_inverse=True)
+        counts = np.bincount(inverse)
+        averages = np.bincount(inverse, weights=values) / counts
+        # 同一个小区取最新一天的地市：按日期排序后最后写入的胜出
+        dates = columns["date"][mask][valid]
+        order = np.argsort(dates, kind="stable")
+        cities = np.empty(len(cell_ids), dtype=np.int32)
+        cities[inverse[order]] = columns["city"][mask][valid][order]
+
+        keys = averages if ascending else -averages
+        limit = min(limit, len(cell_ids))
+        top = np.argpartition(keys, limit - 1)[:limit]
+        # 均值相同按cell_id升序，结果稳定
+        top = top[np.lexsort((cell_ids[top], keys[top]))]
+        return [
+            {"cell_id": int(cell_ids[i]), "city": None if cities[i] == NULL_CODE else int(cities[i]),
+             "days": int(counts[i]), f"avg_{field}": float(averages[i])}
+            for i in top
+        ]
+
+    @staticmethod
+    def correlation(columns: Dict[str, np.ndarray], mask: np.ndarray, fields: List[str]) -> List[List[Optional[float]]]:
+        """指标两两之间的皮尔逊相关系数（只用所有字段都非空的行）"""
+        for field in fields:
+            if field not in METRIC_COLUMNS:
+                raise ParamError(detail=f"快照不支持的指标：{field}")
+        matrix = np.stack([columns[field][mask] for field in fields])
+        matrix = matrix[:, ~np.isnan(matrix).any(axis=0)]
+        if matrix.shape[1] < 2:
+            return [[None] * len(fields) for _ in fields]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = np.corrcoef(matrix)
+        return [[None if np.isnan(v) else float(v) for v in row] for row in np.atleast_2d(corr)]
+
+
+# ==================== 进程级单例 ====================
+_snapshot: Optional[SceneColumnarSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_scene_snapshot() -> SceneColumnarSnapshot:
+    """
+    获取当前进程的快照：首次调用全量加载，之后超过刷新间隔时在后台线程增量刷新，本次请求用当前快照
+    配置：FEELLIST_SNAPSHOT_DAYS（加载最近几天），FEELLIST_SNAPSHOT_REFRESH_SECONDS（增量刷新间隔），
+         FEELLIST_SNAPSHOT_FULL_RELOAD_SECONDS（全量重载间隔）
+    """
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = SceneColumnarSnapshot(days=getattr(settings, "FEELLIST_SNAPSHOT_DAYS", 7))
+    if not _snapshot.columns:
+        # 第一次加载：没有旧数据可用，只能等加载完（并发的首次请求排队等同一次加载）
+        with _snapshot._lock:
+            if not _snapshot.columns:
+                _snapshot._refresh(full=True)
+        return _snapshot
+    interval = getattr(settings, "FEELLIST_SNAPSHOT_REFRESH_SECONDS", 60)
+    full_interval = getattr(settings, "FEELLIST_SNAPSHOT_FULL_RELOAD_SECONDS", 3600)
+    now = time.monotonic()
+    if now - _snapshot.loaded_at >= interval:
+        _snapshot.refresh_in_background(full=now - _snapshot.full_loaded_at >= full_interval)
+    return _snapshot
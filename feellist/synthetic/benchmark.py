@@ -0,0 +1,173 @@
+"""
+接口基准测试：对列表、筛选、详情、统计、写入接口逐个发请求，统计耗时分位数、峰值内存和SQL条数
+新手必看：
+- 请求走完整的Django中间件和视图（django.test.Client），和线上处理路径一致
+- 每个用例先预热，再正式请求N次；峰值内存单独多跑一次（tracemalloc会拖慢执行，不计入耗时）
+- 写入用例在事务里执行完就回滚，不会改动库里的数据
+- 结果是普通字典，可以直接存成JSON，和另一个版本的结果对比
+"""
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import django
+from django.db import connection, transaction
+from django.test import Client
+
+from core.utils.core_queries import record_queries
+
+API_PREFIX = "/api/feellist/"
+
+
+class BenchmarkCase:
+    """
+    一个基准测试用例
+    :param name: 用例名（结果JSON里的键）
+    :param group: 分组：list / filter / detail / aggregate / ingest
+    :param method: 请求方法
+    :param path: 接口路径（相对 /api/feellist/）
+    :param params: GET为URL参数；POST为请求体（JSON）
+    :param rollback: 是否在事务里执行并回滚（写入用例）
+    """
+
+    def __init__(self, name: str, group: str, method: str, path: str, params=None, rollback: bool = False):
+        self.name = name
+        self.group = group
+        self.method = method
+        self.path = API_PREFIX + path
+        self.params = params or {}
+        self.rollback = rollback
+
+    def request(self, client: Client):
+        """发一次请求，返回响应"""
+        if self.method == "post":
+            body = json.dumps(self.params, ensure_ascii=False, default=str)
+            return client.post(self.path, body, content_type="application/json")
+        return client.get(self.path, self.params)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """分位数（线性插值）"""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def run_case(client: Client, case: BenchmarkCase, iterations: int, warmup: int = 2) -> Dict:
+    """
+    执行一个用例
+    :param client: 测试客户端
+    :param case: 用例
+    :param iterations: 正式请求次数
+    :param warmup: 预热次数（不计入结果）
+    :return: {"group", "path", "status", "p50_ms", "p95_ms", "mean_ms", "peak_memory_kb", "queries", "response_bytes"}
+    """
+    def once():
+        if not case.rollback:
+            return case.request(client)
+        with transaction.atomic():
+            response = case.request(client)
+            transaction.set_rollback(True)
+        return response
+
+    for _ in range(warmup):
+        once()
+
+    latencies, query_counts = [], []
+    response = None
+    for _ in range(iterations):
+        with record_queries(capture_caller=False) as recorder:
+            started = time.perf_counter()
+            response = once()
+            latencies.append((time.perf_counter() - started) * 1000)
+        query_counts.append(recorder.count)
+
+    # 峰值内存：单独跑一次
+    tracemalloc.start()
+    try:
+        once()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "group": case.group,
+        "method": case.method.upper(),
+        "path": case.path,
+        "status": response.status_code,
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 0.5), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "peak_memory_kb": round(peak / 1024, 1),
+        "queries": int(statistics.median(query_counts)),
+        "response_bytes": len(response.content),
+    }
+
+
+def run_suite(
+        cases: List[BenchmarkCase],
+        iterations: int,
+        warmup: int = 2,
+        progress: Optional[Callable[[str, Dict], None]] = None
+) -> Dict:
+    """
+    执行全部用例
+    :param cases: 用例列表
+    :param iterations: 每个用例的正式请求次数
+    :param warmup: 预热次数
+    :param progress: 每个用例完成后的回调(用例名, 结果)
+    :return: {"meta": 运行环境, "results": {用例名: 结果}}
+    """
+    client = Client()
+    results = {}
+    for case in cases:
+        results[case.name] = run_case(client, case, iterations, warmup)
+        if progress:
+            progress(case.name, results[case.name])
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "iterations": iterations,
+        },
+        "results": results,
+    }
+
+
+def compare_results(current: Dict, baseline: Dict) -> List[Dict]:
+    """
+    和基线结果对比（只对比两边都有的用例）
+    :return: [{"name", "p50_ms", "baseline_p50_ms", "p50_change", "p95_ms", "baseline_p95_ms", "p95_change", "queries", "baseline_queries"}]
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        rows.append({
+            "name": name,
+            "p50_ms": result["p50_ms"],
+            "baseline_p50_ms": base["p50_ms"],
+            "p50_change": _change(result["p50_ms"], base["p50_ms"]),
+            "p95_ms": result["p95_ms"],
+            "baseline_p95_ms": base["p95_ms"],
+            "p95_change": _change(result["p95_ms"], base["p95_ms"]),
+            "queries": result["queries"],
+            "baseline_queries": base["queries"],
+        })
+    return rows
+
+
+def _change(value: float, base: float) -> Optional[float]:
+    """变化比例（+0.1表示慢了10%）"""
+    return round(value / base - 1, 4) if base else None
@@ -0,0 +1,295 @@
+"""
+合成数据生成器：按江西各地市的真实比例生成小区数据（NetworkSceneData）和用户评分（UserScore），用于压测和性能对比
+新手必看：
+- 同一个随机种子生成的数据完全一样，不同版本跑基准测试可以用同一份数据对比
+- 小区的地市按话务量比例分布，经纬度在地市中心附近正态分布（限制在江西省范围内）
+- 比例类指标是0~1的小数，小区评分用评分引擎（feellist.scoring）按指标算出来，和线上口径一致
+- 每块数据在一次NumPy运算里生成，几百万行也只需要几分钟（主要耗时在写库）
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from feellist.common.constants import (
+    CITY_NAME_MAP, SCENE_LEVEL1_CHOICES, MANUFACTURER_CHOICES, CONTRACTOR_CHOICES, AREA_CHOICES
+)
+from feellist.models import NetworkSceneData, UserScore
+from feellist.scoring.cell_score import ScoringProfile
+
+# 江西省经纬度范围
+JIANGXI_BOUNDS = {"min_lat": 24.48, "max_lat": 30.08, "min_lon": 113.57, "max_lon": 118.48}
+
+# 地市中心经纬度 + 小区数占比
+CITY_PROFILES = {
+    11201: {"lat": 28.68, "lon": 115.86, "weight": 0.15},  # 南昌
+    11202: {"lat": 29.27, "lon": 117.18, "weight": 0.04},  # 景德镇
+    11203: {"lat": 27.62, "lon": 113.85, "weight": 0.04},  # 萍乡
+    11204: {"lat": 29.71, "lon": 116.00, "weight": 0.10},  # 九江
+    11205: {"lat": 27.82, "lon": 114.92, "weight": 0.03},  # 新余
+    11206: {"lat": 28.26, "lon": 117.07, "weight": 0.03},  # 鹰潭
+    11207: {"lat": 25.83, "lon": 114.93, "weight": 0.18},  # 赣州
+    11208: {"lat": 27.11, "lon": 114.99, "weight": 0.10},  # 吉安
+    11209: {"lat": 27.81, "lon": 114.42, "weight": 0.11},  # 宜春
+    11210: {"lat": 27.95, "lon": 116.36, "weight": 0.08},  # 抚州
+    11211: {"lat": 28.45, "lon": 117.94, "weight": 0.14},  # 上饶
+}
+# 小区离地市中心的距离（度，正态分布的标准差）
+CITY_SPREAD_DEGREES = 0.25
+
+# 枚举值占比（和 feellist.common.constants 的顺序一致）
+SCENE_LEVEL1_WEIGHTS = (0.45, 0.08, 0.04, 0.07, 0.06, 0.12, 0.08, 0.10)
+MANUFACTURER_WEIGHTS = (0.55, 0.35, 0.05, 0.05)
+CONTRACTOR_WEIGHTS = (0.6, 0.4)
+AREA_WEIGHTS = (0.25, 0.25, 0.35, 0.15)
+
+# 指标分布：{字段: (分布, 参数...)}
+# beta(a, b)：0~1的比例；normal(均值, 标准差, 下限, 上限)；lognormal(对数均值, 对数标准差)
+SCENE_INDICATOR_DISTRIBUTIONS = {
+    "volte_connect_rate": ("beta", 60, 1),
+    "lte_service_drop_rate_qci1": ("beta", 1, 300),
+    "qci1_ul_pdcp_sdu_loss_rate": ("beta", 1, 500),
+    "qci1_dl_pdcp_sdu_loss_rate": ("beta", 1, 500),
+    "cqi_good_rate": ("beta", 14, 1.5),
+    "dl_prb_utilization_mean": ("beta", 2, 3),
+    "carrier_avg_noise_interference_health": ("beta", 9, 1),
+    "overlap_coverage_ratio": ("beta", 1.2, 12),
+    "rsrp_ge_110_ratio": ("beta", 16, 1.2),
+    "mod3_interference_ratio": ("beta", 1.2, 14),
+}
+# 采样点数：总数服从对数正态分布，子项 = 总数 × 对应比例
+SCENE_SAMPLE_POINTS = {
+    "total_sample_points_sum": ("overlap_coverage_sample_points_sum", "overlap_coverage_ratio"),
+    "total_sample_point_sum": ("mro_rsrp_ge_110_sample_points_sum", "rsrp_ge_110_ratio"),
+    "total_sample_points_mod3_sum": ("mod3_interference_sample_points_sum", "mod3_interference_ratio"),
+}
+USER_INDICATOR_DISTRIBUTIONS = {
+    "flu": ("lognormal", 6.0, 1.2),
+    "MR_rate": ("beta", 16, 1.2),
+    "Ta_avg": ("lognormal", 1.5, 0.6),
+    "MR_avg": ("normal", -95, 8, -140, -44),
+    "MR_overlap_coverage_rate": ("beta", 1.2, 12),
+    "RSRQ_avg": ("normal", -11, 2.5, -20, -3),
+    "large_packet_rate_kbps": ("lognormal", 10.0, 0.6),
+    "web_tcp_latency_ms": ("lognormal", 3.7, 0.5),
+    "im_tcp_latency_ms": ("lognormal", 3.9, 0.5),
+    "game_tcp_latency_ms": ("lognormal", 3.5, 0.5),
+    "video_tcp_latency_ms": ("lognormal", 4.1, 0.5),
+    "MOS_avg": ("normal", 4.0, 0.3, 1, 5),
+    "MOS_ul_avg": ("normal", 4.0, 0.35, 1, 5),
+    "MOS_dl_avg": ("normal", 4.05, 0.3, 1, 5),
+    "ul_interrupt_rate": ("beta", 1, 300),
+    "ul_one_way_audio_rate": ("beta", 1, 500),
+}
+# 指标缺失（空值）的比例
+NULL_RATE = 0.01
+# 小区ID起始值（ECI = 基站号 × 256 + 小区号，每个基站3个小区）
+ENB_ID_START = 500000
+
+
+class SyntheticDataGenerator:
+    """
+    合成数据生成器
+    用法：
+        generator = SyntheticDataGenerator(cell_count=10000, days=7, seed=42)
+        for rows in generator.iter_scene_rows(chunk_size=5000):
+            repository.bulk_upsert(rows)
+        for rows in generator.iter_user_rows(100000, chunk_size=5000):
+            repository.bulk_create(rows)
+    """
+
+    def __init__(self, cell_count: int, days: int = 7, end_date: Optional[date] = None, seed: int = 42):
+        """
+        :param cell_count: 小区数（小区数据行数 = 小区数 × 天数）
+        :param days: 生成多少天的小区数据
+        :param end_date: 最后一天，为空表示今天
+        :param seed: 随机种子
+        """
+        self.cell_count = cell_count
+        self.days = days
+        self.end_date = end_date or timezone.localdate()
+        self.seed = seed
+        self.cells = self._build_cells(np.random.default_rng(seed))
+
+    # ==================== 小区静态属性 ====================
+    def _build_cells(self, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """生成每个小区不随日期变化的属性：地市、经纬度、厂家、场景等"""
+        n = self.cell_count
+        city_ids = np.array(list(CITY_PROFILES))
+        weights = np.array([profile["weight"] for profile in CITY_PROFILES.values()])
+        city = rng.choice(city_ids, size=n, p=weights / weights.sum())
+        center_lat = np.array([CITY_PROFILES[c]["lat"] for c in city_ids])[np.searchsorted(city_ids, city)]
+        center_lon = np.array([CITY_PROFILES[c]["lon"] for c in city_ids])[np.searchsorted(city_ids, city)]
+
+        index = np.arange(n)
+        return {
+            "city": city,
+            "latitude": np.clip(rng.normal(center_lat, CITY_SPREAD_DEGREES),
+                                JIANGXI_BOUNDS["min_lat"], JIANGXI_BOUNDS["max_lat"]).round(6),
+            "longitude": np.clip(rng.normal(center_lon, CITY_SPREAD_DEGREES),
+                                 JIANGXI_BOUNDS["min_lon"], JIANGXI_BOUNDS["max_lon"]).round(6),
+            "eci": (ENB_ID_START + index // 3) * 256 + index % 3,
+            "scene_level1": _choice(rng, SCENE_LEVEL1_CHOICES, SCENE_LEVEL1_WEIGHTS, n),
+            "manufacturer": _choice(rng, MANUFACTURER_CHOICES, MANUFACTURER_WEIGHTS, n),
+            "contractor": _choice(rng, CONTRACTOR_CHOICES, CONTRACTOR_WEIGHTS, n),
+            "area": _choice(rng, AREA_CHOICES, AREA_WEIGHTS, n),
+            "indoor_outdoor": (rng.random(n) < 0.35).astype(np.int64),
+            # 每20个小区属于同一个场景
+            "scene_index": index // 20,
+            # 小区质量的固有差异：让同一个小区每天的指标相关
+            "quality": rng.normal(0, 1, n),
+        }
+
+    # ==================== 小区数据 ====================
+    def iter_scene_rows(self, chunk_size: int = 5000) -> Iterator[List[Dict]]:
+        """
+        按块生成小区数据：每天每个小区一行
+        :param chunk_size: 每块的行数
+        :return: 行字典列表的迭代器（可以直接传给仓储层的bulk_create/bulk_upsert）
+        """
+        profile = ScoringProfile.load()
+        for offset in range(self.days):
+            day = self.end_date - timedelta(days=self.days - 1 - offset)
+            day_value = _day_datetime(day)
+            rng = np.random.default_rng([self.seed, 1, offset])
+            for start in range(0, self.cell_count, chunk_size):
+                cells = {name: values[start:start + chunk_size] for name, values in self.cells.items()}
+                n = len(cells["city"])
+                columns = self._scene_indicators(rng, cells["quality"], n)
+                columns["cell_score"] = np.clip(profile.score(columns), 0, 100).round(2)
+                complaint_prob = np.clip(0.02 + (80 - np.nan_to_num(columns["cell_score"], nan=80)) / 400, 0.005, 0.5)
+                columns["has_complaint"] = (rng.random(n) < complaint_prob).astype(np.int64)
+
+                columns.update({
+                    "city": cells["city"],
+                    "eci": cells["eci"],
+                    "cell_id": cells["eci"],
+                    "latitude": cells["latitude"],
+                    "longitude": cells["longitude"],
+                    "scene_level1": cells["scene_level1"],
+                    "manufacturer": cells["manufacturer"],
+                    "contractor": cells["contractor"],
+                    "area": cells["area"],
+                    "indoor_outdoor": cells["indoor_outdoor"],
+                })
+                rows = _to_rows(NetworkSceneData, columns)
+                for row, scene_index in zip(rows, cells["scene_index"].tolist()):
+                    row["date"] = day_value
+                    row["cellName"] = f"{CITY_NAME_MAP[row['city']]}-{row['eci'] // 256}-{row['eci'] % 256}"
+                    row["scene_id"] = f"S{scene_index:07d}"
+                    row["sceneName"] = f"{CITY_NAME_MAP[row['city']]}场景{scene_index}"
+                yield rows
+
+    def _scene_indicators(self, rng: np.random.Generator, quality: np.ndarray, n: int) -> Dict[str, np.ndarray]:
+        """生成一块小区的每日指标：比例类指标按小区质量上下浮动"""
+        columns = {}
+        for name, spec in SCENE_INDICATOR_DISTRIBUTIONS.items():
+            values = _sample(rng, spec, n)
+            # 质量好的小区：好指标更接近1，差指标（丢包、干扰）更接近0
+            good = spec[1] > spec[2]
+            shift = np.clip(quality * 0.01, -0.05, 0.05)
+            columns[name] = np.clip(values + (shift if good else -shift), 0, 1).round(4)
+        for total_name, (part_name, ratio_name) in SCENE_SAMPLE_POINTS.items():
+            total = np.round(rng.lognormal(9.0, 0.8, n))
+            columns[total_name] = total
+            columns[part_name] = np.round(total * columns[ratio_name])
+        return _with_nulls(rng, columns, n)
+
+    # ==================== 用户评分 ====================
+    def iter_user_rows(self, count: int, chunk_size: int = 5000) -> Iterator[List[Dict]]:
+        """
+        按块生成用户评分：用户集中在少数热点小区（Zipf分布），评分围绕小区质量上下浮动
+        :param count: 用户评分行数
+        :param chunk_size: 每块的行数
+        :return: 行字典列表的迭代器
+        """
+        for chunk_index, start in enumerate(range(0, count, chunk_size)):
+            rng = np.random.default_rng([self.seed, 2, chunk_index])
+            n = min(chunk_size, count - start)
+            cell_index = (rng.zipf(1.3, n) - 1) % self.cell_count
+            cells = {name: values[cell_index] for name, values in self.cells.items()}
+
+            columns = {name: _sample(rng, spec, n) for name, spec in USER_INDICATOR_DISTRIBUTIONS.items()}
+            for name in ("MR_rate", "MR_overlap_coverage_rate", "ul_interrupt_rate", "ul_one_way_audio_rate"):
+                columns[name] = columns[name].round(4)
+            requests = rng.poisson(30, n)
+            success = rng.binomial(requests, 0.99)
+            columns["call_setup_req_count"] = requests
+            columns["call_link_success_count_excl_user"] = success
+            columns["call_link_success_rate_excl_user"] = np.where(
+                requests > 0, success / np.maximum(requests, 1), np.nan
+            ).round(4)
+            columns = _with_nulls(rng, columns, n)
+            columns["cell_score"] = np.clip(rng.normal(80 + cells["quality"] * 5, 8), 0, 100).round(2)
+            columns["net_type"] = (rng.random(n) < 0.7).astype(np.int64)
+            columns.update({
+                "city": cells["city"],
+                "eci": cells["eci"],
+                "cell_id": cells["eci"],
+                "scene_level1": cells["scene_level1"],
+            })
+            # 手机号：1[3-9]开头的11位号码，按行号编码，同一种子下不重复
+            serial = np.arange(start, start + n) * 7919 + self.seed
+            prefixes = 13 + serial % 7
+            rows = _to_rows(UserScore, columns)
+            for row, prefix, number, scene_index in zip(
+                    rows, prefixes.tolist(), (serial % 10 ** 9).tolist(), cells["scene_index"].tolist()
+            ):
+                row["phone_number"] = f"{prefix}{number:09d}"
+                row["cellName"] = f"{CITY_NAME_MAP[row['city']]}-{row['eci'] // 256}-{row['eci'] % 256}"
+                row["scene_id"] = f"S{scene_index:07d}"
+                row["sceneName"] = f"{CITY_NAME_MAP[row['city']]}场景{scene_index}"
+            yield rows
+
+
+# ==================== 工具函数 ====================
+def _choice(rng: np.random.Generator, choices: list, weights: tuple, n: int) -> np.ndarray:
+    """按占比从枚举值里抽样"""
+    values = np.array([value for value, _ in choices])
+    weights = np.array(weights, dtype=float)
+    return rng.choice(values, size=n, p=weights / weights.sum())
+
+
+def _sample(rng: np.random.Generator, spec: tuple, n: int) -> np.ndarray:
+    """按分布配置抽样"""
+    kind, *params = spec
+    if kind == "beta":
+        return rng.beta(params[0], params[1], n)
+    if kind == "normal":
+        mean, std, low, high = params
+        return np.clip(rng.normal(mean, std, n), low, high).round(2)
+    if kind == "lognormal":
+        return rng.lognormal(params[0], params[1], n).round(2)
+    raise ValueError(f"未知的分布：{kind}")
+
+
+def _with_nulls(rng: np.random.Generator, columns: Dict[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+    """按NULL_RATE随机置空指标（浮点数组用NaN表示空值）"""
+    result = {}
+    for name, values in columns.items():
+        values = values.astype(float)
+        values[rng.random(n) < NULL_RATE] = np.nan
+        result[name] = values
+    return result
+
+
+def _to_rows(model, columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """列数组 → 行字典列表：NaN转成None，模型里是整数字段的列转成int"""
+    converted = {}
+    for name, values in columns.items():
+        if values.dtype.kind != "f":
+            converted[name] = values.tolist()
+            continue
+        cast = int if isinstance(model._meta.get_field(name), models.IntegerField) else float
+        converted[name] = [None if value != value else cast(value) for value in values.tolist()]
+    names = list(converted)
+    return [dict(zip(names, values)) for values in zip(*converted.values())]
+
+
+def _day_datetime(day: date) -> datetime:
+    """日期 → 当天0点（USE_TZ时带当前时区）"""
+    value = datetime.combine(day, time.min)
+    return timezone.make_aware(value) if settings.USE_TZ else value
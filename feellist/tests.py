@@ -1,3 +1,1748 @@
-from django.test import TestCase
+"""
+feellist接口测试：SQL预算（列表、详情接口的SQL条数固定，不随数据量增长，没有N+1）+ 各接口的行为
+新手必看：
+- 运行：python manage.py test feellist
+- 预算用 core.utils.core_testing 断言，超预算时失败信息里有每条SQL的耗时和调用位置
+- 测试时关闭响应缓存（否则第二次请求开始就是查缓存，测不到查库的开销），缓存命中单独测
+- 行为测试按功能分组，每组一个TestCase，共用 SceneDataTestCase 造的测试数据
+"""
+import csv
+import io
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from unittest import mock, skipIf
 
-# Create your tests here.
+import numpy as np
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.renderers import JSONRenderer
+
+from core.constants.core_constants import HEATMAP_BINS_PER_TILE, SEARCH_SNIPPET_LENGTH
+from core.exceptions.core_exceptions import ParamError
+from core.middleware.core_metrics import UNRESOLVED_VIEW
+from core.utils.core_cache import bump_generation, get_generation
+from core.utils.core_log import (
+    DroppingQueueHandler, get_sample_rate, log_request, log_response, logger as core_logger, truncate_repr
+)
+from core.utils.core_search import boolean_query, build_snippet
+from core.utils.core_testing import assert_endpoint_query_budget, assert_query_budget
+from feellist.common.constants import MANUFACTURER_CHOICES, SCENE_LEVEL1_CHOICES
+from feellist.models import (
+    CellUserScoreDirty, ComplaintWorkOrder, NetworkSceneDailyRollup, NetworkSceneData, UserScore
+)
+from feellist.repositories.network_scene import NetworkSceneDataRepository
+from feellist.repositories.scene_rollup import NetworkSceneRollupRepository
+from feellist.scoring.cell_score import ScoringProfile
+from feellist.serializers import ComplaintWorkOrderSerializer, NetworkSceneDataSerializer, UserScoreSerializer
+from feellist.services.network_scene import NetworkSceneDataService
+from feellist.services.user_score import UserScoreService
+from feellist.snapshots.cell_locations import EARTH_RADIUS_M, get_cell_location_index
+from feellist.snapshots.network_scene import WATERMARK_OVERLAP, SceneColumnarSnapshot, get_scene_snapshot
+from feellist.synthetic.benchmark import compare_results, percentile
+from feellist.synthetic.generator import (
+    CITY_PROFILES, JIANGXI_BOUNDS, SCENE_INDICATOR_DISTRIBUTIONS, SyntheticDataGenerator
+)
+from feellist.views import NetworkSceneDataListView, UserScoreAnalyticsView, UserScoreListView
+
+API_PREFIX = "/api/feellist/"
+# 测试数据行数：比N+1的判定次数多，逐行查库的写法一定会超预算
+ROW_COUNT = 30
+# 测试用的本进程内存缓存，不和其他进程、其他测试运行共用；版本号和线上一样存数据库计数器表（测试库，随测试回滚）
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "feellist-tests"},
+    "generations": {"BACKEND": "core.utils.core_counter_cache.DatabaseCounterCache"},
+}
+
+
+@override_settings(CACHES=TEST_CACHES, FEELLIST_RESPONSE_CACHE_TTL=0, FEELLIST_RESPONSE_CACHE_TTLS={})
+class SceneDataTestCase(TestCase):
+    """测试数据：ROW_COUNT行小区数据（3天、2个地市）+ ROW_COUNT行用户评分（10个小区）"""
+
+    @classmethod
+    def setUpTestData(cls):
+        base = timezone.make_aware(datetime(2025, 1, 1))
+        NetworkSceneData.objects.bulk_create([
+            NetworkSceneData(
+                date=base + timedelta(days=i % 3), city=(11201, 11204)[i % 2], cell_id=1000 + i,
+                cell_score=50 + i, has_complaint=i % 2, scene_level1=i % 8, area=i % 4,
+                manufacturer=1, contractor=0, indoor_outdoor=i % 2, latitude=28 + i * 0.01, longitude=115 + i * 0.01
+            )
+            for i in range(ROW_COUNT)
+        ])
+        UserScore.objects.bulk_create([
+            UserScore(city=11201, cell_id=1000 + i % 10, net_type=1, cell_score=40 + i,
+                      phone_number="1380000%04d" % i)
+            for i in range(ROW_COUNT)
+        ])
+        cls.scene_id = NetworkSceneData.objects.order_by("id").values_list("id", flat=True).first()
+        cls.user_id = UserScore.objects.order_by("id").values_list("id", flat=True).first()
+
+    def get_json(self, path: str, status_code: int = 200, **params) -> dict:
+        """GET接口并断言状态码，返回JSON"""
+        response = self.client.get(API_PREFIX + path, params)
+        self.assertEqual(response.status_code, status_code, response.content[:500])
+        return response.json()
+
+
+class QueryBudgetTestCase(SceneDataTestCase):
+    """列表、详情接口的SQL预算"""
+
+    # ==================== userscore/ ====================
+    def test_user_list(self):
+        """页码分页：COUNT + 一页数据"""
+        response = assert_endpoint_query_budget(self.client, API_PREFIX + "userscore/", 2, page_size=ROW_COUNT)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["list"]), ROW_COUNT)
+
+    def test_user_list_filtered(self):
+        """带筛选条件的分页：筛选不额外查库"""
+        response = assert_endpoint_query_budget(
+            self.client, API_PREFIX + "userscore/", 2, city=11201, net_type=1, page_size=10
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_list_cursor(self):
+        """游标分页：不统计总数，只查一页"""
+        response = assert_endpoint_query_budget(self.client, API_PREFIX + "userscore/", 1, cursor="", page_size=10)
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_detail(self):
+        """详情：按主键查一条"""
+        response = assert_endpoint_query_budget(self.client, f"{API_PREFIX}userscore/{self.user_id}/", 1)
+        self.assertEqual(response.status_code, 200)
+
+    # ==================== network-scene/ ====================
+    def test_scene_list(self):
+        """页码分页：COUNT + 一页数据"""
+        response = assert_endpoint_query_budget(self.client, API_PREFIX + "network-scene/", 2, page_size=ROW_COUNT)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["list"]), ROW_COUNT)
+
+    def test_scene_list_sparse_fields(self):
+        """按需返回字段：只查需要的列，条数不变"""
+        response = assert_endpoint_query_budget(
+            self.client, API_PREFIX + "network-scene/", 2, city=11201, fields="cell_id,cell_score", page_size=10
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()["list"][0]), {"cell_id", "cell_score"})
+
+    def test_scene_list_cursor(self):
+        """游标分页：不统计总数，只查一页"""
+        response = assert_endpoint_query_budget(self.client, API_PREFIX + "network-scene/", 1, cursor="", page_size=10)
+        self.assertEqual(response.status_code, 200)
+
+    def test_scene_detail(self):
+        """详情：按主键查一条"""
+        response = assert_endpoint_query_budget(self.client, f"{API_PREFIX}network-scene/{self.scene_id}/", 1)
+        self.assertEqual(response.status_code, 200)
+
+    # ==================== 响应缓存 ====================
+    @override_settings(FEELLIST_RESPONSE_CACHE_TTLS={"network_scene_data": 60, "user_score": 60})
+    def test_cached_responses_skip_database(self):
+        """开启响应缓存后，相同参数的第二次请求只查数据版本号，不查业务表"""
+        paths = (API_PREFIX + "userscore/", f"{API_PREFIX}userscore/{self.user_id}/",
+                 API_PREFIX + "network-scene/", f"{API_PREFIX}network-scene/{self.scene_id}/")
+        for path in paths:
+            first = self.client.get(path, {"page_size": 10})
+            with assert_query_budget(1):
+                second = self.client.get(path, {"page_size": 10})
+            self.assertEqual(first.json(), second.json())
+
+
+class PaginationTestCase(SceneDataTestCase):
+    """页码分页：分页在数据库里做，按ID倒序，越界返回空页"""
+
+    def test_page_slices_in_id_order(self):
+        """第2页是按ID倒序的第11~20条，total是筛选后的总数"""
+        expected = list(NetworkSceneData.objects.order_by("-id").values_list("id", flat=True)[10:20])
+        data = self.get_json("network-scene/", page=2, page_size=10)
+        self.assertEqual([row["id"] for row in data["list"]], expected)
+        self.assertEqual(data["total"], ROW_COUNT)
+
+    def test_filtered_total(self):
+        """total是筛选后的条数，不是全表条数"""
+        data = self.get_json("network-scene/", city=11201, page_size=5)
+        self.assertEqual(data["total"], ROW_COUNT // 2)
+        self.assertTrue(all(row["city"] == 11201 for row in data["list"]))
+
+    def test_page_out_of_range(self):
+        """页码越界返回空列表，total不变"""
+        data = self.get_json("userscore/", page=100, page_size=10)
+        self.assertEqual(data["list"], [])
+        self.assertEqual(data["total"], ROW_COUNT)
+
+    def test_invalid_page(self):
+        """页码不是整数返回400"""
+        self.get_json("userscore/", 400, page="abc")
+
+
+class CursorPaginationTestCase(SceneDataTestCase):
+    """游标分页：按(date, id)倒序，同一天的行按ID排，date为空的行排在最后，逐页翻完不重不漏"""
+
+    def collect_pages(self, path: str, page_size: int, **params) -> list:
+        """从第一页翻到最后一页，返回所有行"""
+        rows, cursor = [], ""
+        while cursor is not None:
+            data = self.get_json(path, cursor=cursor, page_size=page_size, **params)
+            self.assertLessEqual(len(data["list"]), page_size)
+            rows.extend(data["list"])
+            cursor = data["next_cursor"]
+        return rows
+
+    def test_walks_all_rows_with_ties_and_nulls(self):
+        """每天10行（date相同靠ID排序），再加3行空日期：翻完正好是全部行，顺序和ORDER BY一致"""
+        NetworkSceneData.objects.bulk_create([NetworkSceneData(date=None, cell_id=9000 + i, city=11201) for i in range(3)])
+        rows = self.collect_pages("network-scene/", 7)
+        expected = [
+            pk for _, pk in sorted(
+                NetworkSceneData.objects.values_list("date", "id"),
+                key=lambda item: (item[0] is None, -(item[0].timestamp() if item[0] else 0), -item[1])
+            )
+        ]
+        self.assertEqual([row["id"] for row in rows], expected)
+        self.assertEqual([row["date"] for row in rows[-3:]], [None, None, None])
+
+    def test_cursor_with_filters(self):
+        """带筛选条件翻页：只返回符合条件的行"""
+        rows = self.collect_pages("network-scene/", 4, city=11204)
+        self.assertEqual(len(rows), ROW_COUNT // 2)
+        self.assertTrue(all(row["city"] == 11204 for row in rows))
+
+    def test_cursor_without_cursor_field(self):
+        """没有游标排序字段的表（用户评分）按ID倒序翻页"""
+        rows = self.collect_pages("userscore/", 8)
+        self.assertEqual([row["id"] for row in rows],
+                         list(UserScore.objects.order_by("-id").values_list("id", flat=True)))
+
+    def test_invalid_cursor(self):
+        """伪造的游标返回400"""
+        self.get_json("network-scene/", 400, cursor="not-a-cursor", page_size=5)
+
+
+class CountModeTestCase(SceneDataTestCase):
+    """总数统计方式：count=exact（默认）/ estimate（估算，缓存COUNT结果）/ none（不统计，返回has_more）"""
+
+    def setUp(self):
+        # 估算总数缓存在default缓存里，每个测试从空缓存开始
+        cache.clear()
+
+    def test_estimate(self):
+        """估算总数：SQLite没有表统计信息，退回COUNT(*)并缓存，之后新增的行要等缓存过期才算进去"""
+        data = self.get_json("network-scene/", count="estimate", city=11201, page_size=10)
+        self.assertEqual(data["total"], ROW_COUNT // 2)
+        self.assertTrue(data["has_more"])
+        NetworkSceneData.objects.create(city=11201, cell_id=8000)
+        data = self.get_json("network-scene/", count="estimate", city=11201, page_size=10)
+        self.assertEqual(data["total"], ROW_COUNT // 2)
+
+    def test_none(self):
+        """不统计总数：total为None，多查一条判断has_more"""
+        data = self.get_json("userscore/", count="none", page_size=ROW_COUNT - 1)
+        self.assertIsNone(data["total"])
+        self.assertTrue(data["has_more"])
+        data = self.get_json("userscore/", count="none", page=2, page_size=ROW_COUNT - 1)
+        self.assertEqual(len(data["list"]), 1)
+        self.assertFalse(data["has_more"])
+
+    def test_none_skips_count_query(self):
+        """不统计总数时只有一条查询"""
+        assert_endpoint_query_budget(self.client, API_PREFIX + "userscore/", 1, count="none", page_size=10)
+
+    def test_invalid_count(self):
+        """不支持的统计方式返回400"""
+        self.get_json("userscore/", 400, count="maybe")
+
+
+class SparseFieldsTestCase(SceneDataTestCase):
+    """按需返回字段：?fields= 只输出这些字段，SQL也只查对应的列"""
+
+    def test_list_fields(self):
+        """列表：只返回要求的字段，*_display 字段查它的来源列"""
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_json("network-scene/", fields="cell_id,city_display", page_size=5)
+        self.assertEqual([set(row) for row in data["list"]], [{"cell_id", "city_display"}] * 5)
+        self.assertTrue(all(row["city_display"] in ("南昌", "九江") for row in data["list"]))
+        select = queries.captured_queries[-1]["sql"]
+        self.assertIn('"city"', select)
+        self.assertNotIn('"cell_score"', select)
+
+    def test_detail_fields(self):
+        """详情：只返回要求的字段"""
+        data = self.get_json(f"network-scene/{self.scene_id}/", fields="cell_id,cell_score")
+        self.assertEqual(data["data"], {"cell_id": 1000, "cell_score": 50.0})
+
+    def test_cursor_fields(self):
+        """游标分页：只返回要求的字段，排序字段不在fields里也能生成游标"""
+        data = self.get_json("network-scene/", cursor="", fields="cell_id", page_size=5)
+        self.assertEqual([set(row) for row in data["list"]], [{"cell_id"}] * 5)
+        self.assertIsNotNone(data["next_cursor"])
+
+    def test_unknown_field(self):
+        """不存在的字段返回400"""
+        self.get_json("network-scene/", 400, fields="cell_id,no_such_field")
+        self.get_json(f"userscore/{self.user_id}/", 400, fields="no_such_field")
+
+    def test_complaint_list_skips_text_fields(self):
+        """投诉工单列表默认不返回大文本字段，显式要求时才返回"""
+        ComplaintWorkOrder.objects.create(work_order_no="WO1", complaint_content="信号差")
+        row = self.get_json("complaint/")["list"][0]
+        self.assertNotIn("complaint_content", row)
+        self.assertIn("work_order_no", row)
+        row = self.get_json("complaint/", fields="work_order_no,complaint_content")["list"][0]
+        self.assertEqual(row, {"work_order_no": "WO1", "complaint_content": "信号差"})
+
+
+class ExportTestCase(SceneDataTestCase):
+    """流式导出：CSV / NDJSON，筛选条件和返回字段同列表接口，选择字段的友好名称和接口一致"""
+
+    def export(self, path: str, **params):
+        response = self.client.get(API_PREFIX + path, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode("utf-8")
+
+    def test_csv(self):
+        """CSV：带BOM的表头 + 筛选后的行，选择字段后面跟 *_display 列"""
+        response, content = self.export("network-scene/export/", city=11201, fields="cell_id,city_display")
+        self.assertEqual(response["Content-Disposition"].split("filename=")[1].strip('"').split(".")[-1], "csv")
+        self.assertTrue(content.startswith("\ufeff"))
+        rows = list(csv.reader(io.StringIO(content.lstrip("\ufeff"))))
+        self.assertEqual(rows[0], ["city", "city_display", "cell_id"])
+        self.assertEqual(len(rows) - 1, ROW_COUNT // 2)
+        self.assertTrue(all(row[:2] == ["11201", "南昌"] for row in rows[1:]))
+
+    def test_ndjson(self):
+        """NDJSON：每行一个JSON对象，行数等于筛选结果"""
+        _, content = self.export("userscore/export/", export_format="ndjson", fields="cell_id,phone_number")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), ROW_COUNT)
+        self.assertEqual(set(rows[0]), {"cell_id", "phone_number"})
+
+    def test_choice_labels_match_api(self):
+        """未知的选择编码导出成编码本身（同接口的str(code)），空值导出为null"""
+        unknown = NetworkSceneData.objects.get(pk=self.scene_id)
+        unknown.city = 99
+        unknown.save()
+        NetworkSceneData.objects.filter(cell_id=1001).update(city=None)
+        _, content = self.export("network-scene/export/", export_format="ndjson", fields="cell_id,city_display")
+        exported = {row["cell_id"]: row["city_display"] for row in map(json.loads, content.splitlines())}
+        listed = {row["cell_id"]: row["city_display"]
+                  for row in self.get_json("network-scene/", fields="cell_id,city_display", page_size=ROW_COUNT)["list"]}
+        self.assertEqual(exported[1000], "99")
+        self.assertIsNone(exported[1001])
+        self.assertEqual(exported, listed)
+
+    def test_invalid_format(self):
+        """不支持的导出格式返回400"""
+        self.assertEqual(self.client.get(API_PREFIX + "userscore/export/", {"export_format": "xlsx"}).status_code, 400)
+
+
+class BulkIngestTestCase(SceneDataTestCase):
+    """批量新增：POST JSON数组或NDJSON，合法行分批写入，非法行按行号返回错误"""
+
+    @staticmethod
+    def user_rows(count: int, start: int = 0) -> list:
+        return [{"city": 11201, "cell_id": 2000 + i, "net_type": 1, "cell_score": 60,
+                 "phone_number": "1390000%04d" % i} for i in range(start, start + count)]
+
+    def test_json_array(self):
+        """JSON数组：全部写入，返回新增条数"""
+        response = self.client.post(API_PREFIX + "userscore/", self.user_rows(5), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()["created"], response.json()["failed"]), (5, 0))
+        self.assertEqual(UserScore.objects.filter(cell_id__gte=2000).count(), 5)
+
+    def test_ndjson(self):
+        """NDJSON：每行一个对象，结果和JSON数组一样"""
+        body = "\n".join(json.dumps(row) for row in self.user_rows(3)) + "\n"
+        response = self.client.post(API_PREFIX + "userscore/", body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created"], 3)
+
+    def test_invalid_rows_reported_by_index(self):
+        """非法行不写入，错误里带原始行号；其他行照常写入"""
+        rows = self.user_rows(4)
+        rows[2]["phone_number"] = "123"
+        response = self.client.post(API_PREFIX + "userscore/", rows, content_type="application/json")
+        data = response.json()
+        self.assertEqual((data["created"], data["failed"]), (3, 1))
+        self.assertEqual(data["errors"][0]["index"], 2)
+        self.assertIn("phone_number", data["errors"][0]["errors"])
+        self.assertFalse(UserScore.objects.filter(cell_id=2002).exists())
+
+    def test_batches(self):
+        """超过一批的行数：按批写入，总数正确"""
+        with mock.patch("feellist.views.BULK_BATCH_SIZE", 4):
+            response = self.client.post(API_PREFIX + "userscore/", self.user_rows(10), content_type="application/json")
+        self.assertEqual(response.json()["created"], 10)
+
+    def test_malformed_ndjson(self):
+        """NDJSON里有非法行时整个请求返回400"""
+        response = self.client.post(API_PREFIX + "userscore/", '{"city": 11201}\nnot json\n',
+                                    content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportSceneDataTestCase(TestCase):
+    """import_scene_data 命令：中文/字段名表头、选择字段写名称、按(date, cell_id)upsert、坏行报错不中断"""
+    CSV = (
+        "date,cellID,city,scene_level1,小区评分,不认识的列\n"
+        "2025-02-01 00:00:00,3001,南昌,1,80,x\n"
+        "2025-02-01 00:00:00,3002,11204,2,not-a-number,x\n"
+        "2025-02-01 08:00:00,3003,九江,2,70,x\n"
+    )
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w", encoding="utf-8") as f:
+            f.write(self.CSV)
+        self.addCleanup(os.remove, self.path)
+
+    def run_import(self, *args) -> str:
+        out = io.StringIO()
+        call_command("import_scene_data", self.path, "--workers", "1", *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_and_rerun(self):
+        """合法行写入、坏行按行号报错；重跑同一个文件更新已有行，不产生重复"""
+        output = self.run_import()
+        self.assertIn("第3行", output)
+        self.assertIn("不认识的列", output)
+        rows = dict(NetworkSceneData.objects.values_list("cell_id", "city"))
+        self.assertEqual(rows, {3001: 11201, 3003: 11204})
+        self.run_import()
+        self.assertEqual(NetworkSceneData.objects.count(), 2)
+        # 日期按天截断：08:00的行落在当天0点
+        self.assertEqual({value.hour for value in NetworkSceneData.objects.values_list("date", flat=True)}, {0})
+
+    def test_rollup_refreshed_after_import(self):
+        """导入结束后统一刷新汇总表"""
+        self.run_import()
+        self.assertEqual(
+            sorted(NetworkSceneDailyRollup.objects.values_list("city", "scene_level1", "cell_count")),
+            [(11201, 1, 1), (11204, 2, 1)]
+        )
+
+    def test_dry_run(self):
+        """dry-run只校验不写库"""
+        output = self.run_import("--dry-run")
+        self.assertIn("dry-run", output)
+        self.assertFalse(NetworkSceneData.objects.exists())
+
+
+class SceneUpsertTestCase(SceneDataTestCase):
+    """小区数据按自然键(date, cell_id)upsert：重复推送更新已有行；PUT改到别的行的自然键上返回400"""
+
+    def post(self, body):
+        return self.client.post(API_PREFIX + "network-scene/", body, content_type="application/json")
+
+    def test_bulk_post_updates_existing(self):
+        """批量POST已存在的(date, cell_id)：更新，不新增"""
+        response = self.post([{"date": "2025-01-01T00:00:00", "cell_id": 1000, "city": 11201, "cell_score": 99}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(NetworkSceneData.objects.count(), ROW_COUNT)
+        self.assertEqual(NetworkSceneData.objects.get(pk=self.scene_id).cell_score, 99)
+
+    def test_same_day_and_in_batch_duplicates(self):
+        """同一天不同时间点算同一条；同一批里重复的键只保留最后一条"""
+        response = self.post([
+            {"date": "2025-03-01T08:00:00", "cell_id": 4000, "city": 11201, "cell_score": 10},
+            {"date": "2025-03-01T20:00:00", "cell_id": 4000, "city": 11201, "cell_score": 20},
+        ])
+        self.assertEqual(response.status_code, 201)
+        rows = list(NetworkSceneData.objects.filter(cell_id=4000).values_list("date", "cell_score"))
+        self.assertEqual(rows, [(timezone.make_aware(datetime(2025, 3, 1)), 20.0)])
+
+    def test_single_post_upserts(self):
+        """单条POST带齐自然键时同样upsert"""
+        for score in (30, 40):
+            self.assertEqual(self.post({"date": "2025-03-02T09:00:00", "cell_id": 4001, "cell_score": score}).status_code,
+                             201)
+        self.assertEqual(list(NetworkSceneData.objects.filter(cell_id=4001).values_list("cell_score", flat=True)), [40])
+
+    def test_put_onto_other_natural_key(self):
+        """PUT把一行改成另一行的(date, cell_id)：序列化器唯一校验返回400，数据不变"""
+        other = NetworkSceneData.objects.get(cell_id=1001)
+        payload = {"date": "2025-01-01T00:00:00", "cell_id": 1000, "city": other.city}
+        response = self.client.put(f"{API_PREFIX}network-scene/{other.pk}/", payload, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("non_field_errors", response.json())
+        self.assertEqual(NetworkSceneData.objects.get(pk=other.pk).cell_id, 1001)
+
+    def test_update_conflict_without_serializer(self):
+        """绕过序列化器（比如校验后被并发写入抢先）撞唯一约束：仓储层返回参数错误而不是500"""
+        other = NetworkSceneData.objects.get(cell_id=1001)
+        with self.assertRaises(ParamError):
+            NetworkSceneDataRepository().update(
+                other.pk, {"date": timezone.make_aware(datetime(2025, 1, 1)), "cell_id": 1000}
+            )
+        self.assertEqual(NetworkSceneData.objects.get(pk=other.pk).cell_id, 1001)
+
+
+class SceneStatsTestCase(SceneDataTestCase):
+    """投诉率、场景分布：在数据库里聚合，结果和逐行统计一致"""
+
+    def expected(self, rows) -> dict:
+        rows = list(rows)
+        complaint = sum(1 for row in rows if row.has_complaint == 1)
+        return {
+            "total_cells": len(rows),
+            "complaint_cells": complaint,
+            "complaint_rate": round(complaint / len(rows) * 100, 2) if rows else 0.0,
+            "scene_distribution": dict(sorted(Counter(row.scene_level1 for row in rows).items())),
+        }
+
+    def actual(self, **params) -> dict:
+        data = self.get_json("network-scene/stats/", **params)["data"]
+        data["scene_distribution"] = {row["scene_level1"]: row["count"] for row in data["scene_distribution"]}
+        return data
+
+    def test_overall(self):
+        """不带筛选：全部数据"""
+        self.assertEqual(self.actual(), self.expected(NetworkSceneData.objects.all()))
+
+    def test_filtered(self):
+        """按地市、日期范围筛选"""
+        day = timezone.make_aware(datetime(2025, 1, 2))
+        expected = self.expected(NetworkSceneData.objects.filter(city=11204, date=day))
+        self.assertEqual(self.actual(city=11204, date_start="2025-01-02", date_end="2025-01-02"), expected)
+        self.assertEqual(expected["complaint_rate"], 100.0)
+
+    def test_empty(self):
+        """没有数据时投诉率为0，不会除零"""
+        self.assertEqual(self.actual(city=11201, date_start="2030-01-01")["complaint_rate"], 0.0)
+
+    def test_query_budget(self):
+        """两条聚合SQL：投诉统计 + 场景分布"""
+        assert_endpoint_query_budget(self.client, API_PREFIX + "network-scene/stats/", 2, city=11201)
+
+
+class AnalyticsTestCase(SceneDataTestCase):
+    """分组统计：白名单校验、结果和逐行计算一致、分组数上限"""
+
+    def test_group_by_matches_rows(self):
+        """按地市+场景分组的count/avg/max"""
+        data = self.get_json(
+            "network-scene/analytics/", group_by="city,scene_level1", metrics="count,avg:cell_score,max:cell_score"
+        )
+        groups = {}
+        for row in NetworkSceneData.objects.all():
+            groups.setdefault((row.city, row.scene_level1), []).append(row.cell_score)
+        self.assertEqual(data["total"], len(groups))
+        for row in data["list"]:
+            scores = groups[(row["city"], row["scene_level1"])]
+            self.assertEqual(row["count"], len(scores))
+            self.assertAlmostEqual(row["avg_cell_score"], sum(scores) / len(scores))
+            self.assertEqual(row["max_cell_score"], max(scores))
+            self.assertTrue(row["city_display"])
+
+    def test_group_by_date(self):
+        """date按天分组"""
+        data = self.get_json("network-scene/analytics/", group_by="date")
+        self.assertEqual(
+            {row["date"]: row["count"] for row in data["list"]},
+            {"2025-01-01": 10, "2025-01-02": 10, "2025-01-03": 10}
+        )
+
+    def test_overall(self):
+        """不传group_by：整体汇总一行"""
+        data = self.get_json("userscore/analytics/", metrics="count,min:cell_score", net_type=1)
+        self.assertEqual(data["list"], [{"count": ROW_COUNT, "min_cell_score": 40}])
+
+    def test_whitelist(self):
+        """维度、函数、字段不在白名单内都返回400"""
+        for params in (
+                {"group_by": "phone"},
+                {"metrics": "median:cell_score"},
+                {"metrics": "avg:cell_id"},
+                {"metrics": "avg"},
+        ):
+            with self.subTest(**params):
+                self.get_json("network-scene/analytics/", 400, **params)
+
+    def test_group_limit(self):
+        """分组数超过上限时报错，不悄悄截断"""
+        with mock.patch("feellist.repositories.base.ANALYTICS_MAX_GROUPS", 7):
+            self.get_json("network-scene/analytics/", 400, group_by="scene_level1")
+        with mock.patch("feellist.repositories.base.ANALYTICS_MAX_GROUPS", 8):
+            self.assertEqual(self.get_json("network-scene/analytics/", group_by="scene_level1")["total"], 8)
+
+    def test_query_budget(self):
+        """一条GROUP BY SQL"""
+        assert_endpoint_query_budget(
+            self.client, API_PREFIX + "network-scene/analytics/", 1, group_by="city,area", metrics="avg:cell_score"
+        )
+
+
+class UserScoreRankingTestCase(SceneDataTestCase):
+    """地市均分、评分TopN：数据库AVG / ORDER BY LIMIT / 窗口函数"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # 第二个地市：同分的两条按id倒序排名，没有评分的不参与排名
+        UserScore.objects.bulk_create([
+            UserScore(city=11204, cell_id=2000 + i, net_type=1, cell_score=score, phone_number="1390000%04d" % i)
+            for i, score in enumerate([60, 80, 80, 70, None])
+        ])
+
+    def setUp(self):
+        self.service = UserScoreService()
+
+    def test_city_avg_score(self):
+        """平均分保留2位小数；没有数据的地市返回0"""
+        scores = [40 + i for i in range(ROW_COUNT)]
+        with assert_query_budget(1):
+            avg_score = self.service.calculate_city_avg_score(11201)
+        self.assertEqual(avg_score, round(sum(scores) / len(scores), 2))
+        self.assertEqual(self.service.calculate_city_avg_score(11201, net_type=2), 0.0)
+
+    def test_top_cells_by_city(self):
+        """指定地市：按评分从高到低取前N名"""
+        data = assert_endpoint_query_budget(
+            self.client, API_PREFIX + "userscore/top-cells/", 1, city=11201, top_n=5
+        ).json()
+        self.assertEqual([row["cell_score"] for row in data["list"]], [69, 68, 67, 66, 65])
+        self.assertEqual([row["rank"] for row in data["list"]], [1, 2, 3, 4, 5])
+
+    def test_top_cells_per_city(self):
+        """不传地市：每个地市各自的前N名，rank是地市内名次"""
+        data = assert_endpoint_query_budget(self.client, API_PREFIX + "userscore/top-cells/", 1, top_n=3).json()
+        rows = [(row["city"], row["rank"], row["cell_score"]) for row in data["list"]]
+        self.assertEqual(rows, [
+            (11201, 1, 69), (11201, 2, 68), (11201, 3, 67),
+            (11204, 1, 80), (11204, 2, 80), (11204, 3, 70),
+        ])
+        tied = [row["id"] for row in data["list"] if row["city"] == 11204 and row["cell_score"] == 80]
+        self.assertEqual(tied, sorted(tied, reverse=True))
+
+    def test_top_n_param(self):
+        """top_n超过上限按上限取，非数字返回400"""
+        self.assertEqual(self.get_json("userscore/top-cells/", city=11204, top_n=100000)["total"], 4)
+        self.get_json("userscore/top-cells/", 400, top_n="abc")
+
+
+class SceneRollupTestCase(SceneDataTestCase):
+    """日汇总表：写入后增量刷新的结果和全量重建一致；打开开关后统计结果和查原始表一致"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # 部分小区带指标值（其余为空），验证合计/计数的空值处理
+        for cell_id in range(1000, 1000 + ROW_COUNT, 3):
+            NetworkSceneData.objects.filter(cell_id=cell_id).update(
+                volte_connect_rate=cell_id % 7 / 10, total_sample_points_sum=cell_id % 11
+            )
+        NetworkSceneRollupRepository().rebuild()
+
+    @staticmethod
+    def rollup_rows() -> list:
+        """汇总表全部行（不含主键、更新时间），排序后比较"""
+        fields = [
+            field.name for field in NetworkSceneDailyRollup._meta.concrete_fields
+            if field.name not in ("id", "update_time")
+        ]
+        return sorted(NetworkSceneDailyRollup.objects.values_list(*fields), key=repr)
+
+    def assert_rollup_in_sync(self):
+        """增量刷新后的汇总表 == 全量重建的汇总表"""
+        incremental = self.rollup_rows()
+        NetworkSceneRollupRepository().rebuild()
+        self.assertEqual(incremental, self.rollup_rows())
+
+    def test_writes_refresh_rollup(self):
+        """新增、改维度、删除、批量upsert后汇总表都和原始数据一致"""
+        response = self.client.post(API_PREFIX + "network-scene/", {
+            "date": "2025-01-05T00:00:00", "cell_id": 5000, "city": 11201, "scene_level1": 3, "area": 1,
+            "cell_score": 77, "total_sample_points_sum": 9,
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assert_rollup_in_sync()
+
+        # 改一级场景：旧汇总键少一行，新汇总键多一行
+        row = NetworkSceneData.objects.get(cell_id=1006)
+        response = self.client.put(f"{API_PREFIX}network-scene/{row.pk}/", {
+            "date": "2025-01-01T00:00:00", "cell_id": 1006, "city": row.city, "scene_level1": 7, "area": row.area,
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        self.assert_rollup_in_sync()
+
+        # 删除汇总键里唯一的一行：汇总行也要删掉
+        count = NetworkSceneDailyRollup.objects.count()
+        row = NetworkSceneData.objects.get(cell_id=1010)
+        self.assertEqual(self.client.delete(f"{API_PREFIX}network-scene/{row.pk}/").status_code, 204)
+        self.assertEqual(NetworkSceneDailyRollup.objects.count(), count - 1)
+        self.assert_rollup_in_sync()
+
+        response = self.client.post(API_PREFIX + "network-scene/", [
+            {"date": "2025-01-02T00:00:00", "cell_id": 1001, "city": 11204, "scene_level1": 1, "area": 1,
+             "cell_score": 10, "has_complaint": 0},
+            {"date": "2025-01-06T00:00:00", "cell_id": 5001, "city": 11204, "scene_level1": 2, "area": 2,
+             "cell_score": 20, "has_complaint": 1},
+        ], content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assert_rollup_in_sync()
+
+    def test_failed_refresh_rolls_back_write(self):
+        """刷新汇总表失败时原始数据的写入一起回滚"""
+        with mock.patch.object(NetworkSceneRollupRepository, "refresh", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                NetworkSceneDataRepository().create({"date": timezone.make_aware(datetime(2025, 1, 5)),
+                                                     "cell_id": 5002, "city": 11201})
+        self.assertFalse(NetworkSceneData.objects.filter(cell_id=5002).exists())
+
+    def test_reads_match_raw(self):
+        """打开汇总表开关：分组统计、投诉统计读汇总表，结果和查原始表一致"""
+        requests = [
+            ("network-scene/analytics/", {
+                "group_by": "date,city,scene_level1",
+                "metrics": "count,avg:cell_score,min:cell_score,max:cell_score,sum:total_sample_points_sum,"
+                           "avg:volte_connect_rate,count:volte_connect_rate",
+            }),
+            ("network-scene/analytics/", {"group_by": "area", "city": 11204, "date_start": "2025-01-02"}),
+            ("network-scene/stats/", {}),
+            ("network-scene/stats/", {"city": 11201, "date_end": "2025-01-02"}),
+        ]
+        for path, params in requests:
+            with self.subTest(path=path, **params):
+                raw = self.get_json(path, **params)
+                with override_settings(FEELLIST_SCENE_ROLLUP_ENABLED=True), \
+                        CaptureQueriesContext(connection) as queries:
+                    rolled = self.get_json(path, **params)
+                self.assertTrue(all(NetworkSceneDailyRollup._meta.db_table in query["sql"] for query in queries))
+                self.assertEqual(json.loads(json.dumps(rolled), parse_float=lambda v: round(float(v), 6)),
+                                 json.loads(json.dumps(raw), parse_float=lambda v: round(float(v), 6)))
+
+    @override_settings(FEELLIST_SCENE_ROLLUP_ENABLED=True)
+    def test_fallback_to_raw(self):
+        """维度或筛选条件不在汇总键上：查原始表"""
+        with CaptureQueriesContext(connection) as queries:
+            self.get_json("network-scene/analytics/", group_by="manufacturer")
+            self.get_json("network-scene/stats/", has_complaint=1)
+        self.assertTrue(all(NetworkSceneData._meta.db_table in query["sql"] for query in queries))
+        self.assertFalse(any(NetworkSceneDailyRollup._meta.db_table in query["sql"] for query in queries))
+
+
+class SceneSnapshotTestCase(SceneDataTestCase):
+    """列式快照：分布、相关性、排名和逐行计算一致；增量刷新按水位（带重叠）加载；刷新不阻塞请求"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # 1000号小区第二天再来一条：排名按小区取多天均值 (50 + 200) / 2
+        NetworkSceneData.objects.create(
+            date=timezone.make_aware(datetime(2025, 1, 3)), city=11204, cell_id=1000, cell_score=200, scene_level1=0
+        )
+        for row in NetworkSceneData.objects.all():
+            # 两个指标完全负相关；cell_score 和 volte_connect_rate 部分为空
+            NetworkSceneData.objects.filter(pk=row.pk).update(
+                cqi_good_rate=-row.cell_score, volte_connect_rate=None if row.cell_id % 3 else row.cell_score / 100
+            )
+
+    def setUp(self):
+        # 每个测试用新的进程级快照
+        patcher = mock.patch("feellist.snapshots.network_scene._snapshot", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_distribution_matches_rows(self):
+        """分组count/avg/min/max和分位数"""
+        data = self.get_json("network-scene/indicator-distribution/", field="volte_connect_rate",
+                             group_by="city", date_start="2025-01-02")
+        self.assertEqual(data["data"]["window"], {"date_start": "2024-12-28", "date_end": "2025-01-03"})
+        rows = NetworkSceneData.objects.filter(date__gte=timezone.make_aware(datetime(2025, 1, 2)))
+        for group in data["data"]["groups"]:
+            city_rows = [row for row in rows if row.city == group["city"]]
+            values = [row.volte_connect_rate for row in city_rows if row.volte_connect_rate is not None]
+            self.assertEqual(group["count"], len(city_rows))
+            self.assertEqual(group["count_volte_connect_rate"], len(values))
+            self.assertAlmostEqual(group["avg_volte_connect_rate"], sum(values) / len(values))
+            self.assertEqual((group["min_volte_connect_rate"], group["max_volte_connect_rate"]),
+                             (min(values), max(values)))
+        values = [row.volte_connect_rate for row in rows if row.volte_connect_rate is not None]
+        self.assertAlmostEqual(data["data"]["quantiles"]["p50"], float(np.quantile(values, 0.5)))
+
+    def test_correlation(self):
+        """相关系数矩阵；不是指标的字段返回400"""
+        data = self.get_json("network-scene/indicator-correlation/", fields="cell_score,cqi_good_rate")
+        matrix = data["data"]["matrix"]
+        self.assertAlmostEqual(matrix[0][0], 1.0)
+        self.assertAlmostEqual(matrix[0][1], -1.0)
+        self.get_json("network-scene/indicator-correlation/", 400, fields="cell_score,phone")
+        self.get_json("network-scene/indicator-correlation/", 400, fields="cell_score")
+
+    def test_rankings(self):
+        """按小区多天均值排名，city取最新一天；asc取最差的"""
+        data = self.get_json("network-scene/indicator-ranking/", field="cell_score", limit=2)["data"]
+        self.assertEqual(
+            [(row["cell_id"], row["city"], row["days"], row["avg_cell_score"]) for row in data["list"]],
+            [(1000, 11204, 2, 125.0), (1029, 11204, 1, 79.0)]
+        )
+        self.assertEqual(data["list"][0]["city_display"], "九江")
+        data = self.get_json("network-scene/indicator-ranking/", field="cell_score", limit=2, order="asc")["data"]
+        self.assertEqual([row["cell_id"] for row in data["list"]], [1001, 1002])
+        self.get_json("network-scene/indicator-ranking/", 400, field="cell_score", order="up")
+        self.get_json("network-scene/indicator-ranking/", 400)
+
+    def test_incremental_refresh_overlaps_watermark(self):
+        """增量刷新：更新的行按ID覆盖；update_time 早于水位但在重叠时长内的行也能读到"""
+        snapshot = SceneColumnarSnapshot(days=7)
+        snapshot.refresh(full=True)
+        size = snapshot.size
+
+        row = NetworkSceneData.objects.get(cell_id=1005)
+        row.cell_score = 99
+        row.save()
+        # 晚提交的事务：update_time 比上次水位早
+        late = NetworkSceneData.objects.create(date=timezone.make_aware(datetime(2025, 1, 3)), city=11201, cell_id=6000)
+        NetworkSceneData.objects.filter(pk=late.pk).update(update_time=snapshot.watermark - timedelta(minutes=1))
+        too_late = NetworkSceneData.objects.create(date=timezone.make_aware(datetime(2025, 1, 3)), city=11201,
+                                                   cell_id=6001)
+        NetworkSceneData.objects.filter(pk=too_late.pk).update(
+            update_time=snapshot.watermark - WATERMARK_OVERLAP - timedelta(minutes=1)
+        )
+
+        snapshot.refresh()
+        columns = snapshot.columns
+        self.assertEqual(snapshot.size, size + 1)
+        self.assertEqual(columns["cell_score"][columns["cell_id"] == 1005].tolist(), [99.0])
+        self.assertIn(6000, columns["cell_id"])
+        self.assertNotIn(6001, columns["cell_id"])
+        # 超过重叠时长的由定时全量重载兜底
+        snapshot.refresh(full=True)
+        self.assertIn(6001, snapshot.columns["cell_id"])
+
+    def test_refresh_in_background(self):
+        """首次加载同步完成；之后到刷新间隔时启动后台刷新，本次请求直接返回当前快照"""
+        with override_settings(FEELLIST_SNAPSHOT_REFRESH_SECONDS=0, FEELLIST_SNAPSHOT_FULL_RELOAD_SECONDS=3600), \
+                mock.patch.object(SceneColumnarSnapshot, "refresh_in_background") as background:
+            snapshot = get_scene_snapshot()
+            self.assertEqual(snapshot.size, ROW_COUNT + 1)
+            background.assert_not_called()
+            self.assertIs(get_scene_snapshot(), snapshot)
+            background.assert_called_once_with(full=False)
+        with override_settings(FEELLIST_SNAPSHOT_REFRESH_SECONDS=0, FEELLIST_SNAPSHOT_FULL_RELOAD_SECONDS=0), \
+                mock.patch.object(SceneColumnarSnapshot, "refresh_in_background") as background:
+            get_scene_snapshot()
+            background.assert_called_once_with(full=True)
+        # 已经在刷新（锁被占用）时不重复启动线程
+        with snapshot._lock:
+            self.assertFalse(snapshot.refresh_in_background())
+
+
+class RescoreTestCase(SceneDataTestCase):
+    """小区评分引擎：批量打分和逐个指标计算一致；重算只写回有变化的行，汇总表同步"""
+
+    PROFILE = {
+        "cqi_good_rate": {"weight": 3, "good": 0.95, "bad": 0.8},
+        # good < bad：越小越好
+        "overlap_coverage_ratio": {"weight": 1, "good": 0.05, "bad": 0.2},
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # 1000~1019号小区有指标（部分只有一个指标），1020以后没有指标，保留原评分
+        for i in range(20):
+            NetworkSceneData.objects.filter(cell_id=1000 + i).update(
+                cqi_good_rate=0.75 + i * 0.01, overlap_coverage_ratio=None if i % 4 == 0 else 0.02 + i * 0.01
+            )
+        NetworkSceneRollupRepository().rebuild()
+
+    def expected_score(self, row: NetworkSceneData):
+        """逐个指标计算评分（引擎的参照实现）"""
+        total = weights = 0
+        for field, rule in self.PROFILE.items():
+            value = getattr(row, field)
+            if value is None:
+                continue
+            ratio = min(max((value - rule["bad"]) / (rule["good"] - rule["bad"]), 0.0), 1.0)
+            total += rule["weight"] * ratio
+            weights += rule["weight"]
+        return round(total / weights * 100, 2) if weights else None
+
+    def test_score_matches_reference(self):
+        """批量打分 == 逐行计算；所有指标为空时是NaN"""
+        rows = list(NetworkSceneData.objects.order_by("id"))
+        scores = ScoringProfile(self.PROFILE).score({
+            field: np.array([getattr(row, field) for row in rows], dtype=np.float64) for field in self.PROFILE
+        })
+        for row, score in zip(rows, scores):
+            expected = self.expected_score(row)
+            if expected is None:
+                self.assertTrue(np.isnan(score))
+            else:
+                self.assertAlmostEqual(float(score), expected)
+
+    def test_invalid_profile(self):
+        """未知指标、权重不大于0、good等于bad、缺少配置项都是参数错误"""
+        for profile in (
+                {},
+                {"phone_number": {"weight": 1, "good": 1, "bad": 0}},
+                {"cqi_good_rate": {"weight": 0, "good": 1, "bad": 0}},
+                {"cqi_good_rate": {"weight": 1, "good": 1, "bad": 1}},
+                {"cqi_good_rate": {"weight": 1, "good": 1}},
+        ):
+            with self.subTest(profile=profile), self.assertRaises(ParamError):
+                ScoringProfile(profile)
+
+    def test_rescore_writes_changed_rows(self):
+        """重算写回有变化的行，再跑一次不写；没有指标的行保留原评分；汇总表同步"""
+        before = dict(NetworkSceneData.objects.values_list("cell_id", "cell_score"))
+        report = NetworkSceneDataService().rescore_cells(ScoringProfile(self.PROFILE))
+        self.assertEqual((report["days"], report["cells"], report["updated"]), (3, ROW_COUNT, 20))
+        self.assertEqual(report["shift"]["changed"], 20)
+        for row in NetworkSceneData.objects.all():
+            expected = self.expected_score(row)
+            self.assertAlmostEqual(row.cell_score, before[row.cell_id] if expected is None else expected)
+
+        self.assertEqual(NetworkSceneDataService().rescore_cells(ScoringProfile(self.PROFILE))["updated"], 0)
+        rollup = sorted(NetworkSceneDailyRollup.objects.values_list("date", "city", "scene_level1", "area",
+                                                                    "score_sum", "score_min", "score_max"))
+        NetworkSceneRollupRepository().rebuild()
+        self.assertEqual(rollup, sorted(NetworkSceneDailyRollup.objects.values_list(
+            "date", "city", "scene_level1", "area", "score_sum", "score_min", "score_max")))
+
+    def test_dry_run_and_filters(self):
+        """dry-run只报告不写库；按地市、日期筛选"""
+        report = NetworkSceneDataService().rescore_cells(
+            ScoringProfile(self.PROFILE), {"city": 11201, "date_start": "2025-01-02"}, dry_run=True
+        )
+        rows = NetworkSceneData.objects.filter(city=11201, date__gte=timezone.make_aware(datetime(2025, 1, 2)))
+        self.assertEqual((report["days"], report["cells"], report["updated"]), (2, rows.count(), 0))
+        self.assertEqual(report["shift"]["changed"], sum(1 for row in rows if self.expected_score(row) is not None))
+        self.assertEqual(NetworkSceneData.objects.filter(cell_score__gt=80).count(), 0)
+
+    def test_command(self):
+        """命令行：读JSON评分配置；配置错误时报CommandError"""
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+            json.dump(self.PROFILE, f)
+        self.addCleanup(os.remove, f.name)
+        output = io.StringIO()
+        call_command("rescore_cells", "--profile", f.name, "--city", "11204", stdout=output)
+        self.assertIn("写回 10 行", output.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("rescore_cells", "--profile", f.name + ".missing", stdout=io.StringIO())
+
+
+class CellUserAvgScoreTestCase(SceneDataTestCase):
+    """小区用户均分：全量重算；UserScore增删改登记小区，增量只重算登记过的小区"""
+
+    def setUp(self):
+        self.service = UserScoreService()
+
+    def expected(self) -> dict:
+        """每个小区的用户均分（逐行计算）"""
+        scores = {}
+        for cell_id, score in UserScore.objects.filter(cell_score__isnull=False).values_list("cell_id", "cell_score"):
+            scores.setdefault(cell_id, []).append(score)
+        return {cell_id: sum(values) / len(values) for cell_id, values in scores.items()}
+
+    def actual(self) -> dict:
+        return dict(NetworkSceneData.objects.filter(cell_user_avg_score__isnull=False)
+                    .values_list("cell_id", "cell_user_avg_score"))
+
+    def test_full(self):
+        """全量：有用户评分的小区写均分，没有的清空；登记全部清掉"""
+        NetworkSceneData.objects.filter(cell_id=1020).update(cell_user_avg_score=1)
+        CellUserScoreDirty.objects.create(cell_id=1001, mark_time=timezone.now())
+        result = self.service.recompute_cell_user_avg_scores(full=True, chunk_size=3)
+        self.assertEqual(result["cells"], 10)
+        self.assertEqual(self.actual(), self.expected())
+        self.assertEqual(self.actual()[1000], 50.0)
+        self.assertFalse(CellUserScoreDirty.objects.exists())
+
+    def test_incremental_after_writes(self):
+        """新增、改小区、删除都登记受影响的小区；增量只算这些小区"""
+        self.service.recompute_cell_user_avg_scores(full=True)
+        # 没登记的小区即使均分不对，增量也不会去算
+        NetworkSceneData.objects.filter(cell_id=1009).update(cell_user_avg_score=0)
+
+        response = self.client.post(API_PREFIX + "userscore/", {
+            "city": 11201, "cell_id": 1000, "net_type": 1, "cell_score": 80, "phone_number": "13900000001"
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 201, response.content[:500])
+        moved = UserScore.objects.filter(cell_id=1001).first()
+        response = self.client.put(f"{API_PREFIX}userscore/{moved.pk}/", {
+            "city": 11201, "cell_id": 1011, "net_type": 1, "cell_score": moved.cell_score,
+            "phone_number": moved.phone_number,
+        }, content_type="application/json")
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        for pk in UserScore.objects.filter(cell_id=1002).values_list("pk", flat=True):
+            self.assertEqual(self.client.delete(f"{API_PREFIX}userscore/{pk}/").status_code, 204)
+        self.assertEqual(set(CellUserScoreDirty.objects.values_list("cell_id", flat=True)), {1000, 1001, 1002, 1011})
+
+        result = self.service.recompute_cell_user_avg_scores(chunk_size=2)
+        self.assertEqual(result["cells"], 4)
+        expected = self.expected()
+        actual = self.actual()
+        self.assertEqual(actual.pop(1009), 0)
+        expected.pop(1009)
+        self.assertEqual(actual, expected)
+        self.assertAlmostEqual(actual[1000], (40 + 50 + 60 + 80) / 4)
+        self.assertNotIn(1002, actual)
+        self.assertFalse(CellUserScoreDirty.objects.exists())
+
+    def test_marks_after_start_are_kept(self):
+        """重算开始之后才登记的小区留给下一轮"""
+        CellUserScoreDirty.objects.create(cell_id=1003, mark_time=timezone.now() + timedelta(hours=1))
+        self.assertEqual(self.service.recompute_cell_user_avg_scores()["cells"], 0)
+        self.assertTrue(CellUserScoreDirty.objects.filter(cell_id=1003).exists())
+
+    def test_command(self):
+        """命令行：全量/增量"""
+        output = io.StringIO()
+        call_command("recompute_cell_user_avg", "--full", stdout=output)
+        self.assertIn("全量重算完成：10 个小区", output.getvalue())
+        self.assertEqual(self.actual(), self.expected())
+
+
+class NearbyCellsTestCase(SceneDataTestCase):
+    """附近小区：网格索引的结果和逐个计算球面距离一致；有写入时按节流间隔重建"""
+
+    def setUp(self):
+        patcher = mock.patch("feellist.snapshots.cell_locations._index", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def brute_force(lat: float, lon: float, k: int, radius_m: float) -> list:
+        """最新一天的小区逐个算距离（math实现的haversine），取半径内最近的k个"""
+        latest = timezone.make_aware(datetime(2025, 1, 3))
+        rows = []
+        for row in NetworkSceneData.objects.filter(date=latest):
+            phi1, phi2 = math.radians(lat), math.radians(row.latitude)
+            a = (math.sin((phi2 - phi1) / 2) ** 2
+                 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(row.longitude - lon) / 2) ** 2)
+            distance = 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+            if distance <= radius_m:
+                rows.append((round(distance, 1), row.cell_id))
+        return sorted(rows)[:k]
+
+    def test_matches_brute_force(self):
+        """不同半径、k下结果和逐个计算一致（跨多个网格）"""
+        for lat, lon, k, radius_m in ((28.1, 115.1, 3, 50000), (28.2, 115.2, 10, 5000), (28.14, 115.13, 5, 2000),
+                                      (30.0, 118.0, 5, 1000)):
+            with self.subTest(lat=lat, lon=lon, k=k, radius_m=radius_m):
+                data = self.get_json("network-scene/nearby/", lat=lat, lon=lon, k=k, radius_m=radius_m)
+                self.assertEqual(data["date"], "2025-01-03")
+                self.assertEqual([(row["distance_m"], row["cell_id"]) for row in data["list"]],
+                                 self.brute_force(lat, lon, k, radius_m))
+        self.assertEqual(data["list"], [])
+
+    def test_params(self):
+        """缺少经纬度、超出范围返回400"""
+        for params in ({"lat": 28}, {"lat": 91, "lon": 115}, {"lat": 28, "lon": 115, "radius_m": 10 ** 6},
+                       {"lat": "abc", "lon": 115}):
+            with self.subTest(**params):
+                self.get_json("network-scene/nearby/", 400, **params)
+
+    def test_rebuild_throttled(self):
+        """有写入时：距上次重建不到刷新间隔继续用旧索引，超过间隔才重建"""
+        index = get_cell_location_index()
+        NetworkSceneDataRepository().create({
+            "date": timezone.make_aware(datetime(2025, 1, 3)), "cell_id": 7000, "city": 11201,
+            "latitude": 28.5, "longitude": 115.5,
+        })
+        with override_settings(FEELLIST_SNAPSHOT_REFRESH_SECONDS=3600):
+            self.assertIs(get_cell_location_index(), index)
+        with override_settings(FEELLIST_SNAPSHOT_REFRESH_SECONDS=0):
+            rebuilt = get_cell_location_index()
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual(rebuilt.nearest(28.5, 115.5, 1, 100)[0]["cell_id"], 7000)
+        # 没有新写入：不重建
+        with override_settings(FEELLIST_SNAPSHOT_REFRESH_SECONDS=0), assert_query_budget(1):
+            self.assertIs(get_cell_location_index(), rebuilt)
+
+
+class HeatmapTestCase(SceneDataTestCase):
+    """地图网格聚合：网格统计和逐行分桶一致；按瓦片缓存，有写入时失效"""
+
+    BBOX = "114.9,27.9,115.4,28.4"
+
+    def setUp(self):
+        cache.clear()
+
+    @staticmethod
+    def expected(rows, zoom: int, bbox=(114.9, 27.9, 115.4, 28.4)) -> list:
+        """逐行算网格编号并统计，只保留和bbox相交的网格"""
+        bin_degrees = 360 / 2 ** zoom / HEATMAP_BINS_PER_TILE
+        lat_range = (math.floor((bbox[1] + 90) / bin_degrees), math.floor((bbox[3] + 90) / bin_degrees))
+        lon_range = (math.floor((bbox[0] + 180) / bin_degrees), math.floor((bbox[2] + 180) / bin_degrees))
+        bins = {}
+        for row in rows:
+            key = (math.floor((row.latitude + 90) / bin_degrees), math.floor((row.longitude + 180) / bin_degrees))
+            if lat_range[0] <= key[0] <= lat_range[1] and lon_range[0] <= key[1] <= lon_range[1]:
+                bins.setdefault(key, []).append(row)
+        return sorted(
+            (round((lat_bin + 0.5) * bin_degrees - 90, 6), round((lon_bin + 0.5) * bin_degrees - 180, 6),
+             len(cells), round(sum(cell.cell_score for cell in cells) / len(cells), 2),
+             sum(cell.has_complaint for cell in cells))
+            for (lat_bin, lon_bin), cells in bins.items()
+        )
+
+    @staticmethod
+    def actual(data: dict) -> list:
+        return sorted((row["lat"], row["lon"], row["count"], row["avg_score"], row["complaint_count"])
+                      for row in data["list"])
+
+    def test_latest_day_bins(self):
+        """不传日期只统计最新一天；不同缩放级别"""
+        latest = NetworkSceneData.objects.filter(date=timezone.make_aware(datetime(2025, 1, 3)))
+        for zoom in (6, 10, 12):
+            with self.subTest(zoom=zoom):
+                data = self.get_json("network-scene/heatmap/", bbox=self.BBOX, zoom=zoom)
+                self.assertEqual(data["date"], "2025-01-03")
+                self.assertEqual(self.actual(data), self.expected(latest, zoom))
+        self.assertEqual(sum(row["count"] for row in data["list"]), latest.count())
+
+    def test_filters_and_bbox(self):
+        """按日期范围、地市筛选；只返回bbox内的网格"""
+        bbox = (115.0, 28.0, 115.1, 28.1)
+        data = self.get_json("network-scene/heatmap/", bbox=",".join(map(str, bbox)), zoom=12,
+                             date_start="2025-01-01", date_end="2025-01-02", city=11204)
+        rows = NetworkSceneData.objects.filter(city=11204, date__lt=timezone.make_aware(datetime(2025, 1, 3)))
+        self.assertIsNone(data["date"])
+        self.assertTrue(data["list"])
+        self.assertEqual(self.actual(data), self.expected(rows, 12, bbox))
+
+    def test_cache_invalidated_on_write(self):
+        """第二次请求只查版本号和最新日期；写入后版本号变化，重新聚合"""
+        first = self.get_json("network-scene/heatmap/", bbox=self.BBOX, zoom=10)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_json("network-scene/heatmap/", bbox=self.BBOX, zoom=10), first)
+        self.assertFalse(any("GROUP BY" in query["sql"] for query in queries))
+
+        NetworkSceneDataRepository().create({
+            "date": timezone.make_aware(datetime(2025, 1, 3)), "cell_id": 7000, "city": 11201,
+            "cell_score": 10, "latitude": 28.3, "longitude": 115.3,
+        })
+        data = self.get_json("network-scene/heatmap/", bbox=self.BBOX, zoom=10)
+        self.assertEqual(sum(row["count"] for row in data["list"]), sum(row["count"] for row in first["list"]) + 1)
+
+    def test_params(self):
+        """bbox格式、缩放级别、范围过大返回400"""
+        for params in ({"bbox": "115,28,116", "zoom": 10}, {"bbox": "116,28,115,29", "zoom": 10},
+                       {"bbox": self.BBOX, "zoom": 19}, {"bbox": self.BBOX}, {"bbox": "100,20,120,40", "zoom": 12}):
+            with self.subTest(**params):
+                self.get_json("network-scene/heatmap/", 400, **params)
+
+
+class ComplaintDataTestCase(TestCase):
+    """投诉工单测试数据：两个地市、三天的工单"""
+    ORDERS = [
+        ("WO001", "13800000001", 11201, "东湖区", "处理中", "2025-01-01T08:00:00", "室内信号差，打电话断断续续",
+         "红谷滩万达广场"),
+        ("WO002", "13800000002", 11201, "西湖区", "已归档", "2025-01-01T20:00:00", "5G网速慢，视频卡顿", "八一广场"),
+        ("WO003", "13800000001", 11204, "浔阳区", "处理中", "2025-01-02T09:30:00", "地下车库无信号", "九江火车站"),
+        ("WO004", "13800000004", 11204, "濂溪区", "已归档", "2025-01-03T10:00:00", "网速慢，信号差", "学校宿舍"),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        ComplaintWorkOrder.objects.bulk_create([
+            ComplaintWorkOrder(
+                work_order_no=no, report_phone=phone, city=city, area=area, work_order_status=status,
+                system_receive_time=timezone.make_aware(datetime.fromisoformat(received)),
+                complaint_content=content, complaint_address=address
+            )
+            for no, phone, city, area, status, received, content, address in cls.ORDERS
+        ])
+
+    def get_json(self, path: str, status_code: int = 200, **params) -> dict:
+        """GET接口并断言状态码，返回JSON"""
+        response = self.client.get(API_PREFIX + path, params)
+        self.assertEqual(response.status_code, status_code, response.content[:500])
+        return response.json()
+
+
+@override_settings(CACHES=TEST_CACHES, FEELLIST_RESPONSE_CACHE_TTL=0, FEELLIST_RESPONSE_CACHE_TTLS={})
+class ComplaintIngestTestCase(ComplaintDataTestCase):
+    """投诉工单：按工单号批量upsert、CSV导入、按索引字段筛选"""
+    CSV = (
+        "工单号,受理号码,地市,区域,工单状态,系统接单时,投诉内容\n"
+        "WO001,13800000001,南昌,东湖区,已归档,2025-01-01 08:00:00,室内信号差\n"
+        "WO101,13800000101,九江,浔阳区,处理中,2025-01-04 08:00:00,无法上网\n"
+    )
+
+    def test_bulk_post_upserts_by_work_order_no(self):
+        """批量POST：工单号已存在的更新，新工单号新增；同一批重复的工单号只保留最后一条"""
+        response = self.client.post(API_PREFIX + "complaint/", [
+            {"work_order_no": "WO002", "city": 11201, "work_order_status": "已回访"},
+            {"work_order_no": "WO100", "city": 11204, "work_order_status": "处理中"},
+            {"work_order_no": "WO100", "city": 11204, "work_order_status": "已归档"},
+        ], content_type="application/json")
+        self.assertEqual(response.status_code, 201, response.content[:500])
+        self.assertEqual(ComplaintWorkOrder.objects.count(), len(self.ORDERS) + 1)
+        self.assertEqual(
+            dict(ComplaintWorkOrder.objects.filter(work_order_no__in=["WO002", "WO100"])
+                 .values_list("work_order_no", "work_order_status")),
+            {"WO002": "已回访", "WO100": "已归档"}
+        )
+
+    def test_import_command(self):
+        """中文表头导入；重跑同一个文件按工单号更新，不产生重复"""
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w", encoding="utf-8") as f:
+            f.write(self.CSV)
+        self.addCleanup(os.remove, path)
+        for _ in range(2):
+            call_command("import_complaint_orders", path, "--workers", "1", stdout=io.StringIO())
+        self.assertEqual(ComplaintWorkOrder.objects.count(), len(self.ORDERS) + 1)
+        order = ComplaintWorkOrder.objects.get(work_order_no="WO001")
+        self.assertEqual((order.work_order_status, order.complaint_content), ("已归档", "室内信号差"))
+        self.assertEqual(ComplaintWorkOrder.objects.get(work_order_no="WO101").city, 11204)
+
+    def test_filters(self):
+        """受理号码、工单状态、地市+区域、接单日期范围筛选（两条SQL：COUNT + 一页）"""
+        for params, expected in (
+                ({"phone": "13800000001"}, {"WO001", "WO003"}),
+                ({"status": "已归档"}, {"WO002", "WO004"}),
+                ({"city": 11201, "area": "西湖区"}, {"WO002"}),
+                ({"date_start": "2025-01-01", "date_end": "2025-01-02"}, {"WO001", "WO002", "WO003"}),
+        ):
+            with self.subTest(**params):
+                response = assert_endpoint_query_budget(self.client, API_PREFIX + "complaint/", 2, **params)
+                self.assertEqual({row["work_order_no"] for row in response.json()["list"]}, expected)
+
+    def test_indexes(self):
+        """筛选用到的列在数据库里都有索引，工单号有唯一约束"""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, ComplaintWorkOrder._meta.db_table)
+        indexed = {tuple(c["columns"]) for c in constraints.values() if c["index"] or c["unique"]}
+        for columns in (("report_phone",), ("system_receive_time",), ("work_order_status",), ("city", "area")):
+            self.assertIn(columns, indexed)
+        self.assertTrue(any(c["unique"] and c["columns"] == ["work_order_no"] for c in constraints.values()))
+
+
+@override_settings(CACHES=TEST_CACHES, FEELLIST_RESPONSE_CACHE_TTL=0, FEELLIST_RESPONSE_CACHE_TTLS={})
+class ComplaintSearchTestCase(ComplaintDataTestCase):
+    """投诉搜索（非MySQL走LIKE）：每个词都必须命中，结果带摘要、不带大文本原文"""
+
+    def search(self, status_code: int = 200, **params) -> dict:
+        return self.get_json("complaint/search/", status_code, **params)
+
+    def test_terms_are_anded(self):
+        """多个关键词都要命中；任一搜索字段命中即可；按接单时间倒序"""
+        for q, expected in (("信号差", ["WO004", "WO001"]), ("网速慢 信号差", ["WO004"]),
+                            ("广场", ["WO002", "WO001"]), ('+"信号差" -', ["WO004", "WO001"]), ("不存在的词", [])):
+            with self.subTest(q=q):
+                data = self.search(q=q)
+                self.assertEqual([row["work_order_no"] for row in data["list"]], expected)
+                self.assertEqual(data["total"], len(expected))
+
+    def test_snippets(self):
+        """摘要来自命中的字段，原文不直接返回"""
+        row = self.search(q="广场 信号差")["list"][0]
+        self.assertEqual(row["snippets"], {"complaint_content": "室内信号差，打电话断断续续",
+                                           "complaint_address": "红谷滩万达广场"})
+        self.assertNotIn("complaint_content", row)
+        text = "前" * 100 + "信号差" + "后" * 100
+        snippet = build_snippet(text, ["信号差"])
+        self.assertIn("信号差", snippet)
+        self.assertTrue(snippet.startswith("…") and snippet.endswith("…"))
+        self.assertEqual(len(snippet), SEARCH_SNIPPET_LENGTH + 2)
+        self.assertIsNone(build_snippet(text, ["断网"]))
+
+    def test_filters_and_pagination(self):
+        """和列表接口的筛选条件组合；分页（两条SQL：COUNT + 一页）"""
+        self.assertEqual([row["work_order_no"] for row in self.search(q="信号差", city=11201)["list"]], ["WO001"])
+        response = assert_endpoint_query_budget(self.client, API_PREFIX + "complaint/search/", 2,
+                                                q="信号差", page=2, page_size=1)
+        self.assertEqual(([row["work_order_no"] for row in response.json()["list"]], response.json()["total"]),
+                         (["WO001"], 2))
+
+    def test_invalid_keywords(self):
+        """关键词为空、太短、太多返回400"""
+        for q in ("", "  ", "信", "信号 差", "一一 二二 三三 四四 五五 六六"):
+            with self.subTest(q=q):
+                self.search(400, q=q)
+        self.assertEqual(boolean_query(["信号差", "断网"]), '+"信号差" +"断网"')
+
+
+class FastSerializationTestCase(SceneDataTestCase):
+    """只读快速序列化：输出和序列化器渲染出的JSON逐字节一致"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # 边界值：空值、不在选择项里的编码、小数、时间
+        NetworkSceneData.objects.create(date=None, city=99999, cell_id=9000, scene_level1=None, area=42,
+                                        cell_score=66.125, cqi_good_rate=0.1 + 0.2)
+        UserScore.objects.create(city=None, cell_id=None, net_type=9, cell_score=None, phone_number="13900009999")
+        ComplaintWorkOrder.objects.create(work_order_no="WO1", city=11201, complaint_content="信号差",
+                                          system_receive_time=timezone.now(), longitude=115.123456789)
+
+    def assert_same_json(self, serializer_class, queryset, fields=None):
+        objects = list(queryset.order_by("id"))
+        rows = list(queryset.order_by("id").values())
+        self.assertEqual(
+            JSONRenderer().render(serializer_class.to_representation_rows(rows, fields)),
+            JSONRenderer().render(serializer_class(objects, many=True, fields=fields).data)
+        )
+
+    def test_serializers(self):
+        """三个序列化器：全部字段、部分字段"""
+        for serializer_class, model, fields in (
+                (NetworkSceneDataSerializer, NetworkSceneData, ["cell_id", "city_display", "scene_level1_display",
+                                                                 "date", "cqi_good_rate"]),
+                (UserScoreSerializer, UserScore, ["phone_number", "net_type_display", "city_display"]),
+                (ComplaintWorkOrderSerializer, ComplaintWorkOrder, ["work_order_no", "system_receive_time"]),
+        ):
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assert_same_json(serializer_class, model.objects.all())
+                self.assert_same_json(serializer_class, model.objects.all(), fields)
+
+    def test_list_endpoints(self):
+        """列表接口（页码分页、游标分页、?fields=）：快速路径和序列化器路径的响应一致"""
+        for view, path in ((NetworkSceneDataListView, "network-scene/"), (UserScoreListView, "userscore/")):
+            for params in ({"page_size": 50}, {"cursor": "", "page_size": 10}, {"fields": "id,city_display"}):
+                with self.subTest(path=path, **params):
+                    fast = self.client.get(API_PREFIX + path, params).content
+                    with mock.patch.object(view, "fast_serialization", False):
+                        slow = self.client.get(API_PREFIX + path, params).content
+                    self.assertEqual(fast, slow)
+
+
+class RequestLoggingTestCase(SceneDataTestCase):
+    """请求/响应日志：按字节预算截断、按接口前缀采样、异步队列满时丢弃不阻塞"""
+
+    def test_truncate_repr(self):
+        """预算内和repr一致；超出时截断且不会切坏多字节字符"""
+        value = {"list": [{"cell_id": 1, "name": "小区"}], "total": 1}
+        self.assertEqual(truncate_repr(value, 1000), repr(value))
+        huge = {"list": [{"name": "南昌" * 10, "score": i} for i in range(100000)], "text": "信" * 10 ** 6}
+        text = truncate_repr(huge, 100)
+        self.assertTrue(text.endswith("...(已截断，超过100字节)"))
+        self.assertLessEqual(len(text.split("...(已截断")[0].encode("utf-8")), 100)
+        self.assertTrue(text.startswith(repr(huge)[:50]))
+
+    @override_settings(CORE_LOG_SAMPLE_RATES={"/api/": 1, "/api/feellist/userscore/": 0})
+    def test_sampling(self):
+        """按最长前缀取采样率；未采样的请求不记日志，但出错的响应照样记录"""
+        self.assertEqual(get_sample_rate("/api/feellist/userscore/1/"), 0)
+        self.assertEqual(get_sample_rate("/api/feellist/network-scene/"), 1)
+        self.assertEqual(get_sample_rate("/health/"), 1)
+        with self.assertNoLogs(core_logger, "INFO"):
+            self.get_json("userscore/")
+        with self.assertLogs(core_logger, "INFO") as logs:
+            self.get_json("network-scene/", page_size=1)
+        self.assertIn("接收到新请求", "\n".join(logs.output))
+
+        request = RequestFactory().get(API_PREFIX + "userscore/")
+        with self.assertLogs(core_logger, "INFO") as logs:
+            log_request(request)
+            log_response({"code": 500}, 500)
+        self.assertEqual([line for line in logs.output if "状态码" in line], ["INFO:network_optimization:状态码: 500"])
+
+    @override_settings(CORE_LOG_MAX_BYTES=200)
+    def test_large_body_and_response_truncated(self):
+        """大请求体、大响应只记预算内的部分"""
+        rows = [{"city": 11201, "cell_id": 2000 + i, "net_type": 1, "phone_number": "1390000%04d" % i}
+                for i in range(50)]
+        with self.assertLogs(core_logger, "INFO") as logs:
+            self.client.post(API_PREFIX + "userscore/", rows, content_type="application/json")
+            self.get_json("network-scene/", page_size=ROW_COUNT)
+        body = next(line for line in logs.output if "请求体: " in line)
+        self.assertIn("已截断，共", body)
+        self.assertLess(len(body.encode("utf-8")), 400)
+        response = [line for line in logs.output if "响应数据: " in line][-1]
+        self.assertIn("(已截断，超过200字节)", response)
+
+    def test_queue_full_drops(self):
+        """后台线程写得慢、队列满时新日志直接丢弃（计数），写日志的线程不等待；队列满时停止也不报错"""
+        entered, release = threading.Event(), threading.Event()
+
+        class SlowHandler(logging.Handler):
+            def emit(self, record):
+                entered.set()
+                release.wait(5)
+
+        handler = DroppingQueueHandler([SlowHandler()], maxsize=2)
+        target = logging.getLogger("feellist-tests.queue")
+        target.propagate = False
+        target.addHandler(handler)
+        self.addCleanup(target.removeHandler, handler)
+        errors = []
+
+        def stop():
+            try:
+                handler.listener.stop()
+            except Exception as e:  # noqa: BLE001 记下来在主线程断言
+                errors.append(e)
+
+        try:
+            # 后台线程卡在第一条日志上，之后的日志只能进队列
+            target.warning("第一条")
+            self.assertTrue(entered.wait(5))
+            for i in range(20):
+                target.warning("日志%s", i)
+            self.assertEqual(handler.dropped, 18)
+            # 队列满时停止：等后台线程腾出位置，不抛queue.Full
+            stopper = threading.Thread(target=stop)
+            stopper.start()
+            stopper.join(0.1)
+            self.assertTrue(stopper.is_alive())
+            release.set()
+            stopper.join(5)
+            self.assertFalse(stopper.is_alive())
+            self.assertEqual(errors, [])
+            # 再停一次（进程退出时的atexit）直接返回
+            handler.listener.stop()
+        finally:
+            release.set()
+
+
+class MetricsTestCase(SceneDataTestCase):
+    """接口监控：按(视图, 方法)记录请求数、错误数、SQL条数、响应大小；/metrics 输出Prometheus文本"""
+
+    @staticmethod
+    def sample(name: str, view: str, method: str = "GET", **labels) -> float:
+        return REGISTRY.get_sample_value(name, {"view": view, "method": method, **labels}) or 0
+
+    def snapshot(self, view: str) -> dict:
+        return {
+            "requests": self.sample("http_requests_total", view, status="200"),
+            "queries": self.sample("http_request_db_queries_sum", view),
+            "latency": self.sample("http_request_duration_seconds_count", view),
+            "bytes": self.sample("http_response_size_bytes_sum", view),
+        }
+
+    def test_request_metrics(self):
+        """请求数+1，SQL条数和本请求实际执行的一致，响应大小是响应体字节数"""
+        before = self.snapshot("NetworkSceneDataListView")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(API_PREFIX + "network-scene/", {"page_size": 5})
+        after = self.snapshot("NetworkSceneDataListView")
+        self.assertEqual(after["requests"] - before["requests"], 1)
+        self.assertEqual(after["latency"] - before["latency"], 1)
+        self.assertEqual(after["queries"] - before["queries"], len(queries))
+        self.assertEqual(after["bytes"] - before["bytes"], len(response.content))
+
+    def test_streaming_response(self):
+        """流式导出：发完之后才记录，SQL和字节数包含发送期间的部分"""
+        before = self.snapshot("NetworkSceneDataExportView")
+        response = self.client.get(API_PREFIX + "network-scene/export/", {"export_format": "csv"})
+        self.assertEqual(self.snapshot("NetworkSceneDataExportView"), before)
+        with CaptureQueriesContext(connection) as queries:
+            content = b"".join(response.streaming_content)
+        after = self.snapshot("NetworkSceneDataExportView")
+        self.assertEqual(after["requests"] - before["requests"], 1)
+        self.assertEqual(after["bytes"] - before["bytes"], len(content))
+        self.assertGreaterEqual(after["queries"] - before["queries"], len(queries))
+        self.assertGreater(len(queries), 0)
+
+    def test_errors_and_unresolved(self):
+        """4xx按状态码计数但不算错误；未捕获异常记500和错误数；没匹配到路由的记为unresolved"""
+        view = "UserScoreAnalyticsView"
+        errors = self.sample("http_request_errors_total", view)
+        bad = self.sample("http_requests_total", view, status="400")
+        self.get_json("userscore/analytics/", 400, group_by="phone")
+        self.assertEqual(self.sample("http_requests_total", view, status="400") - bad, 1)
+        self.assertEqual(self.sample("http_request_errors_total", view), errors)
+
+        with mock.patch.object(UserScoreAnalyticsView, "get", side_effect=RuntimeError):
+            self.client.raise_request_exception = False
+            self.assertEqual(self.client.get(API_PREFIX + "userscore/analytics/").status_code, 500)
+        self.assertEqual(self.sample("http_request_errors_total", view) - errors, 1)
+
+        missing = self.sample("http_requests_total", UNRESOLVED_VIEW, status="404")
+        self.client.get("/no-such-path/")
+        self.assertEqual(self.sample("http_requests_total", UNRESOLVED_VIEW, status="404") - missing, 1)
+
+    def test_metrics_endpoint(self):
+        """/metrics 返回Prometheus文本，抓取本身不计入指标"""
+        self.client.get(API_PREFIX + "userscore/", {"page_size": 1})
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        text = response.content.decode("utf-8")
+        self.assertIn('http_requests_total{method="GET",status="200",view="UserScoreListView"}', text)
+        self.assertNotIn('view="metrics_view"', text)
+
+
+class SyntheticDataTestCase(TestCase):
+    """测试数据：generate_synthetic_data 生成 CELLS个小区×DAYS天 + USERS条用户评分"""
+    CELLS = 20
+    DAYS = 2
+    USERS = 40
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("generate_synthetic_data", cells=cls.CELLS, days=cls.DAYS, users=cls.USERS,
+                     end_date="2025-01-31", seed=7, chunk_size=15, stdout=io.StringIO())
+
+    @classmethod
+    def generate(cls, seed=7):
+        """不写库，直接取生成器的全部行"""
+        generator = SyntheticDataGenerator(cls.CELLS, cls.DAYS, datetime(2025, 1, 31).date(), seed)
+        scene_rows = [row for rows in generator.iter_scene_rows(15) for row in rows]
+        user_rows = [row for rows in generator.iter_user_rows(cls.USERS, 15) for row in rows]
+        return scene_rows, user_rows
+
+
+@override_settings(CACHES=TEST_CACHES, FEELLIST_RESPONSE_CACHE_TTL=0, FEELLIST_RESPONSE_CACHE_TTLS={})
+class SyntheticGeneratorTestCase(SyntheticDataTestCase):
+    """合成数据：同一个种子生成同样的数据，行数、地市、经纬度、指标范围符合预期；生成命令按参数写库"""
+
+    def test_same_seed_same_rows(self):
+        """同一个种子、同样的参数：两次生成的数据完全一样；换种子数据不同"""
+        self.assertEqual(self.generate(), self.generate())
+        self.assertNotEqual(self.generate(), self.generate(seed=8))
+
+    def test_rows_are_realistic(self):
+        """行数=小区数×天数；地市、枚举值都是合法取值，经纬度在江西范围内，比例指标在0~1"""
+        scene_rows, user_rows = self.generate()
+        self.assertEqual(len(scene_rows), self.CELLS * self.DAYS)
+        self.assertEqual(len(user_rows), self.USERS)
+        self.assertEqual(len({(row["date"], row["cell_id"]) for row in scene_rows}), len(scene_rows))
+        scene_levels = {value for value, _ in SCENE_LEVEL1_CHOICES}
+        manufacturers = {value for value, _ in MANUFACTURER_CHOICES}
+        for row in scene_rows:
+            self.assertIn(row["city"], CITY_PROFILES)
+            self.assertIn(row["scene_level1"], scene_levels)
+            self.assertIn(row["manufacturer"], manufacturers)
+            self.assertTrue(JIANGXI_BOUNDS["min_lat"] <= row["latitude"] <= JIANGXI_BOUNDS["max_lat"])
+            self.assertTrue(JIANGXI_BOUNDS["min_lon"] <= row["longitude"] <= JIANGXI_BOUNDS["max_lon"])
+            for name in SCENE_INDICATOR_DISTRIBUTIONS:
+                if row[name] is not None:
+                    self.assertTrue(0 <= row[name] <= 1, (name, row[name]))
+            if row["cell_score"] is not None:
+                self.assertTrue(0 <= row["cell_score"] <= 100)
+        cells = {row["cell_id"] for row in scene_rows}
+        for row in user_rows:
+            self.assertIn(row["cell_id"], cells)
+            self.assertRegex(row["phone_number"], r"^1[3-9]\d{9}$")
+        self.assertEqual(len({row["phone_number"] for row in user_rows}), len(user_rows))
+
+    def test_command_writes_rows(self):
+        """生成命令：小区数据按(date, cell_id)upsert，同样的参数重跑不产生重复行；用户评分追加"""
+        self.assertEqual(NetworkSceneData.objects.count(), self.CELLS * self.DAYS)
+        self.assertEqual(UserScore.objects.count(), self.USERS)
+        call_command("generate_synthetic_data", cells=self.CELLS, days=self.DAYS, users=self.USERS,
+                     end_date="2025-01-31", seed=7, stdout=io.StringIO())
+        self.assertEqual(NetworkSceneData.objects.count(), self.CELLS * self.DAYS)
+        self.assertEqual(UserScore.objects.count(), self.USERS * 2)
+
+    def test_command_rejects_bad_arguments(self):
+        """参数不合法：命令报错，不写库"""
+        for options in ({"cells": 0}, {"days": 0}, {"users": -1}, {"end_date": "2025/01/31"}):
+            with self.subTest(options=options):
+                with self.assertRaises(CommandError):
+                    call_command("generate_synthetic_data", stdout=io.StringIO(), **options)
+        self.assertEqual(NetworkSceneData.objects.count(), self.CELLS * self.DAYS)
+
+
+@override_settings(CACHES=TEST_CACHES, FEELLIST_RESPONSE_CACHE_TTL=0, FEELLIST_RESPONSE_CACHE_TTLS={})
+class BenchmarkTestCase(SyntheticDataTestCase):
+    """接口基准测试：分位数、和基线对比、基准测试命令不改动库里的数据"""
+
+    def test_percentile(self):
+        """分位数：线性插值，和numpy的默认算法一致"""
+        values = [5.0, 1.0, 4.0, 2.0, 3.0, 10.0]
+        for q in (0, 0.5, 0.95, 1):
+            self.assertAlmostEqual(percentile(values, q), float(np.percentile(values, q * 100)))
+        self.assertEqual(percentile([7.0], 0.95), 7.0)
+
+    def test_compare_results(self):
+        """和基线对比：只对比两边都有的用例；基线为0时变化比例为空"""
+        current = {"results": {
+            "a": {"p50_ms": 12.0, "p95_ms": 30.0, "queries": 2},
+            "b": {"p50_ms": 5.0, "p95_ms": 5.0, "queries": 1},
+            "new": {"p50_ms": 1.0, "p95_ms": 1.0, "queries": 1},
+        }}
+        baseline = {"results": {
+            "a": {"p50_ms": 10.0, "p95_ms": 40.0, "queries": 3},
+            "b": {"p50_ms": 0, "p95_ms": 5.0, "queries": 1},
+        }}
+        rows = {row["name"]: row for row in compare_results(current, baseline)}
+        self.assertEqual(set(rows), {"a", "b"})
+        self.assertEqual(rows["a"]["p50_change"], 0.2)
+        self.assertEqual(rows["a"]["p95_change"], -0.25)
+        self.assertEqual((rows["a"]["baseline_queries"], rows["a"]["queries"]), (3, 2))
+        self.assertIsNone(rows["b"]["p50_change"])
+        self.assertEqual(rows["b"]["p95_change"], 0)
+
+    def test_bench_endpoints(self):
+        """全部分组各跑一次：每个用例都返回成功，结果JSON可以作为基线再对比；写入用例回滚，数据和版本号都不变"""
+        counts = NetworkSceneData.objects.count(), UserScore.objects.count()
+        generations = get_generation("network_scene_data"), get_generation("user_score")
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "bench.json")
+            call_command("bench_endpoints", iterations=2, warmup=0, page_size=10, ingest_rows=5,
+                         output=output, stdout=io.StringIO())
+            with open(output, encoding="utf-8") as f:
+                report = json.load(f)
+            compared = os.path.join(directory, "compared.json")
+            call_command("bench_endpoints", iterations=1, warmup=0, page_size=10, ingest_rows=5,
+                         groups="list,ingest", output=compared, compare=output, stdout=io.StringIO())
+            with open(compared, encoding="utf-8") as f:
+                comparison = json.load(f)["comparison"]
+
+        self.assertEqual({result["group"] for result in report["results"].values()},
+                         {"list", "filter", "detail", "aggregate", "ingest"})
+        for name, result in report["results"].items():
+            with self.subTest(case=name):
+                self.assertIn(result["status"], (200, 201))
+                self.assertEqual(result["iterations"], 2)
+                self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+                self.assertGreater(result["response_bytes"], 0)
+        self.assertEqual(report["meta"]["rows"], {"network_scene_data": counts[0], "user_score": counts[1]})
+        self.assertEqual({row["name"] for row in comparison},
+                         {name for name, result in report["results"].items() if result["group"] in ("list", "ingest")})
+        self.assertEqual((NetworkSceneData.objects.count(), UserScore.objects.count()), counts)
+        self.assertEqual((get_generation("network_scene_data"), get_generation("user_score")), generations)
+
+    def test_bench_endpoints_rejects_bad_arguments(self):
+        """未知分组、读不了的基线文件：命令报错"""
+        with self.assertRaises(CommandError):
+            call_command("bench_endpoints", groups="list,unknown", stdout=io.StringIO())
+        with self.assertRaises(CommandError):
+            call_command("bench_endpoints", compare="/nonexistent/bench.json", stdout=io.StringIO())
+
+
+@override_settings(FEELLIST_RESPONSE_CACHE_TTLS={"network_scene_data": 60, "user_score": 60})
+class ResponseCacheTestCase(SceneDataTestCase):
+    """响应缓存：按资源、筛选条件、页码、字段分开缓存；新增、修改、删除、批量导入后版本号+1，下一次请求读到新数据"""
+    USER_ROW = {"city": 11201, "cell_id": 2000, "net_type": 1, "cell_score": 60, "phone_number": "13900000001"}
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_cached(self, path: str, **params) -> dict:
+        """同样的参数再请求一次：只查数据版本号，结果和上一次一样"""
+        first = self.get_json(path, **params)
+        with assert_query_budget(1):
+            second = self.get_json(path, **params)
+        self.assertEqual(first, second)
+        return second
+
+    def test_writes_invalidate_list_and_detail(self):
+        """单条新增、修改、删除、批量新增后，缓存的列表和详情都换成新数据"""
+        list_path, detail_path = "userscore/", f"userscore/{self.user_id}/"
+        self.assertEqual(self.assert_cached(list_path, page_size=10)["total"], ROW_COUNT)
+        self.assert_cached(detail_path)
+
+        response = self.client.post(API_PREFIX + list_path, self.USER_ROW, content_type="application/json")
+        self.assertEqual(response.status_code, 201, response.content[:500])
+        self.assertEqual(self.assert_cached(list_path, page_size=10)["total"], ROW_COUNT + 1)
+
+        row = UserScore.objects.get(pk=self.user_id)
+        payload = {"city": row.city, "cell_id": row.cell_id, "net_type": row.net_type,
+                   "phone_number": row.phone_number, "cell_score": 99}
+        response = self.client.put(API_PREFIX + detail_path, payload, content_type="application/json")
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        self.assertEqual(self.assert_cached(detail_path)["data"]["cell_score"], 99)
+
+        self.assertEqual(self.client.delete(API_PREFIX + detail_path).status_code, 204)
+        self.assertEqual(self.client.get(API_PREFIX + detail_path).status_code, 404)
+        self.assertEqual(self.assert_cached(list_path, page_size=10)["total"], ROW_COUNT)
+
+        rows = [{**self.USER_ROW, "cell_id": 2001 + i, "phone_number": "1390000100%d" % i} for i in range(3)]
+        response = self.client.post(API_PREFIX + list_path, rows, content_type="application/json")
+        self.assertEqual(response.json()["created"], 3)
+        self.assertEqual(self.assert_cached(list_path, page_size=10)["total"], ROW_COUNT + 3)
+
+    def test_write_to_other_table_keeps_cache(self):
+        """版本号按表分开：写用户评分不会让小区数据的缓存失效"""
+        scene_path = "network-scene/"
+        self.assert_cached(scene_path, page_size=10)
+        generation = get_generation("network_scene_data")
+        self.client.post(API_PREFIX + "userscore/", self.USER_ROW, content_type="application/json")
+        self.assertEqual(get_generation("network_scene_data"), generation)
+        with assert_query_budget(1):
+            self.get_json(scene_path, page_size=10)
+
+    def test_cache_key_covers_params(self):
+        """筛选条件、页码、返回字段不同的请求各自缓存；参数顺序不同算同一个缓存"""
+        path = "network-scene/"
+        first_page = self.assert_cached(path, page=1, page_size=5)
+        second_page = self.assert_cached(path, page=2, page_size=5)
+        self.assertNotEqual(first_page["list"], second_page["list"])
+        filtered = self.assert_cached(path, city=11201, page_size=50)
+        self.assertEqual(filtered["total"], ROW_COUNT // 2)
+        sparse = self.assert_cached(path, fields="cell_id,cell_score", page_size=5)
+        self.assertEqual(set(sparse["list"][0]), {"cell_id", "cell_score"})
+
+        self.get_json(path, city=11201, scene_level1=0, page_size=5)
+        with assert_query_budget(1):
+            self.client.get(API_PREFIX + path + "?page_size=5&scene_level1=0&city=11201")
+
+    @override_settings(FEELLIST_RESPONSE_CACHE_TTLS={"network_scene_data": 60, "user_score": 0})
+    def test_ttl_per_resource(self):
+        """缓存时间按表配置：配成0的表每次都查库，其他表照常缓存"""
+        self.assert_cached("network-scene/", page_size=10)
+        self.get_json("userscore/", page_size=10)
+        with self.assertNumQueries(2):
+            self.get_json("userscore/", page_size=10)
+
+    def test_rolled_back_write_keeps_generation(self):
+        """写库的事务回滚时版本号+1也一起回滚，缓存不会白白失效"""
+        generation = get_generation("user_score")
+        with transaction.atomic():
+            UserScoreService().create(dict(self.USER_ROW))
+            self.assertEqual(get_generation("user_score"), generation + 1)
+            transaction.set_rollback(True)
+        self.assertEqual(get_generation("user_score"), generation)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class GenerationTestCase(TransactionTestCase):
+    """数据版本号：多个进程/线程同时+1，一次都不会少加"""
+    NAMESPACE = "generation_test"
+    THREADS = 4
+    BUMPS_PER_THREAD = 10
+
+    def test_interleaved_bumps_are_not_lost(self):
+        """两个写入方都读到旧版本号后各自+1：结果是+2，不是“后写的覆盖先写的”"""
+        start = get_generation(self.NAMESPACE)
+        seen_by_first, seen_by_second = get_generation(self.NAMESPACE), get_generation(self.NAMESPACE)
+        self.assertEqual(seen_by_first, seen_by_second)
+        bump_generation(self.NAMESPACE)
+        bump_generation(self.NAMESPACE)
+        self.assertEqual(get_generation(self.NAMESPACE), start + 2)
+
+    def test_bump_is_a_single_update(self):
+        """+1是一条 UPDATE ... SET value = value + 1，不是先SELECT再写回（读改写会在并发时丢失更新）"""
+        get_generation(self.NAMESPACE)
+        with CaptureQueriesContext(connection) as queries:
+            bump_generation(self.NAMESPACE)
+        first = queries.captured_queries[0]["sql"]
+        self.assertTrue(first.startswith("UPDATE"), first)
+        self.assertIn('"value" + 1', first)
+
+    @skipIf(connection.vendor == "sqlite", "SQLite内存测试库的共享缓存锁不等待，多线程写会直接报table is locked")
+    def test_concurrent_bumps_are_not_lost(self):
+        """多个线程（各自的数据库连接）同时+1，总数一个不少"""
+        start = get_generation(self.NAMESPACE)
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(self.BUMPS_PER_THREAD):
+                    bump_generation(self.NAMESPACE)
+            except Exception as e:  # noqa: BLE001 线程里的异常要带回主线程断言
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(get_generation(self.NAMESPACE), start + self.THREADS * self.BUMPS_PER_THREAD)
@@ -5,10 +5,38 @@ from feellist import views
 urlpatterns = [
     # 列表/新增接口
     path('userscore/', views.UserScoreListView.as_view(), name='user-score-list'),
+    # 导出接口（?export_format=csv|ndjson，筛选条件同列表接口）
+    path('userscore/export/', views.UserScoreExportView.as_view(), name='user-score-export'),
+    # 分组统计接口（?group_by=city&metrics=count,avg:cell_score）
+    path('userscore/analytics/', views.UserScoreAnalyticsView.as_view(), name='user-score-analytics'),
+    # 评分TopN接口（?top_n=10&net_type=1，不传city时返回每个地市的TopN）
+    path('userscore/top-cells/', views.UserScoreTopCellsView.as_view(), name='user-score-top-cells'),
     # 详情/修改/删除接口（pk为模型ID）
     path('userscore/<int:pk>/', views.UserScoreDetailView.as_view(), name='user-score-detail'),
 
     # NetworkSceneData 新增接口
     path('network-scene/', views.NetworkSceneDataListView.as_view(), name='network-scene-list'),
-    path('network-scene/<int:pk>/', views.NetworkSceneDataDetailView.as_view(), name='network-scene-detail')
+    path('network-scene/export/', views.NetworkSceneDataExportView.as_view(), name='network-scene-export'),
+    # 统计接口：投诉率 + 场景分布（?city=&date_start=&date_end=）
+    path('network-scene/stats/', views.NetworkSceneDataStatsView.as_view(), name='network-scene-stats'),
+    # 指标分布/相关性/排名接口（进程内列式快照，只覆盖最近FEELLIST_SNAPSHOT_DAYS天）
+    path('network-scene/indicator-distribution/', views.NetworkSceneIndicatorDistributionView.as_view(),
+         name='network-scene-indicator-distribution'),
+    path('network-scene/indicator-correlation/', views.NetworkSceneIndicatorCorrelationView.as_view(),
+         name='network-scene-indicator-correlation'),
+    path('network-scene/indicator-ranking/', views.NetworkSceneIndicatorRankingView.as_view(),
+         name='network-scene-indicator-ranking'),
+    # 附近小区接口（?lat=&lon=&k=&radius_m=，最新一天的小区，按距离升序）
+    path('network-scene/nearby/', views.NetworkSceneNearbyView.as_view(), name='network-scene-nearby'),
+    # 地图网格聚合接口（?bbox=最小经度,最小纬度,最大经度,最大纬度&zoom=7，按瓦片缓存）
+    path('network-scene/heatmap/', views.NetworkSceneHeatmapView.as_view(), name='network-scene-heatmap'),
+    path('network-scene/analytics/', views.NetworkSceneDataAnalyticsView.as_view(), name='network-scene-analytics'),
+    path('network-scene/<int:pk>/', views.NetworkSceneDataDetailView.as_view(), name='network-scene-detail'),
+
+    # 投诉工单接口（列表默认不返回大文本字段）
+    path('complaint/', views.ComplaintWorkOrderListView.as_view(), name='complaint-list'),
+    # 关键词搜索（?q=信号差 断网，MySQL走全文索引）
+    path('complaint/search/', views.ComplaintWorkOrderSearchView.as_view(), name='complaint-search'),
+    path('complaint/export/', views.ComplaintWorkOrderExportView.as_view(), name='complaint-export'),
+    path('complaint/<int:pk>/', views.ComplaintWorkOrderDetailView.as_view(), name='complaint-detail')
 ]
@@ -4,63 +4,184 @@ feellist APP的视图：调用服务层，处理请求和响应
 - 继承DRF的APIView，复用core的通用工具
 - 只需要指定服务、序列化器、参数映射，不用写重复代码
 """
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 from core.constants.core_constants import (
     HTTP_SUCCESS, HTTP_CREATED, HTTP_NO_CONTENT,
-    MSG_QUERY_SUCCESS, MSG_CREATE_SUCCESS, MSG_UPDATE_SUCCESS, MSG_DELETE_SUCCESS
+    MSG_QUERY_SUCCESS, MSG_CREATE_SUCCESS, MSG_UPDATE_SUCCESS, MSG_DELETE_SUCCESS,
+    EXPORT_CSV, EXPORT_FORMATS, MSG_BULK_CREATE_SUCCESS, BULK_BATCH_SIZE, BULK_MAX_ERRORS, MAX_PAGE_SIZE,
+    RANKING_DEFAULT_LIMIT, RANKING_MAX_LIMIT, NEARBY_DEFAULT_K, NEARBY_MAX_K, NEARBY_DEFAULT_RADIUS_M, NEARBY_MAX_RADIUS_M, HEATMAP_MAX_ZOOM,
+    RESPONSE_CACHE_TTL
 )
+from core.exceptions.core_exceptions import ParamError
 from core.permissions.core_permissions import AllowAny
-from core.utils.core_filters import clean_request_params
+from core.utils.core_cache import versioned_cache_key
+from core.utils.core_export import stream_csv, stream_ndjson
+from core.utils.core_filters import (
+    clean_request_params, parse_list_param, validate_choice, validate_int, validate_float
+)
 from core.utils.core_log import log_request, log_response
+from core.utils.core_parsers import NDJSONParser
+
+
+class SparseFieldsViewMixin:
+    """
+    按需返回字段：?fields=cell_id,latitude,longitude
+    - 序列化器只输出这些字段
+    - 数据库只查询对应的列（QuerySet.only）
+    - 子类可以指定default_exclude_fields：未传fields时默认不返回、也不查询这些列（比如大文本字段）
+    """
+    default_exclude_fields = ()
+
+    def get_sparse_fields(self, request):
+        """
+        解析fields参数
+        :return: (序列化器字段列表, 需要查询的模型字段列表)，未传fields且没有默认排除字段时都为None
+        """
+        fields = parse_list_param(request.GET.get("fields"))
+        if fields is None and self.default_exclude_fields:
+            fields = self.serializer_class.field_names(exclude=self.default_exclude_fields)
+        return fields, self.serializer_class.resolve_fields(fields)
+
 
+class ResponseCacheViewMixin:
+    """
+    GET响应缓存：同一资源、同样参数（筛选条件、页码、返回字段）的请求直接返回缓存的响应数据
+    - 缓存键里带表的数据版本号：仓储层新增/修改/删除/批量导入时版本号+1，旧缓存自然不再命中
+    - 缓存时间按表名配置：settings.FEELLIST_RESPONSE_CACHE_TTLS，没配置的表用 FEELLIST_RESPONSE_CACHE_TTL，0表示不缓存
+    - 子类也可以直接指定 response_cache_ttl
+    """
+    response_cache_ttl = None
+
+    def get_response_cache_resource(self) -> str:
+        """缓存的资源名：服务对应的表名（和仓储层的数据版本号命名空间一致）"""
+        return self.service.repository.model._meta.db_table
+
+    def get_response_cache_ttl(self) -> int:
+        """缓存时间（秒）"""
+        if self.response_cache_ttl is not None:
+            return self.response_cache_ttl
+        ttls = getattr(settings, "FEELLIST_RESPONSE_CACHE_TTLS", None) or {}
+        default = getattr(settings, "FEELLIST_RESPONSE_CACHE_TTL", RESPONSE_CACHE_TTL)
+        return ttls.get(self.get_response_cache_resource(), default)
 
-class BaseListView(APIView):
+    def cached_response_data(self, kind, params, build):
+        """
+        读响应缓存，没命中时调用build查库并写缓存
+        :param kind: 缓存用途（list:page / list:cursor / detail）
+        :param params: 影响响应的请求参数
+        :param build: 构造响应数据的函数（出错时抛异常，不写缓存）
+        :return: 响应数据
+        """
+        ttl = self.get_response_cache_ttl()
+        if not ttl:
+            return build()
+        # 先取版本号再查库：查库期间有写入的话，结果写在旧版本号下，不会被后面的请求读到
+        key = versioned_cache_key(f"response:{kind}", self.get_response_cache_resource(), params)
+        response_data = cache.get(key)
+        if response_data is None:
+            response_data = build()
+            cache.set(key, response_data, ttl)
+        return response_data
+
+
+class BaseListView(ResponseCacheViewMixin, SparseFieldsViewMixin, APIView):
     """
-    列表视图基类：支持GET（筛选+分页）、POST（新增）
+    列表视图基类：支持GET（筛选+分页）、POST（新增，请求体为JSON数组或NDJSON时批量新增）
+    分页方式：
+    - 默认页码分页：?page=1&page_size=10，返回list和total
+    - 游标分页（可选）：?cursor=（首页传空）&page_size=10，返回list和next_cursor
+    总数统计（页码分页时）：?count=exact（默认，精确总数）/ estimate（估算总数）/ none（不统计，返回has_more）
+    按需返回字段：?fields=cell_id,latitude,longitude
     子类需要指定：
     1. service: 业务服务实例
     2. serializer_class: 序列化器类
     3. filter_mapping: 参数映射字典（可选）
     4. permission_classes: 权限类（可选，默认允许匿名访问）
+    5. fast_serialization: GET列表是否走只读快速序列化（values()+预计算的选择字典，输出和序列化器一致），默认开启
+    6. response_cache_ttl: GET响应缓存时间（秒，可选，默认按表名读settings，见ResponseCacheViewMixin）
+    7. upsert_on_create: 单条POST是否按自然键upsert（服务层create会更新已存在的行），是的话不做唯一校验
+    批量POST一律按upsert校验（服务层bulk_create按自然键upsert或直接插入）
     """
     service = None
     serializer_class = None
     filter_mapping = {}
     permission_classes = [AllowAny]
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, NDJSONParser]
+    fast_serialization = True
+    upsert_on_create = False
 
     def get(self, request):
-        """GET请求：获取列表数据"""
+        """GET请求：获取列表数据（相同参数的请求优先读响应缓存）"""
         # 1. 打印请求日志
         log_request(request)
         # 2. 清洗请求参数
         filters = clean_request_params(request.GET, self.filter_mapping)
-        # 3. 获取分页参数
+        # 3. 读响应缓存，没命中再查库（游标分页和页码分页分开缓存）
+        kind = "list:cursor" if "cursor" in request.GET else "list:page"
+        response_data = self.cached_response_data(kind, filters, lambda: self.get_list_data(request, filters))
+        # 4. 打印响应日志
+        log_response(response_data, HTTP_SUCCESS)
+        # 5. 返回响应
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    def get_list_data(self, request, filters):
+        """查库构造列表响应数据"""
+        # 1. 获取分页参数
         page = request.GET.get("page")
         page_size = request.GET.get("page_size")
-        # 4. 调用服务层获取数据
-        data_list, total, has_filter = self.service.get_list(filters, page, page_size)
-        # 5. 序列化数据
-        serializer = self.serializer_class(data_list, many=True)
-        # 6. 构造响应数据
+        fields, only_fields = self.get_sparse_fields(request)
+        if "cursor" in request.GET:
+            return self.get_cursor_data(request, filters, page_size, fields, only_fields)
+        count = request.GET.get("count")
+        # 2. 调用服务层获取数据
+        data_list, total, has_filter, has_more = self.service.get_list(
+            filters, page, page_size, count, only_fields, as_values=self.fast_serialization
+        )
+        # 3. 构造响应数据（含序列化）
         response_data = {
             "code": HTTP_SUCCESS,
             "msg": MSG_QUERY_SUCCESS,
-            "list": serializer.data,
+            "list": self.serialize_list(data_list, fields),
             "total": total
         }
-        # 7. 打印响应日志
-        log_response(response_data, HTTP_SUCCESS)
-        # 8. 返回响应
-        return Response(response_data, status=status.HTTP_200_OK)
+        if count:
+            # 非默认统计方式：额外返回是否有下一页，total可能是估算值或None
+            response_data["has_more"] = has_more
+        return response_data
+
+    def get_cursor_data(self, request, filters, page_size, fields=None, only_fields=None):
+        """游标分页的列表响应数据：不统计总数，每页耗时恒定"""
+        cursor = request.GET.get("cursor")
+        data_list, next_cursor, has_filter = self.service.get_cursor_list(
+            filters, cursor, page_size, only_fields, as_values=self.fast_serialization
+        )
+        return {
+            "code": HTTP_SUCCESS,
+            "msg": MSG_QUERY_SUCCESS,
+            "list": self.serialize_list(data_list, fields),
+            "next_cursor": next_cursor
+        }
+
+    def serialize_list(self, data_list, fields=None):
+        """序列化列表数据：快速路径直接转换values()行字典，否则走序列化器"""
+        if self.fast_serialization:
+            return self.serializer_class.to_representation_rows(data_list, fields)
+        return self.serializer_class(data_list, many=True, fields=fields).data
 
     def post(self, request):
         """POST请求：新增数据"""
         log_request(request)
+        if isinstance(request.data, list):
+            return self.bulk_post(request)
         # 1. 数据验证
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.serializer_class(data=request.data, context={"upsert": self.upsert_on_create})
         serializer.is_valid(raise_exception=True)
         # 2. 调用服务层新增数据
         obj = self.service.create(serializer.validated_data)
@@ -75,36 +196,79 @@ class BaseListView(APIView):
         log_response(response_data, HTTP_CREATED)
         return Response(response_data, status=status.HTTP_201_CREATED)
 
+    def bulk_post(self, request):
+        """
+        POST请求（批量）：按批校验+写入，每批一个事务
+        校验失败的行不会写入，响应里按行号返回错误原因
+        """
+        rows = request.data
+        created = failed = 0
+        errors = []
+        # 派生数据（比如汇总表）在全部批次写完后统一刷新一次
+        with self.service.write_context():
+            for start in range(0, len(rows), BULK_BATCH_SIZE):
+                # 1. 逐行校验当前批次
+                valid_rows = []
+                for index, row in enumerate(rows[start:start + BULK_BATCH_SIZE], start):
+                    serializer = self.serializer_class(data=row, context={"upsert": True})
+                    if serializer.is_valid():
+                        valid_rows.append(serializer.validated_data)
+                        continue
+                    failed += 1
+                    # 错误明细最多返回BULK_MAX_ERRORS条，避免响应过大
+                    if len(errors) < BULK_MAX_ERRORS:
+                        errors.append({"index": index, "errors": serializer.errors})
+                # 2. 当前批次的合法数据一次写入
+                created += self.service.bulk_create(valid_rows)
 
-class BaseDetailView(APIView):
+        response_data = {
+            "code": HTTP_CREATED,
+            "msg": MSG_BULK_CREATE_SUCCESS,
+            "created": created,
+            "failed": failed,
+            "errors": errors
+        }
+        log_response(response_data, HTTP_CREATED)
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+class BaseDetailView(ResponseCacheViewMixin, SparseFieldsViewMixin, APIView):
     """
     详情视图基类：支持GET（查单条）、PUT（改）、DELETE（删）
+    GET支持按需返回字段：?fields=cell_id,cell_score
+    GET响应会缓存，PUT/DELETE经过仓储层写入后自动失效
     """
     service = None
     serializer_class = None
     permission_classes = [AllowAny]
 
     def get(self, request, pk):
-        """GET请求：获取单条数据"""
+        """GET请求：获取单条数据（相同参数的请求优先读响应缓存）"""
         log_request(request)
+        params = {**clean_request_params(request.GET), "pk": pk}
+        response_data = self.cached_response_data("detail", params, lambda: self.get_detail_data(request, pk))
+        log_response(response_data, HTTP_SUCCESS)
+        return Response(response_data)
+
+    def get_detail_data(self, request, pk):
+        """查库构造详情响应数据"""
+        fields, only_fields = self.get_sparse_fields(request)
         # 1. 调用服务层获取数据
-        obj = self.service.get_detail(pk)
+        obj = self.service.get_detail(pk, only_fields)
         # 2. 序列化数据
-        serializer = self.serializer_class(obj)
+        serializer = self.serializer_class(obj, fields=fields)
         # 3. 构造响应
-        response_data = {
+        return {
             "code": HTTP_SUCCESS,
             "msg": MSG_QUERY_SUCCESS,
             "data": serializer.data
         }
-        log_response(response_data, HTTP_SUCCESS)
-        return Response(response_data)
 
     def put(self, request, pk):
         """PUT请求：修改数据"""
         log_request(request)
-        # 1. 数据验证
-        serializer = self.serializer_class(data=request.data)
+        # 1. 数据验证：带上原对象，唯一校验排除自己，改到其他行已有的唯一字段上返回400
+        serializer = self.serializer_class(self.service.get_detail(pk), data=request.data)
         serializer.is_valid(raise_exception=True)
         # 2. 调用服务层修改数据
         obj = self.service.update(pk, serializer.validated_data)
@@ -133,10 +297,76 @@ class BaseDetailView(APIView):
         return Response(response_data, status=status.HTTP_204_NO_CONTENT)
 
 
+class BaseExportView(SparseFieldsViewMixin, APIView):
+    """
+    导出视图基类：GET按列表接口同样的筛选条件，流式导出全部数据
+    参数：
+    - 筛选条件：同列表接口（支持filter_mapping映射）
+    - export_format：csv（默认）/ ndjson
+    - fields：只导出指定字段（可选）
+    注意：不能用format做参数名，DRF把它保留给内容协商
+    """
+    service = None
+    serializer_class = None
+    filter_mapping = {}
+    export_name = "export"
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """GET请求：流式导出数据"""
+        log_request(request)
+        filters = clean_request_params(request.GET, self.filter_mapping)
+        export_format = validate_choice(request.GET.get("export_format") or EXPORT_CSV, EXPORT_FORMATS,
+                                        "export_format")
+        _, only_fields = self.get_sparse_fields(request)
+        # 1. 确定导出列
+        columns = self.service.get_export_columns(only_fields)
+        # 2. 边查边写：每次只有一批数据在内存里
+        rows = self.service.iter_export_rows(filters, columns)
+        if export_format == EXPORT_CSV:
+            content, content_type = stream_csv(rows, columns), "text/csv; charset=utf-8"
+        else:
+            content, content_type = stream_ndjson(rows, columns), "application/x-ndjson; charset=utf-8"
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{self.export_name}.{export_format}"'
+        return response
+
+
+class BaseAnalyticsView(APIView):
+    """
+    分组统计视图基类：GET ?group_by=city,scene_level1&metrics=count,avg:cell_score
+    - group_by：分组维度（逗号分隔），不传表示整体汇总
+    - metrics：指标（逗号分隔），格式 函数:字段，函数支持sum/avg/min/max/count，默认count
+    - 其他参数：同列表接口的筛选条件
+    """
+    service = None
+    filter_mapping = {}
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """GET请求：分组统计"""
+        log_request(request)
+        filters = clean_request_params(request.GET, self.filter_mapping)
+        group_by = parse_list_param(request.GET.get("group_by")) or []
+        metrics = parse_list_param(request.GET.get("metrics"))
+        data_list = self.service.get_analytics(filters, group_by, metrics)
+        response_data = {
+            "code": HTTP_SUCCESS,
+            "msg": MSG_QUERY_SUCCESS,
+            "list": data_list,
+            "total": len(data_list)
+        }
+        log_response(response_data, HTTP_SUCCESS)
+        return Response(response_data)
+
+
 # ==================== 业务视图 ====================
 from feellist.services.user_score import UserScoreService
 from feellist.services.network_scene import NetworkSceneDataService
-from feellist.serializers import UserScoreSerializer, NetworkSceneDataSerializer
+from feellist.services.complaint_work_order import ComplaintWorkOrderService
+from feellist.serializers import UserScoreSerializer, NetworkSceneDataSerializer, ComplaintWorkOrderSerializer
+from feellist.fileds.complaint_fileds import complaint_text_field_names
+from feellist.common.constants import SCENE_LEVEL1_CHOICES
 
 
 class UserScoreListView(BaseListView):
@@ -150,6 +380,56 @@ class UserScoreListView(BaseListView):
     }
 
 
+class UserScoreExportView(BaseExportView):
+    """用户评分导出视图"""
+    service = UserScoreService()
+    serializer_class = UserScoreSerializer
+    filter_mapping = UserScoreListView.filter_mapping
+    export_name = "user_score"
+
+
+class UserScoreAnalyticsView(BaseAnalyticsView):
+    """用户评分分组统计视图"""
+    service = UserScoreService()
+    filter_mapping = UserScoreListView.filter_mapping
+
+
+class UserScoreTopCellsView(APIView):
+    """
+    用户评分TopN视图
+    参数：
+    - top_n：前N名（默认10，最大MAX_PAGE_SIZE）
+    - net_type：网络类型（默认1=5G）
+    - city：传了只查该地市；不传则返回全省每个地市各自的前N名（带rank地市内名次）
+    """
+    service = UserScoreService()
+    serializer_class = UserScoreSerializer
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """GET请求：评分TopN"""
+        log_request(request)
+        top_n = validate_int(request.GET.get("top_n") or 10, "top_n")
+        top_n = max(1, min(top_n, MAX_PAGE_SIZE))
+        net_type = validate_int(request.GET.get("net_type") or 1, "网络类型")
+        city = request.GET.get("city")
+        if city:
+            data_list = self.service.get_top_score_cells(city, top_n, net_type)
+            ranks = list(range(1, len(data_list) + 1))
+        else:
+            data_list = self.service.get_top_score_cells_per_city(top_n, net_type)
+            ranks = [obj.rank for obj in data_list]
+        serializer = self.serializer_class(data_list, many=True)
+        response_data = {
+            "code": HTTP_SUCCESS,
+            "msg": MSG_QUERY_SUCCESS,
+            "list": [{**item, "rank": rank} for item, rank in zip(serializer.data, ranks)],
+            "total": len(data_list)
+        }
+        log_response(response_data, HTTP_SUCCESS)
+        return Response(response_data)
+
+
 class UserScoreDetailView(BaseDetailView):
     """用户评分详情视图"""
     service = UserScoreService()
@@ -164,9 +444,266 @@ class NetworkSceneDataListView(BaseListView):
         "areaType": "area",
         "sceneLevel1": "scene_level1"
     }
+    # 带齐(date, cell_id)的单条新增按自然键upsert
+    upsert_on_create = True
 
 
 class NetworkSceneDataDetailView(BaseDetailView):
     """小区场景数据详情视图"""
     service = NetworkSceneDataService()
     serializer_class = NetworkSceneDataSerializer
+
+
+class NetworkSceneDataExportView(BaseExportView):
+    """小区场景数据导出视图"""
+    service = NetworkSceneDataService()
+    serializer_class = NetworkSceneDataSerializer
+    filter_mapping = NetworkSceneDataListView.filter_mapping
+    export_name = "network_scene_data"
+
+
+class NetworkSceneDataAnalyticsView(BaseAnalyticsView):
+    """小区场景数据分组统计视图"""
+    service = NetworkSceneDataService()
+    filter_mapping = NetworkSceneDataListView.filter_mapping
+
+
+class NetworkSceneDataStatsView(APIView):
+    """
+    小区场景数据统计视图：投诉率 + 场景分布（全部在数据库聚合）
+    参数：city、date_start、date_end（YYYY-MM-DD，包含首尾），以及列表接口的其他筛选条件
+    """
+    service = NetworkSceneDataService()
+    filter_mapping = NetworkSceneDataListView.filter_mapping
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """GET请求：获取统计数据"""
+        log_request(request)
+        filters = clean_request_params(request.GET, self.filter_mapping)
+        scene_names = dict(SCENE_LEVEL1_CHOICES)
+        distribution = self.service.get_scene_distribution(filters=filters)
+        response_data = {
+            "code": HTTP_SUCCESS,
+            "msg": MSG_QUERY_SUCCESS,
+            "data": {
+                **self.service.get_complaint_stats(filters),
+                "scene_distribution": [
+                    {"scene_level1": scene_id, "scene_level1_display": scene_names.get(scene_id, ""), "count": count}
+                    for scene_id, count in distribution.items()
+                ]
+            }
+        }
+        log_response(response_data, HTTP_SUCCESS)
+        return Response(response_data)
+
+
+class NetworkSceneIndicatorDistributionView(APIView):
+    """
+    指标分布视图：分位数 + 分组统计（走进程内列式快照，只覆盖最近N天）
+    参数：field（必填，指标字段）、group_by（可选，逗号分隔维度），以及列表接口的筛选条件
+    """
+    service = NetworkSceneDataService()
+    filter_mapping = NetworkSceneDataListView.filter_mapping
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """GET请求：获取指标分布"""
+        log_request(request)
+        field = request.GET.get("field")
+        if not field:
+            raise ParamError(detail="field参数不能为空")
+        filters = clean_request_params(request.GET, self.filter_mapping)
+        group_by = parse_list_param(request.GET.get("group_by")) or []
+        response_data = {
+            "code": HTTP_SUCCESS,
+            "msg": MSG_QUERY_SUCCESS,
+            "data": self.service.get_indicator_distribution(field, filters, group_by)
+        }
+        log_response(response_data, HTTP_SUCCESS)
+        return Response(response_data)
+
+
+class NetworkSceneIndicatorCorrelationView(APIView):
+    """
+    指标相关性视图：fields=cqi_good_rate,overlap_coverage_ratio（至少两个），以及列表接口的筛选条件
+    """
+    service = NetworkSceneDataService()
+    filter_mapping = NetworkSceneDataListView.filter_mapping
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """GET请求：获取指标相关性矩阵"""
+        log_request(request)
+        filters = clean_request_params(request.GET, self.filter_mapping)
+        fields = parse_list_param(request.GET.get("fields")) or []
+        response_data = {
+            "code": HTTP_SUCCESS,
+            "msg": MSG_QUERY_SUCCESS,
+            "data": self.service.get_indicator_correlation(fields, filters)
+        }
+        log_response(response_data, HTTP_SUCCESS)
+        return Response(response_data)
+
+
+class NetworkSceneIndicatorRankingView(APIView):
+    """
+    小区指标排名视图：?field=cqi_good_rate&limit=20&order=desc（走进程内列式快照，只覆盖最近N天）
+    - field：必填，指标字段
+    - limit：返回数量，默认20，最多100
+    - order：desc（默认，均值最高的在前）/asc（最差的在前）
+    其他参数同列表接口的筛选条件
+    """
+    service = NetworkSceneDataService()
+    filter_mapping = NetworkSceneDataListView.filter_mapping
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """GET请求：获取小区指标排名"""
+        log_request(request)
+        field = request.GET.get("field")
+        if not field:
+            raise ParamError(detail="field参数不能为空")
+        order = request.GET.get("order", "desc")
+        if order not in ("asc", "desc"):
+            raise ParamError(detail="order只能是asc或desc")
+        limit = validate_int(request.GET.get("limit", RANKING_DEFAULT_LIMIT), "limit")
+        limit = max(1, min(limit, RANKING_MAX_LIMIT))
+        filters = clean_request_params(request.GET, self.filter_mapping)
+        response_data = {
+            "code": HTTP_SUCCESS,
+            "msg": MSG_QUERY_SUCCESS,
+            "data": self.service.get_indicator_rankings(field, limit, order == "asc", filters)
+        }
+        log_response(response_data, HTTP_SUCCESS)
+        return Response(response_data)
+
+
+class NetworkSceneNearbyView(APIView):
+    """
+    附近小区视图：?lat=28.68&lon=115.89&k=10&radius_m=3000
+    - lat/lon：必填，纬度/经度
+    - k：返回最近的几个小区，默认10，最多100
+    - radius_m：搜索半径（米），默认5000，最大50000
+    只查最新一天有经纬度的小区，返回结果带distance_m（米）
+    """
+    service = NetworkSceneDataService()
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """GET请求：查询附近小区"""
+        log_request(request)
+        params = clean_request_params(request.GET)
+        if "lat" not in params or "lon" not in params:
+            raise ParamError(detail="lat、lon参数不能为空")
+        lat = validate_float(params["lat"], "纬度", -90, 90)
+        lon = validate_float(params["lon"], "经度", -180, 180)
+        k = validate_int(params.get("k", NEARBY_DEFAULT_K), "k")
+        k = max(1, min(k, NEARBY_MAX_K))
+        radius_m = validate_float(params.get("radius_m", NEARBY_DEFAULT_RADIUS_M), "搜索半径", 0, NEARBY_MAX_RADIUS_M)
+        result = self.service.get_nearby_cells(lat, lon, k, radius_m)
+        response_data = {
+            "code": HTTP_SUCCESS,
+            "msg": MSG_QUERY_SUCCESS,
+            "date": result["date"],
+            "list": result["list"],
+            "total": len(result["list"])
+        }
+        log_response(response_data, HTTP_SUCCESS)
+        return Response(response_data)
+
+
+class NetworkSceneHeatmapView(APIView):
+    """
+    地图网格聚合视图：?bbox=113.5,24.5,118.5,30.1&zoom=7
+    - bbox：必填，最小经度,最小纬度,最大经度,最大纬度
+    - zoom：必填，缩放级别 0~18，越大网格越细
+    - 其他参数：同列表接口的筛选条件，不传日期时只统计最新一天
+    每个网格返回中心点经纬度、小区数、平均评分、投诉小区数
+    """
+    service = NetworkSceneDataService()
+    filter_mapping = NetworkSceneDataListView.filter_mapping
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """GET请求：地图网格聚合"""
+        log_request(request)
+        bbox = parse_list_param(request.GET.get("bbox")) or []
+        if len(bbox) != 4:
+            raise ParamError(detail="bbox格式：最小经度,最小纬度,最大经度,最大纬度")
+        min_lon = validate_float(bbox[0], "最小经度", -180, 180)
+        min_lat = validate_float(bbox[1], "最小纬度", -90, 90)
+        max_lon = validate_float(bbox[2], "最大经度", min_lon, 180)
+        max_lat = validate_float(bbox[3], "最大纬度", min_lat, 90)
+        zoom = validate_int(request.GET.get("zoom"), "缩放级别")
+        if not 0 <= zoom <= HEATMAP_MAX_ZOOM:
+            raise ParamError(detail=f"缩放级别必须在0到{HEATMAP_MAX_ZOOM}之间")
+        filters = clean_request_params(request.GET, self.filter_mapping)
+        result = self.service.get_heatmap(filters, (min_lon, min_lat, max_lon, max_lat), zoom)
+        response_data = {
+            "code": HTTP_SUCCESS,
+            "msg": MSG_QUERY_SUCCESS,
+            "date": result["date"],
+            "zoom": zoom,
+            "bin_degrees": result["bin_degrees"],
+            "list": result["list"],
+            "total": len(result["list"])
+        }
+        log_response(response_data, HTTP_SUCCESS)
+        return Response(response_data)
+
+
+class ComplaintWorkOrderListView(BaseListView):
+    """
+    投诉工单列表视图
+    列表默认不返回大文本字段（投诉内容、详单、回复内容等），需要时用?fields=指定或查详情接口
+    """
+    service = ComplaintWorkOrderService()
+    serializer_class = ComplaintWorkOrderSerializer
+    filter_mapping = {
+        "phone": "report_phone",
+        "status": "work_order_status",
+    }
+    default_exclude_fields = complaint_text_field_names()
+
+
+class ComplaintWorkOrderDetailView(BaseDetailView):
+    """投诉工单详情视图"""
+    service = ComplaintWorkOrderService()
+    serializer_class = ComplaintWorkOrderSerializer
+
+
+class ComplaintWorkOrderExportView(BaseExportView):
+    """投诉工单导出视图"""
+    service = ComplaintWorkOrderService()
+    serializer_class = ComplaintWorkOrderSerializer
+    filter_mapping = ComplaintWorkOrderListView.filter_mapping
+    export_name = "complaint_work_order"
+
+
+class ComplaintWorkOrderSearchView(APIView):
+    """
+    投诉工单搜索视图：?q=信号差 断网&page=1&page_size=10
+    - q：必填，关键词（空格分隔，每个词至少2个字，都必须命中）
+    - 其他参数：同列表接口的筛选条件
+    返回按相关度排序的工单，snippets是命中字段的摘要
+    """
+    service = ComplaintWorkOrderService()
+    filter_mapping = ComplaintWorkOrderListView.filter_mapping
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """GET请求：关键词搜索"""
+        log_request(request)
+        filters = clean_request_params(request.GET, self.filter_mapping)
+        data_list, total = self.service.search(
+            request.GET.get("q"), filters, request.GET.get("page"), request.GET.get("page_size")
+        )
+        response_data = {
+            "code": HTTP_SUCCESS,
+            "msg": MSG_QUERY_SUCCESS,
+            "list": data_list,
+            "total": total
+        }
+        log_response(response_data, HTTP_SUCCESS)
+        return Response(response_data)